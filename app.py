@@ -1,272 +1,430 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
-from datetime import datetime, timedelta
-import io
+import os
+
+from qc_metrics.cache import ResultCache, content_key, uploads_key
+from qc_metrics.export import EXPORT_FORMATS, available_formats, export_csv_file, export_frame, rounded_hours
+from qc_metrics.metrics import calculate_qa_metrics
+from qc_metrics.buckets import bucket_prefix
+from qc_metrics.cube import PERIOD_DATE_COLUMNS, build_cube, parse_sprint_calendar
+from qc_metrics.dates import WORKING_WINDOW, normalize_window
+from qc_metrics.drill import build_drill_index
+from qc_metrics.ingest import CSV_FORMATS, open_csv, sniff_format
+from qc_metrics.ingest_cache import IngestCache
+from qc_metrics.issue_store import IssueStore, process_upload_incremental
+from qc_metrics.profiling import Profiler, configure_profile_log, log_profile
+from qc_metrics.pipeline import PIPELINE_COLUMNS, PipelineError, load_settings, process_upload, read_header
+from qc_metrics.preview import (
+    DAY_COUNT, DEFAULT_PAGE_SIZE, PAGE_SIZES, filter_options, matching_positions, page_count, page_rows,
+)
+from qc_metrics.streaming import discard_output, stream_to_tempfile
+from qc_metrics.uploads import process_uploads
+
+# Settings for the upload pipeline (Status filter, hours per day, severity/priority buckets),
+# optionally overridden by the JSON file named in QC_METRICS_CONFIG
+PIPELINE_SETTINGS = load_settings(os.environ.get('QC_METRICS_CONFIG'))
+
+# Per-stage timings of every processed upload and download go to this JSON-lines file
+if os.environ.get('QC_METRICS_PROFILE_LOG'):
+    configure_profile_log(os.environ['QC_METRICS_PROFILE_LOG'])
+
+# Memory budget for processed uploads, shared by every session of this server
+RESULT_CACHE_MAX_BYTES = int(os.environ.get('QC_METRICS_RESULT_CACHE_MB', 2048)) * 1024 ** 2
+
+# Opening the app with ?admin=<this token> shows the server cache statistics
+ADMIN_TOKEN = os.environ.get('QC_METRICS_ADMIN_TOKEN')
+
+# Chunked CSV mode: rows per chunk and rows kept for the on-screen preview
+STREAM_CHUNK_ROWS = 100_000
+STREAM_PREVIEW_ROWS = 1_000
+
+
+@st.cache_resource
+def get_result_cache():
+    """Processed uploads keyed by content and settings, shared by all sessions.
+
+    Sessions only keep the key of their current result, so an export uploaded
+    by many people is processed and held in memory once.  The trend cubes and
+    drill-down indexes of a result are kept here too, under keys derived from
+    the result's, and count against the same budget.
+    """
+    return ResultCache(max_bytes=RESULT_CACHE_MAX_BYTES, on_evict=discard_output)
+
+
+@st.cache_resource
+def get_ingest_cache():
+    """On-disk cache of read + date-parsed uploads, shared by all sessions."""
+    return IngestCache()
+
+
+@st.cache_resource
+def get_issue_store():
+    """SQLite store of per-issue results for incremental mode, shared by all sessions."""
+    return IssueStore()
+
+
+def run_profiled(run, **log_fields):
+    """Call ``run(profiler)``; the stage timings are logged and kept in the result under 'profile'."""
+    profiler = Profiler()
+    result = run(profiler)
+    result['profile'] = profiler.records()
+    log_profile(result['profile'], **log_fields, rows_out=result['variables']['total_bugs'],
+                memory=result.get('memory'))
+    return result
+
+
+def streamed_export(result, run, export_format):
+    """Bytes of a streamed result's CSV on disk in ``export_format``.
+
+    Another session's upload can evict the result from the shared cache, which
+    deletes its CSV, between this session showing the download button and the
+    click.  The upload is then streamed again with ``run`` into a file of this
+    download's own, removed once exported.
+    """
+    try:
+        return export_csv_file(result['output_path'], export_format)
+    except FileNotFoundError:
+        rebuilt = run(Profiler())
+        try:
+            return export_csv_file(rebuilt['output_path'], export_format)
+        finally:
+            discard_output(rebuilt)
+
+
+def preview_options(result_key, df):
+    """Filter choices for the preview, computed once per result."""
+    cached = st.session_state.get('preview_options')
+    if cached is None or cached[0] != result_key:
+        st.session_state.preview_options = (result_key, filter_options(df))
+    return st.session_state.preview_options[1]
+
+
+def preview_positions(result_key, df, filters, sort_by, ascending):
+    """Filtered and sorted row positions, shared by all sessions so turning a page does not redo them.
+
+    None when nothing is filtered or sorted.  The positions live in the
+    shared result cache under the result key plus the query, so no session
+    holds a row-sized array of its own.
+    """
+    if not filters and sort_by is None:
+        return None
+    query = {'preview': sorted(filters.items()), 'sort_by': sort_by, 'ascending': ascending}
+    return get_result_cache().get_or_compute(
+        content_key(result_key.encode(), query), lambda: matching_positions(df, filters, sort_by, ascending)
+    )
+
+
+def trend_cube(result_key, df, date_column, sprint_text):
+    """Period cube of a result, built once per result and period choice and shared by all sessions."""
+    def build():
+        sprints = parse_sprint_calendar(sprint_text) if sprint_text else None
+        profiler = Profiler()
+        with profiler.stage('build_cube', len(df)) as stage:
+            cube = build_cube(df, PIPELINE_SETTINGS, date_column, sprints)
+            stage['rows_out'] = len(cube)
+        log_profile(profiler.records(), event='cube', periods=len(cube))
+        return cube
+
+    key = content_key(result_key.encode(), {'cube': date_column, 'sprints': sprint_text})
+    return get_result_cache().get_or_compute(key, build)
+
+
+def drill_index(result_key, df):
+    """Drill-down index of a result, built once per result and shared by all sessions."""
+    def build():
+        profiler = Profiler()
+        with profiler.stage('build_drill_index', len(df)) as stage:
+            index = build_drill_index(df, PIPELINE_SETTINGS)
+            stage['rows_out'] = len(index)
+        log_profile(profiler.records(), event='drill_index', groups=len(index))
+        return index
+
+    return get_result_cache().get_or_compute(content_key(result_key.encode(), {'drill': True}), build)
+
 
 st.set_page_config(page_title="QC Metric Calculator", layout="wide")
 st.title("QC Metric Calculator")
 st.markdown("### One upload, zero hassle – Palash's automation takes care of the rest.")
 
-uploaded_file = st.file_uploader("Choose Excel or CSV file", type=["xlsx", "xls", "csv"])
+uploaded_files = st.file_uploader(
+    "Choose Excel or CSV files", type=["xlsx", "xls", "csv", "gz"], accept_multiple_files=True,
+    help="Several exports (e.g. one per sprint) are merged; an issue in more than one keeps its latest Updated row. "
+         "Every sheet of a workbook with Created and Updated columns is read; .csv.gz files are decompressed on the fly."
+)
+stream_large_csv = st.checkbox(
+    "Process CSV in chunks (large exports)",
+    value=False,
+    help="Keeps memory flat for multi-million-row CSV files. Shows a preview of the updated data. "
+         "Single CSV uploads only."
+)
+slim_columns = st.checkbox(
+    "Read only the columns the calculation needs (wide exports)",
+    value=False,
+    help="Skips the other columns of the export, which makes large files with many custom fields much faster."
+)
+incremental = st.checkbox(
+    "Incremental mode (reuse results of unchanged issues)",
+    value=False,
+    help="Keeps per-issue results by Issue key between uploads, so a daily export only "
+         "re-processes new or updated issues. Not used when processing CSV in chunks."
+)
+precise_hours = st.checkbox(
+    "Count actual working hours",
+    value=PIPELINE_SETTINGS['working_hours'] is not None,
+    help="Hours count is the working time from Created to Updated inside the daily window below, "
+         "skipping weekends and holidays, instead of a fixed number of hours per day."
+)
+if precise_hours:
+    window = PIPELINE_SETTINGS['working_hours'] or WORKING_WINDOW
+    start_col, end_col, holiday_col = st.columns([1, 1, 3])
+    with start_col:
+        work_start = st.time_input("Working day starts", pd.Timestamp(window['start']).time())
+    with end_col:
+        work_end = st.time_input("Working day ends", pd.Timestamp(window['end']).time())
+    with holiday_col:
+        holiday_text = st.text_input("Holidays (YYYY-MM-DD, comma separated)", ', '.join(window['holidays']))
+    try:
+        working_hours = normalize_window({
+            **window, 'start': work_start.strftime('%H:%M'), 'end': work_end.strftime('%H:%M'),
+            'holidays': [day.strip() for day in holiday_text.split(',') if day.strip()],
+        })
+    except ValueError as e:
+        st.error(str(e))
+        st.stop()
+else:
+    working_hours = None
+if incremental:
+    dataset = st.text_input("Dataset name", value='default',
+                            help="Uploads of the same export (e.g. one team's daily file) share a name.")
+
+ingest_cache = get_ingest_cache()
+if ingest_cache.enabled:
+    with st.expander("🗄️ Upload cache", expanded=False):
+        ingest_stats = ingest_cache.stats()
+        st.caption(
+            f"{ingest_stats['files']} file(s), {ingest_stats['bytes'] / 1024 ** 2:.1f} MB of "
+            f"{ingest_stats['max_bytes'] / 1024 ** 2:.0f} MB in {ingest_stats['directory']} "
+            f"({ingest_stats['hits']} hit(s), {ingest_stats['misses']} miss(es))"
+        )
+        if st.button("Clear upload cache"):
+            removed = ingest_cache.purge()
+            st.success(f"Removed {removed} cached file(s).")
+
+if ADMIN_TOKEN and st.query_params.get('admin') == ADMIN_TOKEN:
+    with st.expander("🛡️ Shared result cache (admin)", expanded=False):
+        result_stats = get_result_cache().stats()
+        lookups = result_stats['hits'] + result_stats['misses']
+        st.caption(
+            f"{result_stats['entries']} result(s), {result_stats['bytes'] / 1024 ** 2:.1f} MB of "
+            f"{result_stats['max_bytes'] / 1024 ** 2:.0f} MB; {result_stats['hits']} hit(s), "
+            f"{result_stats['misses']} miss(es) ({result_stats['hits'] / (lookups or 1):.0%} hit rate), "
+            f"{result_stats['waits']} wait(s) on another session's run, {result_stats['evictions']} eviction(s), "
+            f"{result_stats['computing']} running now."
+        )
+        result_entries = pd.DataFrame(get_result_cache().entries())
+        if len(result_entries):
+            result_entries['key'] = result_entries['key'].str[:12]
+            result_entries['bytes'] = result_entries['bytes'] / 1024 ** 2
+            result_entries.columns = ["Key", "MB", "Hits", "Age (s)", "Idle (s)"]
+            st.dataframe(result_entries, use_container_width=True, hide_index=True)
+        if st.button("Clear result cache"):
+            get_result_cache().clear()
+            st.success("Cleared the shared result cache.")
 
-if uploaded_file is not None:
+if uploaded_files:
     try:
-        # Read file based on extension
-        if uploaded_file.name.endswith('.csv'):
-            df = pd.read_csv(uploaded_file)
+        # Reuse the processed result across reruns (widget edits, button clicks) and sessions:
+        # keyed by the uploaded bytes plus the settings that affect the output
+        result_cache = get_result_cache()
+
+        files = [(uploaded.getvalue(), uploaded.name) for uploaded in uploaded_files]
+        upload_name = ', '.join(name for _, name in files)
+        upload_bytes = sum(len(data) for data, _ in files)
+        streaming = stream_large_csv and len(files) == 1 and sniff_format(files[0][0]) in CSV_FORMATS
+        settings = {**PIPELINE_SETTINGS, 'working_hours': working_hours}
+        if slim_columns:
+            extra_columns = list(dict.fromkeys(
+                col for data, _ in files for col in read_header(data, PIPELINE_SETTINGS['reader'])
+                if col not in PIPELINE_COLUMNS
+            ))
+            keep_columns = st.multiselect("Other columns to keep", extra_columns)
+            settings = {**settings, 'keep_columns': tuple(keep_columns)}
+        if streaming:
+            run = lambda profiler: stream_to_tempfile(
+                open_csv(files[0][0]), settings, STREAM_CHUNK_ROWS, STREAM_PREVIEW_ROWS, profiler
+            )
+        elif len(files) > 1:
+            # Read and parsed concurrently, then merged and de-duplicated by Issue key
+            run = lambda profiler: process_uploads(
+                files, settings, ingest_cache, profiler,
+                store=get_issue_store() if incremental else None, dataset=dataset if incremental else 'default',
+            )
+        elif incremental:
+            run = lambda profiler: process_upload_incremental(
+                files[0][0], get_issue_store(), dataset, settings, ingest_cache, profiler
+            )
         else:
-            df = pd.read_excel(uploaded_file)
+            run = lambda profiler: process_upload(files[0][0], settings, ingest_cache, profiler)
+        result_key = uploads_key(files, {
+            **settings, 'streaming': streaming, 'dataset': dataset if incremental and not streaming else None,
+        })
+        served = {'from_cache': True}
+
+        def compute_result():
+            served['from_cache'] = False
+            return run_profiled(run, event='upload', file=upload_name, bytes=upload_bytes, streaming=streaming)
 
-        # Must have these two columns
-        if not {'Created', 'Updated'}.issubset(df.columns):
-            st.error("Excel must contain 'Created' and 'Updated' columns")
+        try:
+            result = result_cache.get_or_compute(result_key, compute_result)
+        except PipelineError as e:
+            st.error(str(e))
             st.stop()
 
-        # Convert 'Created' and 'Updated' columns to datetime
-        # Handle DD-MM-YY format (day-month-year with 2-digit year)
-        def parse_date_dd_mm_yy(date_val):
-            """Parse dates in DD-MM-YY format (e.g., 11-12-25 = 11 Dec 2025)"""
-            if pd.isna(date_val):
-                return pd.NaT
-            
-            if isinstance(date_val, pd.Timestamp):
-                return date_val
-            
-            date_str = str(date_val).strip()
-            
-            # First, try to parse DD-MM-YY format explicitly (most common in your data)
-            import re
-            # Pattern: DD-MM-YY HH:MM or DD-MM-YY
-            match = re.match(r'^(\d{1,2})-(\d{1,2})-(\d{2})(\s+(\d{1,2}):(\d{2}))?', date_str)
-            if match:
-                dd, mm, yy = match.groups()[0], match.groups()[1], match.groups()[2]
-                time_part = match.groups()[4] if match.groups()[4] and match.groups()[5] else ''
-                min_part = match.groups()[5] if match.groups()[5] else ''
-                
-                # Convert 2-digit year: 00-50 -> 2000-2050, 51-99 -> 1951-1999
-                year = int(yy)
-                if year <= 50:
-                    year = 2000 + year
-                else:
-                    year = 1900 + year
-                
-                # Format: YYYY-MM-DD HH:MM
-                if time_part:
-                    fixed_date = f"{year}-{mm.zfill(2)}-{dd.zfill(2)} {time_part.zfill(2)}:{min_part}"
-                else:
-                    fixed_date = f"{year}-{mm.zfill(2)}-{dd.zfill(2)}"
-                
-                parsed = pd.to_datetime(fixed_date, errors='coerce')
-                if pd.notna(parsed) and 1900 <= parsed.year <= 2100:
-                    return parsed
-            
-            # Fallback: Try pandas parsing with dayfirst=True
-            parsed = pd.to_datetime(date_str, errors='coerce', dayfirst=True)
-            if pd.notna(parsed) and 1900 <= parsed.year <= 2100:
-                return parsed
-            
-            return pd.NaT
-        
-        # Parse dates in DD-MM-YY format
-        created_datetime = df['Created'].apply(parse_date_dd_mm_yy)
-        updated_datetime = df['Updated'].apply(parse_date_dd_mm_yy)
-        
-        # Remove rows where date couldn't be parsed
-        invalid = created_datetime.isna() | updated_datetime.isna()
-        if invalid.any():
-            st.warning(f"{invalid.sum()} row(s) had unreadable dates and were removed.")
-            df = df[~invalid].reset_index(drop=True)
-            created_datetime = created_datetime[~invalid].reset_index(drop=True)
-            updated_datetime = updated_datetime[~invalid].reset_index(drop=True)
-        
-        # Extract only the date part (slice timestamps to dates, ignore time)
-        # Convert to date strings in 'YYYY-MM-DD' format for business day calculation
-        df['Created_date'] = created_datetime.dt.strftime('%Y-%m-%d')
-        df['Updated_date'] = updated_datetime.dt.strftime('%Y-%m-%d')
-
-        # Calculate day count - slice timestamps to dates only, exclude weekends
-        def calculate_days(row):
-            c = row['Created_date']
-            u = row['Updated_date']
-            
-            # Skip if dates are invalid
-            if pd.isna(c) or pd.isna(u) or c == 'NaT' or u == 'NaT' or c == 'nan' or u == 'nan':
-                return 0
-            
-            # Convert to string and ensure format is YYYY-MM-DD
-            c_str = str(c)
-            u_str = str(u)
-            
-            if c_str == u_str:
-                return 1
-            else:
-                try:
-                    # busday_count counts valid weekdays (Monday-Friday) in [start, end)
-                    # It excludes the end date, so we need to add 1 day to include it
-                    # Count from start to end+1 to include the end date if it's a business day
-                    end_date = pd.to_datetime(u_str)
-                    end_plus_one = (end_date + timedelta(days=1)).strftime('%Y-%m-%d')
-                    
-                    # Count business days from start to end+1 (this includes the end date)
-                    count = np.busday_count(c_str, end_plus_one)
-                    # Subtract 1 day for different dates (as per requirement)
-                    count = max(1, count - 1)  # Ensure at least 1 day
-                    return count
-                except (ValueError, TypeError) as e:
-                    return 0
-
-        df['Day count'] = df.apply(calculate_days, axis=1)
-        
-        # Ensure Day count is numeric (convert to int)
-        df['Day count'] = pd.to_numeric(df['Day count'], errors='coerce').fillna(0).astype(int)
-        
-        # Add Hours count column (Day count * 8)
-        df['Hours count'] = df['Day count'] * 8
-
-        # Clean up temporary columns
-        df = df.drop(columns=['Created_date', 'Updated_date'])
-
-        # Filter by Status: only consider rows with exact match 'Done' or 'Merge Request'
-        if 'Status' in df.columns:
-            initial_count = len(df)
-            df = df[df['Status'].isin(['Done', 'Merge Request'])].reset_index(drop=True)
-            filtered_count = len(df)
-            if initial_count != filtered_count:
-                st.info(f"Filtered by Status: {initial_count - filtered_count} row(s) excluded (Status not 'Done' or 'Merge Request'). {filtered_count} row(s) remaining.")
-        else:
-            st.warning("No 'Status' column found. All rows will be included in calculations.")
+        df = result['df']
+        variables = result['variables']
+        severity_summary = result['severity_summary']
+        priority_summary = result['priority_summary']
 
-        # Show result
+        # Unreadable dates removed, Status filter applied
+        for level, message in result['messages']:
+            getattr(st, level)(message)
+
+        # Show result: only the current page goes to the browser, filtering and sorting run here
         st.success("Processing complete!")
-        st.dataframe(df, use_container_width=True)
-
-        # Filter based on severity if available (check both possible column names)
-        severity_summary = []
-        severity_col = None
-        if 'Severity' in df.columns:
-            severity_col = 'Severity'
-        elif 'Custom field (Severity)' in df.columns:
-            severity_col = 'Custom field (Severity)'
-        
-        # Initialize variables to hold severity and priority values
-        major_bug_count = 0
-        major_day_count = 0
-        major_hours_count = 0
-        minor_bug_count = 0
-        minor_day_count = 0
-        minor_hours_count = 0
-        critical_blocker_bug_count = 0
-        critical_blocker_day_count = 0
-        critical_blocker_hours_count = 0
-        
-        highest_high_bug_count = 0
-        highest_high_day_count = 0
-        highest_high_hours_count = 0
-        medium_bug_count = 0
-        medium_day_count = 0
-        medium_hours_count = 0
-        low_lowest_bug_count = 0
-        low_lowest_day_count = 0
-        low_lowest_hours_count = 0
-        
-        if severity_col:
-            major_bugs = df[df[severity_col] == 'Major']
-            minor_bugs = df[df[severity_col] == 'Minor']
-            critical_blocker_bugs = df[df[severity_col].isin(['Critical', 'Blocker'])]
-            
-            # Store Major values
-            major_bug_count = len(major_bugs)
-            major_day_count = int(major_bugs['Day count'].sum()) if len(major_bugs) > 0 else 0
-            major_hours_count = int(major_bugs['Hours count'].sum()) if len(major_bugs) > 0 else 0
-            
-            # Store Minor values
-            minor_bug_count = len(minor_bugs)
-            minor_day_count = int(minor_bugs['Day count'].sum()) if len(minor_bugs) > 0 else 0
-            minor_hours_count = int(minor_bugs['Hours count'].sum()) if len(minor_bugs) > 0 else 0
-            
-            # Store Critical/Blocker values
-            critical_blocker_bug_count = len(critical_blocker_bugs)
-            critical_blocker_day_count = int(critical_blocker_bugs['Day count'].sum()) if len(critical_blocker_bugs) > 0 else 0
-            critical_blocker_hours_count = int(critical_blocker_bugs['Hours count'].sum()) if len(critical_blocker_bugs) > 0 else 0
-
-            severity_summary.append({
-                "Severity": "Major", 
-                "Bug count": major_bug_count, 
-                "Day count": major_day_count,
-                "Hours count": major_hours_count
-            })
-            severity_summary.append({
-                "Severity": "Minor", 
-                "Bug count": minor_bug_count, 
-                "Day count": minor_day_count,
-                "Hours count": minor_hours_count
-            })
-            severity_summary.append({
-                "Severity": "Critical/Blocker", 
-                "Bug count": critical_blocker_bug_count, 
-                "Day count": critical_blocker_day_count,
-                "Hours count": critical_blocker_hours_count
-            })
-
-        # Filter based on priority if available
-        priority_summary = []
-        if 'Priority' in df.columns:
-            highest_high_bugs = df[df['Priority'].isin(['Highest', 'High'])]
-            medium_bugs = df[df['Priority'] == 'Medium']
-            low_lowest_bugs = df[df['Priority'].isin(['Low', 'Lowest'])]
-            
-            # Store Highest/High values
-            highest_high_bug_count = len(highest_high_bugs)
-            highest_high_day_count = int(highest_high_bugs['Day count'].sum()) if len(highest_high_bugs) > 0 else 0
-            highest_high_hours_count = int(highest_high_bugs['Hours count'].sum()) if len(highest_high_bugs) > 0 else 0
-            
-            # Store Medium values
-            medium_bug_count = len(medium_bugs)
-            medium_day_count = int(medium_bugs['Day count'].sum()) if len(medium_bugs) > 0 else 0
-            medium_hours_count = int(medium_bugs['Hours count'].sum()) if len(medium_bugs) > 0 else 0
-            
-            # Store Low/Lowest values
-            low_lowest_bug_count = len(low_lowest_bugs)
-            low_lowest_day_count = int(low_lowest_bugs['Day count'].sum()) if len(low_lowest_bugs) > 0 else 0
-            low_lowest_hours_count = int(low_lowest_bugs['Hours count'].sum()) if len(low_lowest_bugs) > 0 else 0
-
-            priority_summary.append({
-                "Priority": "Highest/High", 
-                "Bug count": highest_high_bug_count, 
-                "Day count": highest_high_day_count,
-                "Hours count": highest_high_hours_count
-            })
-            priority_summary.append({
-                "Priority": "Medium", 
-                "Bug count": medium_bug_count, 
-                "Day count": medium_day_count,
-                "Hours count": medium_hours_count
-            })
-            priority_summary.append({
-                "Priority": "Low/Lowest", 
-                "Bug count": low_lowest_bug_count, 
-                "Day count": low_lowest_day_count,
-                "Hours count": low_lowest_hours_count
-            })
+        options = preview_options(result_key, df)
+        filters = {}
+        with st.expander("🔎 Filter and sort", expanded=False):
+            for col, widget_col in zip(options, st.columns(len(options) or 1)):
+                with widget_col:
+                    if col == DAY_COUNT:
+                        low, high = options[col]
+                        if low < high:
+                            filters[col] = st.slider(DAY_COUNT, low, high, (low, high))
+                    else:
+                        filters[col] = st.multiselect(col, options[col])
+            sort_col, order_col, size_col = st.columns(3)
+            sort_choice = sort_col.selectbox("Sort by", ["(file order)", *df.columns])
+            ascending = order_col.radio("Order", ["Ascending", "Descending"], horizontal=True) == "Ascending"
+            page_size = size_col.selectbox("Rows per page", PAGE_SIZES, index=PAGE_SIZES.index(DEFAULT_PAGE_SIZE))
+        # An empty selection or the full Day count range filters nothing
+        filters = {col: value for col, value in filters.items() if value and value != options[col]}
+        sort_by = None if sort_choice == "(file order)" else sort_choice
+
+        positions = preview_positions(result_key, df, filters, sort_by, ascending)
+        matching = len(df) if positions is None else len(positions)
+        pages = page_count(matching, page_size)
+        page = 1
+        if pages > 1:
+            page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1,
+                                   key=f"preview_page_{matching}_{page_size}")
+        st.dataframe(rounded_hours(page_rows(df, positions, page - 1, page_size)), use_container_width=True)
+        first_row = (page - 1) * page_size
+        st.caption(
+            f"Rows {min(first_row + 1, matching)}–{min(first_row + page_size, matching)} "
+            f"of {matching} matching ({len(df)} in total)."
+        )
+        if streaming:
+            st.caption(f"Showing the first {len(df)} of {variables['total_bugs']} row(s).")
+
+        if served['from_cache']:
+            st.caption("Served from the shared result cache.")
+
+        with st.expander("⏱️ Performance", expanded=False):
+            if served['from_cache']:
+                st.caption("Timings are from when this upload was first processed (possibly by another session).")
+            profile_df = pd.DataFrame(result['profile']).astype({'rows_in': 'Int64', 'rows_out': 'Int64'})
+            profile_df['memory_delta_bytes'] = profile_df['memory_delta_bytes'] / 1024 ** 2
+            profile_df.columns = ["Stage", "Seconds", "Rows in", "Rows out", "Memory Δ (MB)"]
+            st.dataframe(profile_df, use_container_width=True, hide_index=True)
+            st.caption(f"Total: {profile_df['Seconds'].sum():.3f} s")
+            if result.get('memory'):
+                st.caption(
+                    f"Memory per row: {result['memory']['bytes_per_row_before']:.0f} bytes before, "
+                    f"{result['memory']['bytes_per_row_after']:.0f} bytes after compact dtypes "
+                    f"(categorical Status/Severity/Priority, narrow counts)."
+                )
 
         # Display Severity and Priority counts in tabular format (with dropdown design)
         if severity_summary:
-            severity_df = pd.DataFrame(severity_summary)
+            severity_df = pd.DataFrame(severity_summary).round(2)
             with st.expander("📈 Severity-based Counts", expanded=False):
                 st.dataframe(severity_df, use_container_width=True, hide_index=True)
 
         if priority_summary:
-            priority_df = pd.DataFrame(priority_summary)
+            priority_df = pd.DataFrame(priority_summary).round(2)
             with st.expander("📊 Priority-based Counts", expanded=False):
                 st.dataframe(priority_df, use_container_width=True, hide_index=True)
 
+        # Trends: per-period totals and QA metrics answered from a pre-aggregated cube
+        with st.expander("📉 Trends", expanded=False):
+            if streaming:
+                st.caption("Trends need the whole updated data; not available when processing CSV in chunks.")
+            else:
+                period_col, date_col, pages_col = st.columns(3)
+                by_sprint = period_col.radio("Period", ["ISO week", "Sprint calendar"], horizontal=True) == "Sprint calendar"
+                date_column = date_col.selectbox("Place bugs by", PERIOD_DATE_COLUMNS)
+                period_pages = pages_col.number_input("Pages/Stories per period", min_value=0, value=0, step=1)
+                sprint_text = ''
+                if by_sprint:
+                    sprint_text = st.text_area(
+                        "Sprints, one per line: name, start, end (YYYY-MM-DD, end included)",
+                        placeholder="Sprint 1, 2025-01-06, 2025-01-19\nSprint 2, 2025-01-20, 2025-02-02",
+                    ).strip()
+                if by_sprint and not sprint_text:
+                    st.caption("Enter a sprint calendar to see sprint trends.")
+                else:
+                    try:
+                        cube = trend_cube(result_key, df, date_column, sprint_text)
+                    except PipelineError as e:
+                        st.error(str(e))
+                        cube = None
+                    if cube is not None and len(cube):
+                        totals = cube.period_totals().set_index('Period')
+                        period_metrics = cube.period_metrics(period_pages).set_index('Period')
+                        st.markdown("**Bugs per period by severity**")
+                        severity_bugs = [col for col in totals.columns if col.endswith(' bugs')]
+                        st.bar_chart(totals[severity_bugs or ['Bug count']])
+                        st.markdown("**MTFB per period (hrs)**")
+                        st.line_chart(period_metrics[[col for col in period_metrics.columns if col.startswith('MTFB')]])
+                        st.dataframe(period_metrics.round(2), use_container_width=True)
+                    elif cube is not None:
+                        st.caption("No bugs fall into any period.")
+
+        # Drill-down: summaries per Assignee/Component/Sprint selection answered from a pre-aggregated index
+        with st.expander("🧭 Drill-down", expanded=False):
+            if streaming:
+                st.caption("Drill-down needs the whole updated data; not available when processing CSV in chunks.")
+            else:
+                index = drill_index(result_key, df)
+                if not index.dimensions:
+                    st.caption("The export has no Assignee, Component/s or Sprint column to drill into.")
+                else:
+                    drill_filters = {}
+                    for dimension, widget_col in zip(index.dimensions, st.columns(len(index.dimensions))):
+                        with widget_col:
+                            drill_filters[dimension] = st.multiselect(dimension, index.values[dimension],
+                                                                      key=f'drill_{dimension}')
+                    by_col, pages_col = st.columns(2)
+                    drill_by = by_col.selectbox("Break down by", index.dimensions)
+                    drill_pages = pages_col.number_input("Pages/Stories per group", min_value=0, value=0, step=1)
+                    selection = index.summaries(drill_filters)
+                    st.caption(f"{selection['variables']['total_bugs']} bug(s) selected.")
+                    sev_col, pri_col = st.columns(2)
+                    if selection['severity_summary']:
+                        sev_col.dataframe(pd.DataFrame(selection['severity_summary']).round(2), use_container_width=True,
+                                          hide_index=True)
+                    if selection['priority_summary']:
+                        pri_col.dataframe(pd.DataFrame(selection['priority_summary']).round(2), use_container_width=True,
+                                          hide_index=True)
+                    breakdown = index.breakdown(drill_by, drill_filters).set_index(drill_by)
+                    breakdown_metrics = index.breakdown_metrics(drill_by, drill_filters, drill_pages).set_index(drill_by)
+                    st.dataframe(breakdown.join(breakdown_metrics).round(2), use_container_width=True)
+
         # Calculate metrics for QA Metric Calculator using stored variables
         # Bug count: actual row count from Excel
-        total_bugs = len(df)
-        total_hours = int(df['Hours count'].sum()) if 'Hours count' in df.columns else 0
-        total_day_count = int(df['Day count'].sum()) if 'Day count' in df.columns else 0
-        
+        total_bugs = variables['total_bugs']
+        total_hours = variables['total_hours']
+
         # Display all variable values in UI tables (compact design)
         st.markdown("---")
         with st.expander("📊 Calculation Variables Summary", expanded=False):
@@ -275,77 +433,42 @@ if uploaded_file is not None:
             
             with col1:
                 # SEVERITY-BASED VARIABLES table
-                severity_vars_data = {
-                    "Variable": [
-                        "major_bug_count",
-                        "major_day_count",
-                        "major_hours_count",
-                        "minor_bug_count",
-                        "minor_day_count",
-                        "minor_hours_count",
-                        "critical_blocker_bug_count",
-                        "critical_blocker_day_count",
-                        "critical_blocker_hours_count"
-                    ],
-                    "Value": [
-                        major_bug_count,
-                        major_day_count,
-                        major_hours_count,
-                        minor_bug_count,
-                        minor_day_count,
-                        minor_hours_count,
-                        critical_blocker_bug_count,
-                        critical_blocker_day_count,
-                        critical_blocker_hours_count
-                    ]
-                }
-                severity_vars_df = pd.DataFrame(severity_vars_data)
+                severity_vars = [
+                    f"{bucket_prefix(label)}_{kind}"
+                    for label, _ in PIPELINE_SETTINGS['severity_buckets']
+                    for kind in ("bug_count", "day_count", "hours_count")
+                ]
+                severity_vars_df = pd.DataFrame({
+                    "Variable": severity_vars,
+                    "Value": [variables[name] for name in severity_vars]
+                }).round(2)
                 st.markdown("**SEVERITY-BASED:**")
                 st.dataframe(severity_vars_df, use_container_width=True, hide_index=True)
             
             with col2:
                 # PRIORITY-BASED VARIABLES table
-                priority_vars_data = {
-                    "Variable": [
-                        "highest_high_bug_count",
-                        "highest_high_day_count",
-                        "highest_high_hours_count",
-                        "medium_bug_count",
-                        "medium_day_count",
-                        "medium_hours_count",
-                        "low_lowest_bug_count",
-                        "low_lowest_day_count",
-                        "low_lowest_hours_count"
-                    ],
-                    "Value": [
-                        highest_high_bug_count,
-                        highest_high_day_count,
-                        highest_high_hours_count,
-                        medium_bug_count,
-                        medium_day_count,
-                        medium_hours_count,
-                        low_lowest_bug_count,
-                        low_lowest_day_count,
-                        low_lowest_hours_count
-                    ]
-                }
-                priority_vars_df = pd.DataFrame(priority_vars_data)
+                priority_vars = [
+                    f"{bucket_prefix(label)}_{kind}"
+                    for label, _ in PIPELINE_SETTINGS['priority_buckets']
+                    for kind in ("bug_count", "day_count", "hours_count")
+                ]
+                priority_vars_df = pd.DataFrame({
+                    "Variable": priority_vars,
+                    "Value": [variables[name] for name in priority_vars]
+                }).round(2)
                 st.markdown("**PRIORITY-BASED:**")
                 st.dataframe(priority_vars_df, use_container_width=True, hide_index=True)
             
             with col3:
                 # TOTAL CALCULATED VALUES table
-                total_vars_data = {
-                    "Variable": [
-                        "total_bugs",
-                        "total_day_count"
-                    ],
-                    "Value": [
-                        total_bugs,
-                        total_day_count
-                    ]
-                }
-                total_vars_df = pd.DataFrame(total_vars_data)
+                total_vars = [
+                    "total_bugs",
+                    "total_day_count"
+                ]
+                total_vars_df = pd.DataFrame({
+                    "Variable": total_vars,
+                    "Value": [variables[name] for name in total_vars]
+                })
                 st.markdown("**TOTAL VALUES:**")
                 st.dataframe(total_vars_df, use_container_width=True, hide_index=True)
         
@@ -361,43 +484,58 @@ if uploaded_file is not None:
             'bugs': total_bugs,  # Actual row count from Excel
             'devHrs': float(total_hours),
             'testHrs': float(total_hours),
-            'critical': critical_blocker_bug_count,  # From Severity: Critical/Blocker bug count
-            'major': major_bug_count,  # From Severity: Major bug count
-            'highHrs': float(highest_high_hours_count),  # From Priority: Highest/High hours count
-            'highCount': highest_high_bug_count,  # From Priority: Highest/High bug count
-            'medHrs': float(medium_hours_count),  # From Priority: Medium hours count
-            'medCount': medium_bug_count,  # From Priority: Medium bug count
-            'lowHrs': float(low_lowest_hours_count),  # From Priority: Low/Lowest hours count
-            'lowCount': low_lowest_bug_count  # From Priority: Low/Lowest bug count
+            'critical': variables.get('critical_blocker_bug_count', 0),  # From Severity: Critical/Blocker bug count
+            'major': variables.get('major_bug_count', 0),  # From Severity: Major bug count
+            'highHrs': float(variables.get('highest_high_hours_count', 0)),  # From Priority: Highest/High hours count
+            'highCount': variables.get('highest_high_bug_count', 0),  # From Priority: Highest/High bug count
+            'medHrs': float(variables.get('medium_hours_count', 0)),  # From Priority: Medium hours count
+            'medCount': variables.get('medium_bug_count', 0),  # From Priority: Medium bug count
+            'lowHrs': float(variables.get('low_lowest_hours_count', 0)),  # From Priority: Low/Lowest hours count
+            'lowCount': variables.get('low_lowest_bug_count', 0)  # From Priority: Low/Lowest bug count
         }
         
         # Store the calculated variables for use in calculations
         st.session_state.calculated_vars = {
-            'total_bugs': total_bugs,  # Actual row count from Excel
-            'critical_blocker_bug_count': critical_blocker_bug_count,
-            'major_bug_count': major_bug_count,
-            'highest_high_hours_count': highest_high_hours_count,
-            'highest_high_bug_count': highest_high_bug_count,
-            'medium_hours_count': medium_hours_count,
-            'medium_bug_count': medium_bug_count,
-            'low_lowest_hours_count': low_lowest_hours_count,
-            'low_lowest_bug_count': low_lowest_bug_count
+            name: variables.get(name, 0)
+            for name in [
+                'total_bugs',  # Actual row count from Excel
+                'critical_blocker_bug_count',
+                'major_bug_count',
+                'highest_high_hours_count',
+                'highest_high_bug_count',
+                'medium_hours_count',
+                'medium_bug_count',
+                'low_lowest_hours_count',
+                'low_lowest_bug_count'
+            ]
         }
         
         # Show success message that fields are auto-filled
         st.success("✅ QA Metric Calculator fields have been auto-filled with calculated values!")
         
-        # Download button for the updated data
-        output = io.BytesIO()
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            df.to_excel(writer, index=False, sheet_name='Sheet1')
-        output.seek(0)
+        # Download button for the updated data; the file is only built when the button is clicked
+        export_format = st.radio(
+            "Download format",
+            available_formats(),
+            format_func=lambda fmt: EXPORT_FORMATS[fmt]['label'],
+            horizontal=True
+        )
+        def export_data():
+            profiler = Profiler()
+            with profiler.stage(f'export_{export_format}', variables['total_bugs']) as stage:
+                if streaming:
+                    data = streamed_export(result, run, export_format)
+                else:
+                    data = export_frame(df, export_format)
+                stage['rows_out'] = variables['total_bugs']
+            log_profile(profiler.records(), event='export', file=upload_name, format=export_format)
+            return data
 
         st.download_button(
-            label="Download Updated Excel",
-            data=output,
-            file_name="day_count_calculated.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            label=f"Download Updated {EXPORT_FORMATS[export_format]['label']}",
+            data=export_data,
+            file_name=EXPORT_FORMATS[export_format]['file_name'],
+            mime=EXPORT_FORMATS[export_format]['mime']
         )
 
     except Exception as e:
@@ -447,69 +585,6 @@ if 'qa_calculated' not in st.session_state:
     st.session_state.qa_calculated = False
     st.session_state.qa_results = []
 
-# Calculate metrics function
-def calculate_qa_metrics(page_story_count, dev_hrs, test_hrs):
-    metrics = []
-    
-    # Get stored calculated variables from session state
-    calc_vars = st.session_state.get('calculated_vars', {})
-    total_bugs = calc_vars.get('total_bugs', 0)  # Actual row count from Excel
-    critical_blocker_bug_count = calc_vars.get('critical_blocker_bug_count', 0)
-    major_bug_count = calc_vars.get('major_bug_count', 0)
-    highest_high_hours_count = calc_vars.get('highest_high_hours_count', 0)
-    highest_high_bug_count = calc_vars.get('highest_high_bug_count', 0)
-    medium_hours_count = calc_vars.get('medium_hours_count', 0)
-    medium_bug_count = calc_vars.get('medium_bug_count', 0)
-    low_lowest_hours_count = calc_vars.get('low_lowest_hours_count', 0)
-    low_lowest_bug_count = calc_vars.get('low_lowest_bug_count', 0)
-    
-    # Defect Density (Critical) - page_story_count && critical ? (critical_blocker_bug_count / page_story_count).toFixed(2) : "-"
-    val = (critical_blocker_bug_count / page_story_count) if (page_story_count and critical_blocker_bug_count) else "-"
-    result = f"{val:.2f}" if isinstance(val, (int, float)) else val
-    metrics.append({"name": "Defect Density (Critical)", "value": result})
-    
-    # Defect Density (Total) - page_story_count && total_bugs ? (total_bugs / page_story_count).toFixed(2) : "-"
-    val = (total_bugs / page_story_count) if (page_story_count and total_bugs) else "-"
-    result = f"{val:.2f}" if isinstance(val, (int, float)) else val
-    metrics.append({"name": "Defect Density (Total)", "value": result})
-    
-    # MTFB - High (hrs) - highHrs && highCount ? (highest_high_hours_count / highest_high_bug_count).toFixed(2) : "-"
-    val = (highest_high_hours_count / highest_high_bug_count) if (highest_high_hours_count and highest_high_bug_count) else "-"
-    result = f"{val:.2f}" if isinstance(val, (int, float)) else val
-    metrics.append({"name": "MTFB - High (hrs)", "value": result})
-    
-    # MTFB - Medium (hrs) - medHrs && medCount ? (medium_hours_count / medium_bug_count).toFixed(2) : "-"
-    val = (medium_hours_count / medium_bug_count) if (medium_hours_count and medium_bug_count) else "-"
-    result = f"{val:.2f}" if isinstance(val, (int, float)) else val
-    metrics.append({"name": "MTFB - Medium (hrs)", "value": result})
-    
-    # MTFB - Low (hrs) - lowHrs && lowCount ? (low_lowest_hours_count / low_lowest_bug_count).toFixed(2) : "-"
-    val = (low_lowest_hours_count / low_lowest_bug_count) if (low_lowest_hours_count and low_lowest_bug_count) else "-"
-    result = f"{val:.2f}" if isinstance(val, (int, float)) else val
-    metrics.append({"name": "MTFB - Low (hrs)", "value": result})
-    
-    # Severity Ratio (Critical) % - total_bugs && critical ? ((critical_blocker_bug_count / total_bugs) * 100).toFixed(2) + "%" : "-"
-    val = ((critical_blocker_bug_count / total_bugs) * 100) if (total_bugs and critical_blocker_bug_count) else "-"
-    result = f"{val:.2f}%" if isinstance(val, (int, float)) else val
-    metrics.append({"name": "Severity Ratio (Critical) %", "value": result})
-    
-    # Severity Ratio (Major) % - total_bugs && major ? ((major_bug_count / total_bugs) * 100).toFixed(2) + "%" : "-"
-    val = ((major_bug_count / total_bugs) * 100) if (total_bugs and major_bug_count) else "-"
-    result = f"{val:.2f}%" if isinstance(val, (int, float)) else val
-    metrics.append({"name": "Severity Ratio (Major) %", "value": result})
-    
-    # Defect Rate - total_bugs && devHrs && testHrs ? (total_bugs / (Number(devHrs) + Number(testHrs))).toFixed(2) : "-"
-    val = (total_bugs / (float(dev_hrs) + float(test_hrs))) if (total_bugs and dev_hrs and test_hrs) else "-"
-    result = f"{val:.2f}" if isinstance(val, (int, float)) else val
-    metrics.append({"name": "Defect Rate", "value": result})
-    
-    # Defect Detection Rate - total_bugs && testHrs ? (total_bugs / testHrs).toFixed(2) : "-"
-    val = (total_bugs / test_hrs) if (total_bugs and test_hrs) else "-"
-    result = f"{val:.2f}" if isinstance(val, (int, float)) else val
-    metrics.append({"name": "Defect Detection Rate", "value": result})
-    
-    return metrics
-
 # Side-by-side layout: Input fields on left, Results on right
 left_col, right_col = st.columns(2)
 
@@ -559,7 +634,9 @@ with left_col:
     # Calculate button
     if st.button("Calculate Metrics", type="primary", use_container_width=True):
         st.session_state.qa_calculated = True
-        st.session_state.qa_results = calculate_qa_metrics(page_story_count, dev_hrs, test_hrs)
+        st.session_state.qa_results = calculate_qa_metrics(
+            st.session_state.get('calculated_vars', {}), page_story_count, dev_hrs, test_hrs
+        )
 
 with right_col:
     st.markdown("#### Calculated Metrics")
@@ -0,0 +1 @@
+"""Benchmarks for the QC Metric Calculator pipeline (not part of the app)."""
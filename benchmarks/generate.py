@@ -0,0 +1,151 @@
+"""Deterministic synthetic JIRA exports for benchmarking.
+
+    python -m benchmarks.generate 1m exports/bench_1m.csv
+
+Rows look like a real JIRA export: Created/Updated mix DD-MM-YY and ISO
+dates with and without times plus some unparseable values, and Status,
+Severity and Priority follow skewed distributions.  The same rows, seed and
+chunk size always give the same file.  ``.csv`` and ``.xlsx`` are supported;
+files are written chunk by chunk so generating 10M rows needs little memory.
+"""
+import argparse
+import re
+
+import numpy as np
+import pandas as pd
+
+from qc_metrics.export import write_xlsx
+
+# Rows generated (and written) at a time
+GENERATE_CHUNK_ROWS = 250_000
+
+# Excel sheets hold 1,048,576 rows including the header
+XLSX_MAX_ROWS = 1_048_575
+
+# (value, probability) pairs; None is a blank cell
+STATUSES = (
+    ('Done', 0.42), ('Open', 0.14), ('In Progress', 0.12), ('Merge Request', 0.10),
+    ('Closed', 0.09), ('Reopened', 0.05), ('To Do', 0.05), ("Won't Fix", 0.03),
+)
+SEVERITIES = (
+    ('Minor', 0.44), ('Major', 0.33), ('Critical', 0.08), ('Blocker', 0.04),
+    ('Trivial', 0.05), (None, 0.06),
+)
+PRIORITIES = (
+    ('Medium', 0.48), ('High', 0.20), ('Low', 0.15), ('Highest', 0.07),
+    ('Lowest', 0.06), (None, 0.04),
+)
+ISSUE_TYPES = (('Bug', 0.85), ('Defect', 0.10), ('Sub-task', 0.05))
+ASSIGNEES = tuple((f'dev{i:02d}', weight) for i, weight in enumerate(np.full(20, 1 / 20)))
+COMPONENTS = (('UI', 0.35), ('API', 0.30), ('Database', 0.15), ('Auth', 0.12), ('Reports', 0.08))
+SPRINTS = tuple((f'Sprint {i}', weight) for i, weight in enumerate(np.full(26, 1 / 26), start=1))
+
+# strftime layouts for Created/Updated and how often each appears
+DATE_FORMATS = (
+    ('%d-%m-%y %H:%M', 0.50),
+    ('%d-%m-%y', 0.12),
+    ('%Y-%m-%d %H:%M:%S', 0.15),
+    ('%Y-%m-%d', 0.08),
+    ('%d/%m/%Y %H:%M', 0.05),
+    ('%-d-%-m-%y %-H:%M', 0.05),
+    (None, 0.05),
+)
+UNPARSEABLE = ('', 'N/A', 'TBD', 'not set', '31-02-25', '13-13-13 25:61', '00-00-00')
+
+DATE_RANGE_START = np.datetime64('2019-01-01T00:00')
+DATE_RANGE_MINUTES = 6 * 365 * 24 * 60
+
+
+def parse_rows(text):
+    """Row count from '10k', '1m', '10M' or a plain number."""
+    match = re.fullmatch(r'(\d+(?:\.\d+)?)([kKmM]?)', text.strip())
+    if not match:
+        raise ValueError(f"Not a row count: {text!r}")
+    number, unit = match.groups()
+    return int(float(number) * {'': 1, 'k': 1_000, 'm': 1_000_000}[unit.lower()])
+
+
+def _choice(rng, options, size):
+    values, weights = zip(*options)
+    weights = np.asarray(weights, dtype=float)
+    picked = rng.choice(len(values), size=size, p=weights / weights.sum())
+    return pd.Series(np.asarray(values, dtype=object)[picked])
+
+
+def _format_dates(rng, dates):
+    """Render datetime64 values in the mixed layouts of DATE_FORMATS."""
+    layouts = _choice(rng, DATE_FORMATS, len(dates))
+    out = pd.Series(pd.NA, index=layouts.index, dtype=object)
+    stamps = pd.Series(dates)
+    for layout in layouts.dropna().unique():
+        rows = (layouts == layout).to_numpy()
+        if layout.startswith('%-d'):
+            # strftime has no portable unpadded day/month; build it by hand
+            part = stamps[rows]
+            out[rows] = (part.dt.day.astype(str) + '-' + part.dt.month.astype(str) + '-'
+                         + part.dt.strftime('%y') + ' ' + part.dt.hour.astype(str) + part.dt.strftime(':%M'))
+        else:
+            out[rows] = stamps[rows].dt.strftime(layout)
+    broken = layouts.isna().to_numpy()
+    out[broken] = _choice(rng, tuple((value, 1) for value in UNPARSEABLE), int(broken.sum())).to_numpy()
+    return out
+
+
+def generate_frame(rows, seed=0, start=0):
+    """``rows`` synthetic export rows; ``start`` offsets the Issue keys."""
+    rng = np.random.default_rng([seed, start])
+    created = DATE_RANGE_START + rng.integers(0, DATE_RANGE_MINUTES, rows).astype('timedelta64[m]')
+    # Most bugs are closed within days, a long tail takes weeks; a fifth the same day
+    spent = np.where(rng.random(rows) < 0.2, rng.integers(0, 8 * 60, rows),
+                     rng.exponential(4 * 24 * 60, rows).astype(np.int64))
+    updated = created + spent.astype('timedelta64[m]')
+
+    return pd.DataFrame({
+        'Issue key': 'QA-' + pd.Series(np.arange(start + 1, start + rows + 1)).astype(str),
+        'Issue Type': _choice(rng, ISSUE_TYPES, rows),
+        'Summary': 'Synthetic defect ' + pd.Series(rng.integers(0, 10_000, rows)).astype(str),
+        'Status': _choice(rng, STATUSES, rows),
+        'Priority': _choice(rng, PRIORITIES, rows),
+        'Severity': _choice(rng, SEVERITIES, rows),
+        'Assignee': _choice(rng, ASSIGNEES, rows),
+        'Component/s': _choice(rng, COMPONENTS, rows),
+        'Sprint': _choice(rng, SPRINTS, rows),
+        'Created': _format_dates(rng, created),
+        'Updated': _format_dates(rng, updated),
+    })
+
+
+def generate_chunks(rows, seed=0, chunk_rows=GENERATE_CHUNK_ROWS):
+    """``generate_frame`` output for ``rows`` rows, in chunks of ``chunk_rows``."""
+    for start in range(0, rows, chunk_rows):
+        yield generate_frame(min(chunk_rows, rows - start), seed, start)
+
+
+def write_export(path, rows, seed=0, chunk_rows=GENERATE_CHUNK_ROWS):
+    """Write a synthetic export to ``path`` (.csv or .xlsx)."""
+    path = str(path)
+    if path.endswith('.xlsx'):
+        if rows > XLSX_MAX_ROWS:
+            raise ValueError(f"An .xlsx sheet holds at most {XLSX_MAX_ROWS:,} rows")
+        write_xlsx(path, [('Sheet1', generate_chunks(rows, seed, chunk_rows))])
+    elif path.endswith('.csv'):
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            for index, chunk in enumerate(generate_chunks(rows, seed, chunk_rows)):
+                chunk.to_csv(f, index=False, header=index == 0)
+    else:
+        raise ValueError(f"Unsupported export type: {path}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.generate',
+                                     description="Write a synthetic JIRA export for benchmarking.")
+    parser.add_argument('rows', type=parse_rows, help="row count, e.g. 10k, 1m, 10m")
+    parser.add_argument('path', help="output file (.csv or .xlsx)")
+    parser.add_argument('--seed', type=int, default=0, help="random seed (default: %(default)s)")
+    args = parser.parse_args(argv)
+    write_export(args.path, args.rows, args.seed)
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
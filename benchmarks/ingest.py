@@ -0,0 +1,103 @@
+"""Read time of every installed ingest backend on the same export.
+
+    python -m benchmarks.ingest                          # 50k rows over 4 sheets
+    python -m benchmarks.ingest --rows 200k --sheets 8 --repeat 5
+
+The synthetic rows are written once as a workbook with one sheet per
+"project" and as .csv and .csv.gz files, all into benchmarks/data/.  Each
+backend reads every format it supports (``ingest.READERS``); workbooks are
+read both sheet after sheet and with the sheets in parallel.  Median wall
+times are reported.
+"""
+import argparse
+import gzip
+import json
+import statistics
+import time
+from pathlib import Path
+
+from benchmarks.generate import generate_frame, parse_rows
+from qc_metrics.export import write_xlsx
+from qc_metrics.ingest import READERS, available_readers, read_export
+
+BENCHMARK_DIR = Path(__file__).resolve().parent
+
+FORMAT_SUFFIXES = {'xlsx': 'xlsx', 'csv': 'csv', 'csv.gz': 'csv.gz'}
+
+
+def input_files(data_dir, rows, sheets, seed):
+    """{format: path} of the benchmark inputs, generated on first use."""
+    data_dir = Path(data_dir)
+    data_dir.mkdir(parents=True, exist_ok=True)
+    stem = f"jira_{rows}_seed{seed}_{sheets}sheets"
+    paths = {fmt: data_dir / f"{stem}.{suffix}" for fmt, suffix in FORMAT_SUFFIXES.items()}
+    if all(path.exists() for path in paths.values()):
+        return paths
+
+    per_sheet = -(-rows // sheets)
+    frames = [generate_frame(min(per_sheet, rows - start), seed, start) for start in range(0, rows, per_sheet)]
+    write_xlsx(paths['xlsx'], [(f"Project {index + 1}", [frame]) for index, frame in enumerate(frames)])
+    with open(paths['csv'], 'w', newline='', encoding='utf-8') as f:
+        for index, frame in enumerate(frames):
+            frame.to_csv(f, index=False, header=index == 0)
+    with open(paths['csv'], 'rb') as source, gzip.open(paths['csv.gz'], 'wb') as target:
+        target.writelines(source)
+    return paths
+
+
+def time_read(data, reader, repeat, max_workers=None):
+    """Median and minimum seconds of ``read_export`` plus the rows read."""
+    seconds = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        df = read_export(data, reader=reader, max_workers=max_workers)
+        seconds.append(time.perf_counter() - started)
+    return {'median_seconds': round(statistics.median(seconds), 4), 'min_seconds': round(min(seconds), 4),
+            'rows': len(df)}
+
+
+def run_ingest(rows, sheets, data_dir, seed=0, repeat=3, log=print):
+    paths = input_files(data_dir, rows, sheets, seed)
+    results = []
+    for fmt, path in paths.items():
+        data = path.read_bytes()
+        for reader in available_readers(fmt):
+            modes = [('parallel', None), ('sequential', 1)] if fmt == 'xlsx' else [('', None)]
+            for mode, max_workers in modes:
+                results.append({'format': fmt, 'reader': reader, 'sheets': mode or None, 'bytes': len(data),
+                                **time_read(data, reader, repeat, max_workers)})
+
+    log(f"{'format':<8} {'reader':<10} {'sheets':<11} {'median s':>9} {'min s':>9} {'rows':>9}")
+    for result in results:
+        log(f"{result['format']:<8} {result['reader']:<10} {result['sheets'] or '':<11} "
+            f"{result['median_seconds']:>9.3f} {result['min_seconds']:>9.3f} {result['rows']:>9,}")
+    missing = [name for name in READERS if name not in available_readers()]
+    if missing:
+        log(f"Not installed: {', '.join(missing)}")
+    return results
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.ingest',
+                                     description="Compare the ingest backends on the same synthetic export.")
+    parser.add_argument('--rows', type=parse_rows, default=parse_rows('50k'), help="total rows (default: 50k)")
+    parser.add_argument('--sheets', type=int, default=4, help="workbook sheets the rows are split over (default: %(default)s)")
+    parser.add_argument('--repeat', type=int, default=3, help="reads per backend and format (default: %(default)s)")
+    parser.add_argument('--seed', type=int, default=0, help="generator seed (default: %(default)s)")
+    parser.add_argument('--data-dir', default=str(BENCHMARK_DIR / 'data'),
+                        help="where generated exports are kept between runs (default: %(default)s)")
+    parser.add_argument('-o', '--output', help="write the timings as JSON to this file")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    results = run_ingest(args.rows, args.sheets, args.data_dir, args.seed, args.repeat)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
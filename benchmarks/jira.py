@@ -0,0 +1,219 @@
+"""Local mock of the JIRA search API, and fetch times of ``qc_metrics.jira`` against it.
+
+    python -m benchmarks.jira --rows 20k --latency 0.05 --concurrency 1 4 8
+    python -m benchmarks.jira --rows 20k --api cloud
+    python -m benchmarks.jira --serve --rows 20k --port 8080
+
+The mock serves the fields and paginated search JSON of both APIs for
+synthetic issues (JQL is ignored): ``/rest/api/2/search`` with offsets as
+JIRA Server / Data Center does and ``/rest/api/3/search/jql`` with next-page
+tokens as JIRA Cloud does, at most ``--page-cap`` issues a page, over
+keep-alive HTTP/1.1.  ``--latency`` delays every
+response and ``--fail-every N`` answers every Nth request with 429 so the
+retry path runs too.  The benchmark runs ``process_jira`` once per
+concurrency level and checks that every run gives the same summaries.
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+from benchmarks.generate import (
+    ASSIGNEES,
+    COMPONENTS,
+    DATE_RANGE_MINUTES,
+    DATE_RANGE_START,
+    ISSUE_TYPES,
+    PRIORITIES,
+    SEVERITIES,
+    STATUSES,
+    _choice,
+    parse_rows,
+)
+from qc_metrics.jira import (
+    CLOUD_FIELD_PATH, CLOUD_SEARCH_PATH, FIELD_PATH, JIRA_APIS, SEARCH_PATH, JiraClient, process_jira,
+)
+
+SEVERITY_FIELD = 'customfield_10100'
+DEFAULT_PAGE_CAP = 100
+
+_FIELDS = [
+    {'id': 'summary', 'name': 'Summary'},
+    {'id': 'status', 'name': 'Status'},
+    {'id': 'priority', 'name': 'Priority'},
+    {'id': SEVERITY_FIELD, 'name': 'Severity', 'custom': True},
+]
+
+
+def mock_issues(rows, seed=0):
+    """``rows`` issues shaped like the search API returns them."""
+    rng = np.random.default_rng(seed)
+    created = DATE_RANGE_START + rng.integers(0, DATE_RANGE_MINUTES, rows).astype('timedelta64[m]')
+    updated = created + rng.exponential(4 * 24 * 60, rows).astype(np.int64).astype('timedelta64[m]')
+    columns = {
+        'issuetype': _choice(rng, ISSUE_TYPES, rows),
+        'status': _choice(rng, STATUSES, rows),
+        'priority': _choice(rng, PRIORITIES, rows),
+        SEVERITY_FIELD: _choice(rng, SEVERITIES, rows),
+        'assignee': _choice(rng, ASSIGNEES, rows),
+        'components': _choice(rng, COMPONENTS, rows),
+    }
+    stamps = {
+        'created': np.datetime_as_string(created, unit='s'),
+        'updated': np.datetime_as_string(updated, unit='s'),
+    }
+    issues = []
+    for index in range(rows):
+        value = {field: values.iat[index] for field, values in columns.items()}
+        issues.append({
+            'key': f'QA-{index + 1}',
+            'fields': {
+                'summary': f'Synthetic defect {index + 1}',
+                'issuetype': {'name': value['issuetype']},
+                'status': {'name': value['status']},
+                'priority': None if value['priority'] is None else {'name': value['priority']},
+                SEVERITY_FIELD: None if value[SEVERITY_FIELD] is None else {'value': value[SEVERITY_FIELD]},
+                'assignee': {'displayName': value['assignee']},
+                'components': [{'name': value['components']}],
+                'created': f"{stamps['created'][index]}.000+0000",
+                'updated': f"{stamps['updated'][index]}.000+0000",
+            },
+        })
+    return issues
+
+
+def serve_mock(issues, port=0, page_cap=DEFAULT_PAGE_CAP, latency=0.0, fail_every=0):
+    """Start the mock on a background thread; returns the server (``server_port``, ``stats``, ``shutdown()``)."""
+    stats = {'requests': 0, 'throttled': 0}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        # Headers and body go out in separate writes; without this every response waits on a delayed ACK
+        disable_nagle_algorithm = True
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status, body, headers=()):
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            for name, value in headers:
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            with lock:
+                stats['requests'] += 1
+                throttle = fail_every and stats['requests'] % fail_every == 0
+                stats['throttled'] += bool(throttle)
+            if latency:
+                time.sleep(latency)
+            url = urlparse(self.path)
+            if throttle:
+                return self._send(429, {'errorMessages': ['Rate limit exceeded']}, [('Retry-After', '0')])
+            if url.path in (FIELD_PATH, CLOUD_FIELD_PATH):
+                return self._send(200, _FIELDS)
+            if url.path not in (SEARCH_PATH, CLOUD_SEARCH_PATH):
+                return self._send(404, {'errorMessages': [f'No resource at {url.path}']})
+            query = parse_qs(url.query)
+            size = min(int(query.get('maxResults', ['50'])[0]), page_cap)
+            if url.path == CLOUD_SEARCH_PATH:
+                # The token is simply the offset of the next page
+                start = int(query.get('nextPageToken', ['0'])[0])
+                end = start + size
+                page = {'issues': issues[start:end], 'isLast': end >= len(issues)}
+                if end < len(issues):
+                    page['nextPageToken'] = str(end)
+                return self._send(200, page)
+            start = int(query.get('startAt', ['0'])[0])
+            self._send(200, {
+                'startAt': start, 'maxResults': size, 'total': len(issues), 'issues': issues[start:start + size],
+            })
+
+    server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+    server.daemon_threads = True
+    server.stats = stats
+    threading.Thread(target=server.serve_forever, name='mock-jira', daemon=True).start()
+    return server
+
+
+def run_fetch(rows, concurrency_levels, latency, page_cap, fail_every, seed=0, log=print, api='server'):
+    issues = mock_issues(rows, seed)
+    server = serve_mock(issues, page_cap=page_cap, latency=latency, fail_every=fail_every)
+    url = f'http://127.0.0.1:{server.server_port}'
+    results = []
+    try:
+        log(f"{'concurrency':>11} {'seconds':>9} {'requests':>9} {'429s':>6} {'bugs kept':>10}")
+        for concurrency in concurrency_levels:
+            before = dict(server.stats)
+            started = time.perf_counter()
+            with JiraClient(url, concurrency=concurrency, rate=None, backoff=0.01, api=api) as client:
+                result = process_jira(client, 'project = QA')
+            seconds = time.perf_counter() - started
+            results.append({
+                'concurrency': concurrency,
+                'seconds': round(seconds, 4),
+                'requests': server.stats['requests'] - before['requests'],
+                'throttled': server.stats['throttled'] - before['throttled'],
+                'variables': result['variables'],
+            })
+            last = results[-1]
+            log(f"{concurrency:>11} {seconds:>9.3f} {last['requests']:>9} {last['throttled']:>6} "
+                f"{last['variables']['total_bugs']:>10,}")
+    finally:
+        server.shutdown()
+    if any(result['variables'] != results[0]['variables'] for result in results):
+        raise AssertionError("Summaries differ between concurrency levels")
+    return results
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.jira',
+                                     description="Time JIRA REST ingestion against a local mock server.")
+    parser.add_argument('--rows', type=parse_rows, default=parse_rows('10k'), help="issues served (default: 10k)")
+    parser.add_argument('--concurrency', nargs='+', type=int, default=[1, 4, 8],
+                        help="pages fetched at once, one run each (default: %(default)s)")
+    parser.add_argument('--latency', type=float, default=0.05, help="seconds added to every response (default: %(default)s)")
+    parser.add_argument('--page-cap', type=int, default=DEFAULT_PAGE_CAP,
+                        help="most issues served per page (default: %(default)s)")
+    parser.add_argument('--fail-every', type=int, default=0, metavar='N',
+                        help="answer every Nth request with 429 (default: never)")
+    parser.add_argument('--api', choices=JIRA_APIS, default='server',
+                        help="search API to fetch with; cloud pages come one at a time (default: %(default)s)")
+    parser.add_argument('--seed', type=int, default=0, help="generator seed (default: %(default)s)")
+    parser.add_argument('--serve', action='store_true', help="only run the mock server until interrupted")
+    parser.add_argument('--port', type=int, default=8080, help="port for --serve (default: %(default)s)")
+    parser.add_argument('-o', '--output', help="write the timings as JSON to this file")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.serve:
+        server = serve_mock(mock_issues(args.rows, args.seed), args.port, args.page_cap, args.latency, args.fail_every)
+        print(f"Mock JIRA with {args.rows:,} issues on http://127.0.0.1:{server.server_port} (Ctrl+C to stop)")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            server.shutdown()
+        return 0
+
+    results = run_fetch(args.rows, args.concurrency, args.latency, args.page_cap, args.fail_every, args.seed,
+                        api=args.api)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,252 @@
+"""Stage-by-stage benchmark of the pipeline on synthetic exports.
+
+    python -m benchmarks.run                                 # 10k, 1m, 10m rows; CSV and XLSX
+    python -m benchmarks.run --sizes 10k 1m --formats csv
+    python -m benchmarks.run --baseline benchmarks/results/old.json
+    python -m benchmarks.run --compare old.json new.json     # no run, just compare
+
+Every (rows, format) case runs in its own worker process, so one case running
+out of memory is recorded as an error instead of ending the run.  Each stage
+is timed on its own; peak memory comes from a second, traced run of the same
+stage (skip it with --no-memory).  Results are written as JSON, one file per
+run, named after the time and commit so runs can be compared.
+"""
+import argparse
+import datetime as dt
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from importlib import metadata
+from pathlib import Path
+
+from benchmarks.generate import XLSX_MAX_ROWS, parse_rows, write_export
+from qc_metrics.dates import parse_dates, working_hour_counts
+from qc_metrics.export import export_frame
+from qc_metrics.metrics import calculate_qa_metrics
+from qc_metrics.pipeline import DEFAULT_SETTINGS, add_day_counts, filter_status, process_upload, read_upload, summarize
+
+BENCHMARK_DIR = Path(__file__).resolve().parent
+DEFAULT_SIZES = ('10k', '1m', '10m')
+DEFAULT_FORMATS = ('csv', 'xlsx')
+
+# Stages in pipeline order; 'process_upload' is the whole pipeline as the app runs it
+STAGES = (
+    'read', 'parse_dates', 'day_count', 'working_hours', 'status_filter',
+    'summaries', 'qa_metrics', 'excel_export', 'process_upload',
+)
+
+# QA calculator inputs used for the qa_metrics stage
+QA_INPUTS = {'page_story_count': 120, 'dev_hrs': 1600.0, 'test_hrs': 800.0}
+
+
+def _arrow_bytes():
+    """Bytes held by pyarrow's memory pool (pandas string columns live there)."""
+    try:
+        import pyarrow
+    except ImportError:
+        return 0
+    return pyarrow.total_allocated_bytes()
+
+
+def _max_rss_bytes():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def measure(fn, memory=True):
+    """Run ``fn`` and return its value plus {'seconds', 'peak_bytes', 'arrow_bytes'}.
+
+    ``peak_bytes`` is the tracemalloc peak (Python and numpy allocations) and
+    ``arrow_bytes`` the growth of pyarrow's pool, both from a separate traced
+    run so tracing does not slow the timed one.
+    """
+    started = time.perf_counter()
+    value = fn()
+    stats = {'seconds': round(time.perf_counter() - started, 4)}
+    if memory:
+        arrow_before = _arrow_bytes()
+        tracemalloc.start()
+        try:
+            traced = fn()
+            stats['peak_bytes'] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        stats['arrow_bytes'] = max(0, _arrow_bytes() - arrow_before)
+        del traced
+    return value, stats
+
+
+def run_case(path, memory=True):
+    """Time every stage on one export; per-stage stats plus the process peak RSS."""
+    path = Path(path)
+    stages = {}
+
+    data, stats = measure(path.read_bytes, memory=False)
+    df, stages['read'] = measure(lambda: read_upload(data), memory)
+    stages['read']['seconds'] = round(stages['read']['seconds'] + stats['seconds'], 4)
+
+    parsed, stages['parse_dates'] = measure(lambda: (parse_dates(df['Created']), parse_dates(df['Updated'])), memory)
+    (counted, _), stages['day_count'] = measure(
+        lambda: add_day_counts(df, DEFAULT_SETTINGS['hours_per_day'], parsed), memory
+    )
+    # Precise hours mode on every row (default 09:00-17:00, Mon-Fri window)
+    _, stages['working_hours'] = measure(lambda: working_hour_counts(*parsed), memory)
+    (filtered, _), stages['status_filter'] = measure(
+        lambda: filter_status(counted, DEFAULT_SETTINGS['statuses']), memory
+    )
+    summary, stages['summaries'] = measure(lambda: summarize(filtered), memory)
+    _, stages['qa_metrics'] = measure(lambda: calculate_qa_metrics(summary['variables'], **QA_INPUTS), memory)
+    if len(filtered) <= XLSX_MAX_ROWS:
+        _, stages['excel_export'] = measure(lambda: export_frame(filtered, 'xlsx'), memory)
+    else:
+        stages['excel_export'] = {'skipped': f"{len(filtered):,} rows do not fit in an Excel sheet"}
+
+    del df, parsed, counted, filtered
+    _, stages['process_upload'] = measure(lambda: process_upload(data), memory)
+    return {
+        'file_bytes': len(data),
+        'rows_kept': summary['variables']['total_bugs'],
+        'stages': stages,
+        'max_rss_bytes': _max_rss_bytes(),
+    }
+
+
+def _isolated_case(path, memory):
+    """``run_case`` in a fresh worker process; failures become an 'error' entry."""
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        try:
+            return pool.submit(run_case, path, memory).result()
+        except BrokenProcessPool:
+            return {'error': "worker process died (out of memory?)"}
+        except Exception as e:
+            return {'error': f"{type(e).__name__}: {e}"}
+
+
+def input_path(data_dir, rows, fmt, seed):
+    """Synthetic export for a case, generated on first use and reused afterwards."""
+    path = Path(data_dir) / f"jira_{rows}_seed{seed}.{fmt}"
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        partial = path.with_suffix(f'.partial.{fmt}')
+        write_export(partial, rows, seed)
+        partial.replace(path)
+    return path
+
+
+def _commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=BENCHMARK_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _versions():
+    versions = {}
+    for package in ('pandas', 'numpy', 'openpyxl', 'pyarrow'):
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = None
+    return versions
+
+
+def run_benchmarks(sizes, formats, data_dir, seed=0, memory=True, log=print):
+    """Benchmark every size/format combination; returns the results document."""
+    results = {
+        'created': dt.datetime.now(dt.timezone.utc).isoformat(timespec='seconds'),
+        'commit': _commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'versions': _versions(),
+        'seed': seed,
+        'cases': [],
+    }
+    for rows in sizes:
+        for fmt in formats:
+            case = {'rows': rows, 'format': fmt}
+            if fmt == 'xlsx' and rows > XLSX_MAX_ROWS:
+                case['skipped'] = f"{rows:,} rows do not fit in an Excel sheet"
+            else:
+                log(f"{rows:>12,} rows  {fmt:<5} ...", end=' ', flush=True)
+                case.update(_isolated_case(input_path(data_dir, rows, fmt, seed), memory))
+                log(case.get('error') or f"process_upload {case['stages']['process_upload']['seconds']:.2f}s")
+            results['cases'].append(case)
+    return results
+
+
+def compare_results(old, new):
+    """Lines comparing stage times of two results documents (new / old ratio)."""
+    old_cases = {(case['rows'], case['format']): case for case in old['cases']}
+    lines = [f"{'rows':>12} {'format':<6} {'stage':<15} {'old s':>9} {'new s':>9} {'ratio':>7}"]
+    for case in new['cases']:
+        before = old_cases.get((case['rows'], case['format']))
+        if before is None or 'stages' not in case or 'stages' not in before:
+            continue
+        for stage in STAGES:
+            old_stage = before['stages'].get(stage, {})
+            new_stage = case['stages'].get(stage, {})
+            if 'seconds' not in old_stage or 'seconds' not in new_stage:
+                continue
+            ratio = new_stage['seconds'] / old_stage['seconds'] if old_stage['seconds'] else float('nan')
+            lines.append(f"{case['rows']:>12,} {case['format']:<6} {stage:<15} "
+                         f"{old_stage['seconds']:>9.3f} {new_stage['seconds']:>9.3f} {ratio:>6.2f}x")
+    return lines
+
+
+def _load(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.run',
+                                     description="Time each pipeline stage on synthetic JIRA exports.")
+    parser.add_argument('--sizes', nargs='+', type=parse_rows, default=[parse_rows(size) for size in DEFAULT_SIZES],
+                        help="row counts, e.g. 10k 1m 10m (default: %s)" % ' '.join(DEFAULT_SIZES))
+    parser.add_argument('--formats', nargs='+', choices=DEFAULT_FORMATS, default=list(DEFAULT_FORMATS),
+                        help="input formats (default: %(default)s)")
+    parser.add_argument('--seed', type=int, default=0, help="generator seed (default: %(default)s)")
+    parser.add_argument('--data-dir', default=str(BENCHMARK_DIR / 'data'),
+                        help="where generated exports are kept between runs (default: %(default)s)")
+    parser.add_argument('-o', '--output', help="results file (default: benchmarks/results/<time>_<commit>.json)")
+    parser.add_argument('--no-memory', action='store_true', help="skip the traced runs that measure peak memory")
+    parser.add_argument('--baseline', help="results file to compare this run against")
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help="compare two results files and exit")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.compare:
+        print('\n'.join(compare_results(_load(args.compare[0]), _load(args.compare[1]))))
+        return 0
+
+    results = run_benchmarks(args.sizes, args.formats, args.data_dir, args.seed, memory=not args.no_memory)
+    output = Path(args.output) if args.output else (
+        BENCHMARK_DIR / 'results'
+        / f"{results['created'].replace(':', '').replace('+0000', 'Z')}_{results['commit'] or 'nocommit'}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2), encoding='utf-8')
+    print(f"Results -> {output}")
+
+    if args.baseline:
+        print('\n'.join(compare_results(_load(args.baseline), results)))
+    return 1 if any('error' in case for case in results['cases']) else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
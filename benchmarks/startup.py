@@ -0,0 +1,104 @@
+"""Cold-start cost of the qc_metrics modules and the batch CLI.
+
+    python -m benchmarks.startup                 # every target, 5 fresh interpreters each
+    python -m benchmarks.startup --repeat 20 --top 15
+
+Each target runs in a new interpreter, so nothing is shared between runs; the
+median wall time is reported together with the heavy third-party packages the
+target ended up loading.  ``--top`` lists the slowest imports behind
+``import qc_metrics.pipeline`` from ``python -X importtime``.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+# (name, code run with -c) -- the CLI target goes through ``python -m``
+TARGETS = (
+    ('python', 'pass'),
+    ('import qc_metrics', 'import qc_metrics'),
+    ('import qc_metrics.metrics', 'import qc_metrics.metrics'),
+    ('import qc_metrics.pipeline', 'import qc_metrics.pipeline'),
+    ('import qc_metrics.cli', 'import qc_metrics.cli'),
+)
+CLI_TARGET = ('python -m qc_metrics --help', ['-m', 'qc_metrics', '--help'])
+
+# Packages whose presence after a target is worth reporting
+HEAVY_PACKAGES = ('numpy', 'pandas', 'pyarrow', 'openpyxl', 'streamlit')
+
+_LOADED = f"import sys; print(','.join(p for p in {HEAVY_PACKAGES!r} if p in sys.modules))"
+
+
+def time_command(args, repeat):
+    """Median and minimum seconds of ``python <args>`` over ``repeat`` fresh interpreters."""
+    seconds = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, *args], check=True, capture_output=True)
+        seconds.append(time.perf_counter() - started)
+    return {'median_seconds': round(statistics.median(seconds), 4), 'min_seconds': round(min(seconds), 4)}
+
+
+def loaded_packages(code):
+    """Heavy packages in ``sys.modules`` after running ``code``."""
+    output = subprocess.run(
+        [sys.executable, '-c', f"{code}\n{_LOADED}"], check=True, capture_output=True, text=True,
+    ).stdout.strip().splitlines()
+    return [package for package in output[-1].split(',') if package] if output else []
+
+
+def slowest_imports(code, top):
+    """(cumulative seconds, module) of the ``top`` slowest imports made by ``code``."""
+    stderr = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code], check=True, capture_output=True, text=True,
+    ).stderr
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, module = line[len('import time:'):].split('|')
+        imports.append((int(cumulative) / 1e6, module.strip()))
+    return sorted(imports, reverse=True)[:top]
+
+
+def run_startup(repeat, log=print):
+    results = []
+    for name, code in TARGETS:
+        results.append({'target': name, **time_command(['-c', code], repeat), 'loads': loaded_packages(code)})
+    name, args = CLI_TARGET
+    results.append({'target': name, **time_command(args, repeat), 'loads': None})
+
+    log(f"{'target':<30} {'median s':>9} {'min s':>9}  loads")
+    for result in results:
+        loads = '' if result['loads'] is None else ', '.join(result['loads']) or '-'
+        log(f"{result['target']:<30} {result['median_seconds']:>9.3f} {result['min_seconds']:>9.3f}  {loads}")
+    return results
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.startup',
+                                     description="Time cold imports of qc_metrics and the batch CLI.")
+    parser.add_argument('--repeat', type=int, default=5, help="fresh interpreters per target (default: %(default)s)")
+    parser.add_argument('--top', type=int, default=0, metavar='N',
+                        help="also list the N slowest imports of 'import qc_metrics.pipeline'")
+    parser.add_argument('-o', '--output', help="write the timings as JSON to this file")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    results = run_startup(args.repeat)
+    if args.top:
+        print("\nSlowest imports of 'import qc_metrics.pipeline' (cumulative):")
+        for seconds, module in slowest_imports('import qc_metrics.pipeline', args.top):
+            print(f"{seconds:>9.3f}  {module}")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,61 @@
+"""Computation helpers behind the QC Metric Calculator app.
+
+The functions below work on plain DataFrames (or, for the date helpers, any
+array-like) and need no Streamlit::
+
+    import qc_metrics
+    result = qc_metrics.process_upload(data)
+    metrics = qc_metrics.calculate_qa_metrics(result['variables'], 120, 1600, 800)
+
+Names are imported from their modules on first use, so ``import qc_metrics``
+does not load pandas and a process only pays for the parts it touches.
+"""
+import importlib
+
+# Public name -> module that defines it
+_EXPORTS = {
+    'DEFAULT_SETTINGS': 'pipeline',
+    'PipelineError': 'pipeline',
+    'load_settings': 'pipeline',
+    'read_upload': 'pipeline',
+    'sniff_format': 'ingest',
+    'available_readers': 'ingest',
+    'add_day_counts': 'pipeline',
+    'filter_status': 'pipeline',
+    'summarize': 'pipeline',
+    'process_frame': 'pipeline',
+    'process_upload': 'pipeline',
+    'parse_dates': 'dates',
+    'business_day_counts': 'dates',
+    'working_hour_counts': 'dates',
+    'WORKING_WINDOW': 'dates',
+    'HOURS_PER_DAY': 'dates',
+    'calculate_qa_metrics': 'metrics',
+    'qa_metrics_table': 'metrics',
+    'format_qa_metrics': 'metrics',
+    'build_cube': 'cube',
+    'build_drill_index': 'drill',
+    'process_uploads': 'uploads',
+    'JiraClient': 'jira',
+    'process_jira': 'jira',
+    'stream_csv': 'streaming',
+    'export_frame': 'export',
+    'IngestCache': 'ingest_cache',
+    'IssueStore': 'issue_store',
+    'process_incremental': 'issue_store',
+    'Profiler': 'profiling',
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'{__name__}.{_EXPORTS[name]}'), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted({*globals(), *_EXPORTS})
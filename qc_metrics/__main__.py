@@ -0,0 +1,8 @@
+import sys
+
+from qc_metrics.cli import main
+
+# Guarded so worker processes started with the 'spawn' method (macOS,
+# Windows) can import this module without running the batch again
+if __name__ == '__main__':
+    sys.exit(main())
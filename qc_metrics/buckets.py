@@ -0,0 +1,84 @@
+"""Severity/Priority bucket definitions and the single-pass aggregation over them.
+
+A bucket set is a sequence of ``(label, raw values)`` pairs, e.g.
+``("Critical/Blocker", ("Critical", "Blocker"))``.  Raw values are matched
+exactly; a value listed under more than one bucket counts for the first.
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+SEVERITY_BUCKETS = (
+    ('Major', ('Major',)),
+    ('Minor', ('Minor',)),
+    ('Critical/Blocker', ('Critical', 'Blocker')),
+)
+
+PRIORITY_BUCKETS = (
+    ('Highest/High', ('Highest', 'High')),
+    ('Medium', ('Medium',)),
+    ('Low/Lowest', ('Low', 'Lowest')),
+)
+
+
+def bucket_prefix(label):
+    """Variable prefix for a bucket label ('Critical/Blocker' -> 'critical_blocker')."""
+    return re.sub(r'[^0-9a-z]+', '_', label.lower()).strip('_')
+
+
+def normalize_buckets(buckets):
+    """Bucket set as a tuple of (label, tuple of values); accepts a {label: values} mapping."""
+    if isinstance(buckets, dict):
+        buckets = buckets.items()
+    return tuple(
+        (label, (values,) if isinstance(values, str) else tuple(values))
+        for label, values in buckets
+    )
+
+
+def assign_buckets(values, buckets):
+    """Bucket index of every row (-1 for values outside all buckets).
+
+    The lookup runs on the distinct values only, so the per-row work is one
+    factorize (none for a categorical) and one array take.
+    """
+    lookup = {}
+    for index, (_, raw_values) in enumerate(buckets):
+        for raw in raw_values:
+            lookup.setdefault(raw, index)
+
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        # Categories are already the distinct values
+        codes, uniques = values.cat.codes.to_numpy(), values.cat.categories
+    else:
+        codes, uniques = pd.factorize(values, use_na_sentinel=True)
+    bucket_of_unique = np.fromiter(
+        (lookup.get(value, -1) for value in uniques), dtype=np.intp, count=len(uniques)
+    )
+    # Missing values have code -1, which picks the trailing -1
+    return np.append(bucket_of_unique, -1)[codes]
+
+
+def bucket_totals(bucket_ids, n_buckets, day_count, hours_count):
+    """Bug, day and hour totals for every bucket in one pass.
+
+    Returns arrays of length ``n_buckets``: bugs and days as ints, hours as
+    unrounded floats (working hours are fractional; see ``hours_value``).
+    """
+    matched = bucket_ids >= 0
+    ids = bucket_ids[matched]
+    bugs = np.bincount(ids, minlength=n_buckets)
+    days = np.bincount(ids, weights=np.asarray(day_count)[matched], minlength=n_buckets)
+    hours = np.bincount(ids, weights=np.asarray(hours_count)[matched], minlength=n_buckets)
+    return bugs.astype(np.int64), days.round().astype(np.int64), hours
+
+
+def hours_value(total):
+    """An hour total as a plain number: int when whole (fixed hours per day), else the unrounded float.
+
+    Totals are only rounded for display and export, so sums of chunks, files
+    or groups stay exact.
+    """
+    total = float(total)
+    return int(total) if total.is_integer() else total
@@ -0,0 +1,163 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+
+def content_key(data, settings=None):
+    """Cache key for uploaded bytes processed with the given settings."""
+    digest = hashlib.sha256(data)
+    digest.update(json.dumps(settings or {}, sort_keys=True, default=str).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def uploads_key(files, settings=None):
+    """Cache key for uploads [(bytes, name)] processed together; their order counts."""
+    if len(files) == 1:
+        return content_key(files[0][0], settings)
+    joined = b''.join(hashlib.sha256(data).digest() + name.encode('utf-8') + b'\0' for data, name in files)
+    return content_key(joined, settings)
+
+
+def estimate_nbytes(value):
+    """Rough in-memory size of a pipeline result (DataFrames dominate)."""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, dict):
+        return sum(estimate_nbytes(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(estimate_nbytes(item) for item in value)
+    if isinstance(value, (bytes, bytearray, str)):
+        return len(value)
+    # numpy arrays, and structures built from them that report their own size
+    nbytes = getattr(value, 'nbytes', None)
+    if isinstance(nbytes, int):
+        return nbytes
+    return 64
+
+
+class ResultCache:
+    """LRU cache of pipeline results bounded by their approximate memory.
+
+    The most recently stored entry is always kept, even if it alone is over
+    budget, so reruns on a very large upload still hit the cache.
+    ``on_evict(value)`` is called for every entry dropped from the cache.
+    Safe to share between threads (e.g. every session of a Streamlit
+    server): callers of ``get_or_compute`` asking for a key that is being
+    computed wait for that result instead of computing it again.
+    """
+
+    def __init__(self, max_bytes, on_evict=None):
+        self.max_bytes = max_bytes
+        self.on_evict = on_evict
+        # key -> {'value', 'nbytes', 'hits', 'stored', 'used'} in LRU order
+        self._entries = OrderedDict()
+        self._pending = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.waits = 0
+
+    def _hit(self, key, entry):
+        self._entries.move_to_end(key)
+        entry['hits'] += 1
+        entry['used'] = time.time()
+        self.hits += 1
+        return entry['value']
+
+    def get(self, key):
+        """Return the cached value for ``key`` (marking it recently used) or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            return self._hit(key, entry)
+
+    def put(self, key, value, nbytes=None):
+        """Store ``value`` and evict least recently used entries over budget."""
+        nbytes = estimate_nbytes(value) if nbytes is None else nbytes
+        now = time.time()
+        with self._lock:
+            self._entries[key] = {'value': value, 'nbytes': nbytes, 'hits': 0, 'stored': now, 'used': now}
+            self._entries.move_to_end(key)
+            evicted = []
+            while len(self._entries) > 1 and self.nbytes > self.max_bytes:
+                evicted.append(self._entries.popitem(last=False)[1]['value'])
+                self.evictions += 1
+        if self.on_evict is not None:
+            for old in evicted:
+                self.on_evict(old)
+
+    def get_or_compute(self, key, compute):
+        """Cached value for ``key``, calling ``compute()`` and storing it on a miss.
+
+        While one caller computes a key, others asking for it block until it
+        is stored (and compute it themselves only if that failed).
+        """
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    return self._hit(key, entry)
+                pending = self._pending.get(key)
+                if pending is None:
+                    self.misses += 1
+                    self._pending[key] = threading.Event()
+                    break
+                self.waits += 1
+            pending.wait()
+        try:
+            value = compute()
+            self.put(key, value)
+        finally:
+            with self._lock:
+                self._pending.pop(key).set()
+        return value
+
+    def clear(self):
+        with self._lock:
+            evicted = [entry['value'] for entry in self._entries.values()]
+            self._entries.clear()
+        if self.on_evict is not None:
+            for old in evicted:
+                self.on_evict(old)
+
+    @property
+    def nbytes(self):
+        return sum(entry['nbytes'] for entry in self._entries.values())
+
+    def stats(self):
+        """Hit/miss counters and current usage."""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'waits': self.waits,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'computing': len(self._pending),
+                'bytes': self.nbytes,
+                'max_bytes': self.max_bytes,
+            }
+
+    def entries(self):
+        """One dict per cached result, most recently used first: key, bytes, hits and ages in seconds."""
+        now = time.time()
+        with self._lock:
+            return [
+                {
+                    'key': key,
+                    'bytes': entry['nbytes'],
+                    'hits': entry['hits'],
+                    'age_seconds': round(now - entry['stored'], 1),
+                    'idle_seconds': round(now - entry['used'], 1),
+                }
+                for key, entry in reversed(self._entries.items())
+            ]
@@ -0,0 +1,400 @@
+"""Headless batch mode: process many JIRA exports without the Streamlit UI.
+
+    python -m qc_metrics exports/ --output-dir out/ --workers 8
+
+Each input gets ``<name>_day_count.xlsx`` (enriched sheet plus Severity,
+Priority and QA Metrics sheets) and the run writes one ``rollup.csv`` with a
+row per file and a TOTAL row.  With ``--stream`` CSV inputs are processed in
+chunks: the enriched rows go to ``<name>_day_count.csv`` as they are produced
+and the summaries to ``<name>_summary.xlsx``.  With ``--issue-store`` each
+file is processed incrementally against the results kept for its name, so
+re-running on tomorrow's exports only re-processes changed issues.
+``--jira-url`` with ``--jql`` adds the issues of a JQL query, fetched straight
+from the JIRA search API, as one more input (``<jira-name>_day_count.xlsx``).
+
+pandas and the pipeline modules are imported where they are first needed,
+so ``--help``, argument errors and ``--purge-ingest-cache`` return at once.
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from qc_metrics.ingest_cache import CACHE_DIR, DEFAULT_DIRECTORY, IngestCache
+from qc_metrics.metrics import calculate_qa_metrics, qa_metrics_table
+from qc_metrics.profiling import Profiler, configure_profile_log, log_profile
+
+INPUT_SUFFIXES = ('.csv', '.csv.gz', '.xlsx', '.xls')
+CSV_SUFFIXES = ('.csv', '.csv.gz')
+
+
+def find_inputs(paths):
+    """Expand files and directories (non-recursive) into a sorted list of exports."""
+    inputs = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            inputs.extend(sorted(p for p in path.iterdir() if p.name.lower().endswith(INPUT_SUFFIXES)))
+        else:
+            inputs.append(path)
+    return inputs
+
+
+def export_stem(path):
+    """File name without its export suffix ('.csv.gz' counts as one)."""
+    for suffix in INPUT_SUFFIXES:
+        if path.name.lower().endswith(suffix):
+            return path.name[:-len(suffix)]
+    return path.stem
+
+
+def check_stems(inputs, jira_name=None):
+    """Raise ValueError if two inputs share a stem and would write the same outputs.
+
+    Output files and issue store datasets are named after the stem, so
+    'a/export.csv' and 'b/export.xlsx' clash; so does a file named after the
+    JIRA query's ``jira_name``.  Stems are compared case-insensitively, as
+    on the file systems of macOS and Windows.
+    """
+    named = {}
+    for path in inputs:
+        named.setdefault(export_stem(Path(path)).casefold(), []).append(str(path))
+    if jira_name is not None:
+        named.setdefault(jira_name.casefold(), []).append(f"--jira-name {jira_name}")
+    clashes = ['; '.join(sources) for sources in named.values() if len(sources) > 1]
+    if clashes:
+        raise ValueError("inputs with the same name would overwrite each other's outputs: "
+                         + ' | '.join(clashes) + "; rename them or process them in separate runs")
+
+
+def _qa_inputs(variables, pages, dev_hours, test_hours):
+    """QA calculator inputs; hours default to the total like the app's auto-fill."""
+    total_hours = float(variables['total_hours'])
+    return (
+        pages,
+        total_hours if dev_hours is None else dev_hours,
+        total_hours if test_hours is None else test_hours,
+    )
+
+
+def process_file(path, output_dir, settings=None, pages=0, dev_hours=None, test_hours=None,
+                 stream_rows=None, ingest_dir=None, issue_store=None):
+    """Process one export and write its workbook; returns the roll-up row.
+
+    Runs inside a worker process, so only the small summary goes back to the
+    parent and the enriched frame never crosses the process boundary.
+    ``stream_rows`` switches CSV inputs to chunked processing and
+    ``ingest_dir`` reads other inputs through an on-disk ``IngestCache``.
+    ``issue_store`` processes non-streamed inputs incrementally against the
+    ``IssueStore`` at that path, one dataset per file stem.
+    """
+    from qc_metrics.pipeline import process_upload
+    from qc_metrics.streaming import stream_csv
+
+    started = time.perf_counter()
+    path = Path(path)
+    output_dir = Path(output_dir)
+    row = {'file': path.name}
+    stem = export_stem(path)
+    streaming = bool(stream_rows) and path.name.lower().endswith(CSV_SUFFIXES)
+    profiler = Profiler()
+    try:
+        if streaming:
+            output_path = output_dir / f"{stem}_day_count.csv"
+            result = stream_csv(path, str(output_path), settings, chunksize=stream_rows, profiler=profiler)
+        else:
+            ingest_cache = IngestCache(ingest_dir) if ingest_dir else None
+            if issue_store is not None:
+                from qc_metrics.issue_store import DEFAULT_PATH, IssueStore, process_upload_incremental
+
+                result = process_upload_incremental(
+                    path.read_bytes(), IssueStore(issue_store or DEFAULT_PATH), stem,
+                    settings, ingest_cache, profiler,
+                )
+            else:
+                result = process_upload(path.read_bytes(), settings, ingest_cache, profiler)
+    except Exception as e:
+        if streaming and output_path.exists():
+            output_path.unlink()
+        return {**row, 'error': str(e)}
+
+    if not streaming:
+        output_path = output_dir / f"{stem}_day_count.xlsx"
+    return finish_row(row, result, output_dir, stem, output_path, streaming, pages, dev_hours, test_hours,
+                      profiler, started)
+
+
+def finish_row(row, result, output_dir, stem, output_path, streaming, pages, dev_hours, test_hours,
+               profiler, started):
+    """Write the workbook of a processed input and return its roll-up row."""
+    import pandas as pd
+
+    from qc_metrics.export import frame_chunks, rounded_hours, write_xlsx
+
+    variables = result['variables']
+    metrics = calculate_qa_metrics(variables, *_qa_inputs(variables, pages, dev_hours, test_hours))
+
+    workbook_path = output_dir / f"{stem}_{'summary' if streaming else 'day_count'}.xlsx"
+    metrics_df = pd.DataFrame(metrics)
+    metrics_df.columns = ["Metric Name", "Value"]
+    sheets = [] if streaming else [('Sheet1', frame_chunks(rounded_hours(result['df'])))]
+    sheets += [
+        # Hour totals are unrounded floats in the working hours mode; rounded only here
+        ('Severity', [pd.DataFrame(result['severity_summary']).round(2)]),
+        ('Priority', [pd.DataFrame(result['priority_summary']).round(2)]),
+        ('QA Metrics', [metrics_df]),
+    ]
+    with profiler.stage('export_xlsx', len(result['df'])) as stage:
+        write_xlsx(workbook_path, sheets)
+        stage['rows_out'] = len(result['df'])
+
+    return {
+        **row,
+        **variables,
+        'output': str(output_path),
+        'seconds': round(time.perf_counter() - started, 3),
+        'profile': profiler.records(),
+    }
+
+
+def process_jira_query(jira, output_dir, settings=None, pages=0, dev_hours=None, test_hours=None, issue_store=None):
+    """Fetch and process the issues of a JQL query; returns the roll-up row.
+
+    ``jira`` holds 'jql', 'name' (the output file stem and issue store
+    dataset) and the ``jira.JiraClient`` arguments.
+    """
+    from qc_metrics.jira import JiraClient, process_jira
+
+    started = time.perf_counter()
+    output_dir = Path(output_dir)
+    jira = dict(jira)
+    jql, stem = jira.pop('jql'), jira.pop('name')
+    row = {'file': f"JIRA: {jql}"}
+    profiler = Profiler()
+    try:
+        store = None
+        if issue_store is not None:
+            from qc_metrics.issue_store import DEFAULT_PATH, IssueStore
+
+            store = IssueStore(issue_store or DEFAULT_PATH)
+        with JiraClient(**jira) as client:
+            result = process_jira(client, jql, settings, profiler, store, stem)
+    except Exception as e:
+        return {**row, 'error': str(e)}
+    return finish_row(row, result, output_dir, stem, output_dir / f"{stem}_day_count.xlsx", False,
+                      pages, dev_hours, test_hours, profiler, started)
+
+
+def build_rollup(rows, pages=0, dev_hours=None, test_hours=None):
+    """One row per file plus a TOTAL row computed from the summed variables.
+
+    The QA metrics of every row are computed in one batch and kept numeric
+    (empty where the calculator shows "-"), so the roll-up sorts and
+    aggregates like the rest of its columns.
+    """
+    import pandas as pd
+
+    rollup = pd.DataFrame(rows)
+    ok = [row for row in rows if 'error' not in row]
+    if not ok:
+        return rollup
+    variables = {
+        name: sum(row[name] for row in ok)
+        for name in ok[0]
+        if name.endswith(('_count', '_bugs', '_hours'))
+    }
+    rollup = pd.concat([rollup, pd.DataFrame([{'file': 'TOTAL', **variables}])], ignore_index=True)
+    done = rollup['error'].isna() if 'error' in rollup.columns else pd.Series(True, index=rollup.index)
+    inputs = rollup[done]
+    # Each file counts ``pages``; the TOTAL row all of them
+    page_story_count = pd.Series(pages, index=inputs.index)
+    page_story_count.iloc[-1] = pages * len(ok)
+    metrics = qa_metrics_table(inputs.assign(
+        page_story_count=page_story_count,
+        dev_hrs=inputs['total_hours'] if dev_hours is None else dev_hours,
+        test_hrs=inputs['total_hours'] if test_hours is None else test_hours,
+    ))
+    return rollup.join(metrics)
+
+
+def run_batch(inputs, output_dir, workers=None, chunksize=1, settings=None,
+              pages=0, dev_hours=None, test_hours=None, stream_rows=None, ingest_dir=None, issue_store=None,
+              jira=None):
+    """Process ``inputs`` across a process pool and return the roll-up frame.
+
+    A ``jira`` query (see ``process_jira_query``) is fetched and processed in
+    this process while the pool works on the files; its row comes last.
+    Stage timings of every file are written to the profile log, if one is
+    configured, from this process.  Inputs that would write the same
+    outputs raise ValueError before anything is processed (see
+    ``check_stems``).
+    """
+    check_stems(inputs, None if jira is None else jira['name'])
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    count = len(inputs)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        file_rows = pool.map(
+            process_file,
+            inputs,
+            [output_dir] * count,
+            [settings] * count,
+            [pages] * count,
+            [dev_hours] * count,
+            [test_hours] * count,
+            [stream_rows] * count,
+            [ingest_dir] * count,
+            [issue_store] * count,
+            chunksize=chunksize,
+        )
+        jira_rows = [] if jira is None else [
+            process_jira_query(jira, output_dir, settings, pages, dev_hours, test_hours, issue_store)
+        ]
+        rows = [*file_rows, *jira_rows]
+    for row in rows:
+        profile = row.pop('profile', None)
+        if profile:
+            log_profile(profile, event='batch_file', file=row['file'], rows_out=row.get('total_bugs'))
+    return build_rollup(rows, pages, dev_hours, test_hours)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='python -m qc_metrics',
+        description="Calculate day counts, severity/priority summaries and QA metrics for JIRA exports.",
+    )
+    parser.add_argument('inputs', nargs='*', help="CSV (also .csv.gz)/XLSX files or directories containing them")
+    parser.add_argument('-o', '--output-dir', default='qc_output', help="where results are written (default: %(default)s)")
+    parser.add_argument('-w', '--workers', type=int, default=os.cpu_count(),
+                        help="worker processes (default: CPU count, %(default)s)")
+    parser.add_argument('--chunksize', type=int, default=1,
+                        help="files handed to a worker at a time (default: %(default)s)")
+    parser.add_argument('--stream', action='store_true',
+                        help="process CSV inputs in chunks with bounded memory; enriched rows are written as CSV")
+    parser.add_argument('--stream-rows', type=int,
+                        help="rows per chunk with --stream (default: 100000)")
+    parser.add_argument('--ingest-cache', nargs='?', const=str(DEFAULT_DIRECTORY), metavar='DIR',
+                        help="reuse read + date-parsed inputs from an on-disk Arrow cache (default dir: %(const)s)")
+    parser.add_argument('--purge-ingest-cache', action='store_true',
+                        help="empty the ingest cache directory before processing")
+    parser.add_argument('--issue-store', nargs='?', const='', metavar='PATH',
+                        help="process inputs incrementally, reusing per-issue results kept in this SQLite file "
+                             f"under each file's name (default: {CACHE_DIR / 'issues.sqlite'}; "
+                             "not used with --stream for CSV)")
+    parser.add_argument('--jira-url', metavar='URL',
+                        help="also fetch issues straight from this JIRA site (needs --jql; the API token is read "
+                             "from the JIRA_API_TOKEN environment variable)")
+    parser.add_argument('--jql', help="JQL query for --jira-url, e.g. 'project = QA AND issuetype = Bug'")
+    parser.add_argument('--jira-user', metavar='EMAIL',
+                        help="user for basic auth with the API token (default: the token is a personal access token)")
+    parser.add_argument('--jira-name', default='jira', metavar='NAME',
+                        help="output file stem and issue store dataset of the JIRA query (default: %(default)s)")
+    parser.add_argument('--jira-concurrency', type=int, default=4, metavar='N',
+                        help="JIRA pages fetched at once on Server / Data Center (default: %(default)s)")
+    parser.add_argument('--jira-api', choices=('cloud', 'server'),
+                        help="search API of the JIRA site: cloud (/rest/api/3/search/jql, token paging) or server "
+                             "for Server / Data Center (/rest/api/2/search) (default: cloud for *.atlassian.net)")
+    parser.add_argument('--profile-log', metavar='PATH',
+                        help="append per-stage timings of every file to this JSON-lines log")
+    parser.add_argument('--config', help="JSON file overriding pipeline settings (statuses, hours, severity/priority buckets)")
+    parser.add_argument('--status', action='append', dest='statuses',
+                        help="Status value to keep; repeat for several (default: Done, Merge Request)")
+    parser.add_argument('--reader', default='auto',
+                        help="ingest backend: pandas or pyarrow (CSV), calamine, openpyxl or xlrd (Excel); "
+                             "files it cannot read use the default for their format (default: %(default)s)")
+    parser.add_argument('--slim', action='store_true',
+                        help="read only the columns the calculation needs (much faster for wide exports)")
+    parser.add_argument('--keep-column', action='append', dest='keep_columns', metavar='NAME',
+                        help="with --slim, also keep this column in the output; repeat for several")
+    parser.add_argument('--working-hours', metavar='START-END',
+                        help="count actual working hours from Created to Updated inside this daily window, "
+                             "e.g. 09:00-17:00 (default: hours per day for every day counted)")
+    parser.add_argument('--holiday', action='append', dest='holidays', metavar='YYYY-MM-DD',
+                        help="with --working-hours, a day off besides weekends; repeat for several")
+    parser.add_argument('--pages', type=int, default=0, help="Pages/Stories count per file for defect density")
+    parser.add_argument('--dev-hours', type=float, help="Development hours (default: the file's total hours)")
+    parser.add_argument('--test-hours', type=float, help="Testing hours (default: the file's total hours)")
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.purge_ingest_cache:
+        removed = IngestCache(args.ingest_cache or DEFAULT_DIRECTORY).purge()
+        print(f"Removed {removed} cached file(s).")
+        if not args.inputs:
+            return 0
+    if bool(args.jira_url) != bool(args.jql):
+        parser.error("--jira-url and --jql go together")
+    if not args.inputs and not args.jira_url:
+        parser.error("no inputs given")
+
+    inputs = find_inputs(args.inputs)
+    if not inputs and not args.jira_url:
+        print("No CSV/XLSX exports found.", file=sys.stderr)
+        return 2
+    jira = None
+    if args.jira_url:
+        token = os.environ.get('JIRA_API_TOKEN')
+        jira = {
+            'jql': args.jql, 'name': args.jira_name, 'base_url': args.jira_url,
+            'auth': (args.jira_user, token or '') if args.jira_user else token,
+            'concurrency': args.jira_concurrency, 'api': args.jira_api,
+        }
+    try:
+        check_stems(inputs, args.jira_name if jira else None)
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.profile_log:
+        configure_profile_log(args.profile_log)
+
+    from qc_metrics.ingest import READERS
+    from qc_metrics.pipeline import load_settings
+    from qc_metrics.streaming import DEFAULT_CHUNKSIZE
+
+    if args.reader not in ('auto', *READERS):
+        parser.error(f"--reader must be one of auto, {', '.join(READERS)}")
+    settings = load_settings(args.config)
+    if args.reader != 'auto':
+        settings['reader'] = args.reader
+    if args.statuses:
+        settings['statuses'] = tuple(args.statuses)
+    if args.slim or args.keep_columns:
+        settings['keep_columns'] = tuple(args.keep_columns or ())
+    if args.holidays and not args.working_hours and settings['working_hours'] is None:
+        parser.error("--holiday needs --working-hours")
+    if args.working_hours or args.holidays:
+        from qc_metrics.dates import normalize_window
+
+        window = dict(settings['working_hours'] or {})
+        if args.working_hours:
+            window['start'], _, window['end'] = args.working_hours.partition('-')
+        if args.holidays:
+            window['holidays'] = (*window.get('holidays', ()), *args.holidays)
+        try:
+            settings['working_hours'] = normalize_window(window)
+        except ValueError as e:
+            parser.error(f"--working-hours: {e}")
+
+    started = time.perf_counter()
+    rollup = run_batch(
+        inputs, args.output_dir, workers=args.workers, chunksize=args.chunksize, settings=settings,
+        pages=args.pages, dev_hours=args.dev_hours, test_hours=args.test_hours,
+        stream_rows=(args.stream_rows or DEFAULT_CHUNKSIZE) if args.stream else None, ingest_dir=args.ingest_cache,
+        issue_store=args.issue_store, jira=jira,
+    )
+    rollup_path = Path(args.output_dir) / 'rollup.csv'
+    # Hour totals are summed unrounded and only rounded for the file
+    hours_columns = [col for col in rollup.columns if col.endswith(('_hours_count', 'total_hours'))]
+    rollup.round({col: 2 for col in hours_columns}).to_csv(rollup_path, index=False)
+
+    failed = rollup[rollup['error'].notna()] if 'error' in rollup.columns else rollup.iloc[0:0]
+    for _, row in failed.iterrows():
+        print(f"{row['file']}: {row['error']}", file=sys.stderr)
+    count = len(inputs) + (jira is not None)
+    print(f"Processed {count - len(failed)}/{count} input(s) in "
+          f"{time.perf_counter() - started:.1f}s -> {rollup_path}")
+    return 1 if len(failed) else 0
@@ -0,0 +1,204 @@
+"""Pre-aggregated period x severity x priority cube for trend metrics.
+
+One pass over the enriched rows fills dense arrays of bug, day and hour
+totals indexed by period (ISO week or a sprint calendar), severity bucket
+and priority bucket, with a trailing "other" slot on each bucket axis for
+values outside every bucket.  The summary variables of any period (or run
+of periods) are then sums over a slice of the cube, so per-period QA
+metrics cost O(buckets) instead of a rescan of the rows.
+"""
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+
+from qc_metrics.buckets import assign_buckets, bucket_prefix, hours_value
+from qc_metrics.dates import parse_dates
+from qc_metrics.metrics import qa_metrics_table
+from qc_metrics.pipeline import DEFAULT_SETTINGS, PipelineError, severity_column
+
+PERIOD_DATE_COLUMNS = ('Created', 'Updated')
+
+
+def parse_sprint_calendar(text):
+    """Sprints from lines of ``name, start, end`` (dates as YYYY-MM-DD, end inclusive).
+
+    Blank lines and lines starting with '#' are skipped.
+    """
+    sprints = []
+    for number, line in enumerate(text.splitlines(), start=1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        parts = [part.strip() for part in line.rsplit(',', 2)]
+        try:
+            name, start, end = parts
+            start, end = dt.date.fromisoformat(start), dt.date.fromisoformat(end)
+        except ValueError:
+            raise PipelineError(f"Sprint calendar line {number}: expected 'name, YYYY-MM-DD, YYYY-MM-DD'") from None
+        if end < start:
+            raise PipelineError(f"Sprint calendar line {number}: '{name}' ends before it starts")
+        sprints.append((name, start, end))
+    return sprints
+
+
+def _week_periods(days):
+    """(period index per row, labels, start dates) for ISO weeks."""
+    # 1970-01-01 was a Thursday, so Monday-based weekday = (days + 3) % 7
+    mondays = days - (days.astype(np.int64) + 3) % 7
+    starts, codes = np.unique(mondays, return_inverse=True)
+    labels = []
+    for start in starts.astype(dt.date):
+        year, week, _ = start.isocalendar()
+        labels.append(f"{year}-W{week:02d}")
+    return codes, labels, starts
+
+
+def _sprint_periods(days, sprints):
+    """(period index per row, -1 outside every sprint; labels; start dates) for a sprint calendar."""
+    sprints = sorted(sprints, key=lambda sprint: sprint[1])
+    starts = np.array([start for _, start, _ in sprints], dtype='datetime64[D]')
+    ends = np.array([end for _, _, end in sprints], dtype='datetime64[D]')
+    for previous, current in zip(sprints, sprints[1:]):
+        if current[1] <= previous[2]:
+            raise PipelineError(f"Sprints '{previous[0]}' and '{current[0]}' overlap")
+    codes = np.searchsorted(starts, days, side='right') - 1
+    inside = codes >= 0
+    inside[inside] = days[inside] <= ends[codes[inside]]
+    codes[~inside] = -1
+    return codes, [name for name, _, _ in sprints], starts
+
+
+def cell_variables(bugs, days, hours, settings, has_severity, has_priority):
+    """Summary variables (as ``pipeline.summary_variables``) from (severity + 1, priority + 1) totals."""
+    variables = {}
+    for axis, buckets, present in ((1, 'severity_buckets', has_severity), (0, 'priority_buckets', has_priority)):
+        # Summing over the other bucket axis leaves this one
+        totals = [total.sum(axis=axis) for total in (bugs, days, hours)]
+        for position, (label, _) in enumerate(settings[buckets]):
+            prefix = bucket_prefix(label)
+            bug_total, day_total, hour_total = (total[position] for total in totals)
+            variables[f'{prefix}_bug_count'] = int(round(bug_total)) if present else 0
+            variables[f'{prefix}_day_count'] = int(round(day_total)) if present else 0
+            variables[f'{prefix}_hours_count'] = hours_value(hour_total) if present else 0
+    variables['total_bugs'] = int(bugs.sum())
+    variables['total_hours'] = hours_value(hours.sum())
+    variables['total_day_count'] = int(round(days.sum()))
+    return variables
+
+
+def metrics_frame(variable_rows, page_story_count=0):
+    """``metrics.qa_metrics_table`` of summary variables dicts, in one batch (NaN where a metric is "-").
+
+    Development and testing hours default to each row's total hours, as in
+    the app.
+    """
+    inputs = pd.DataFrame(list(variable_rows))
+    hours = inputs['total_hours'] if 'total_hours' in inputs.columns else 0
+    return qa_metrics_table(inputs.assign(page_story_count=page_story_count, dev_hrs=hours, test_hrs=hours))
+
+
+class TrendCube:
+    """Bug/day/hour totals by period, severity bucket and priority bucket.
+
+    ``bugs``, ``days`` and ``hours`` have shape (periods, severity buckets + 1,
+    priority buckets + 1); the last slot of a bucket axis holds rows outside
+    every bucket (or all rows when the export has no such column).  Hours are
+    unrounded floats.
+    """
+
+    def __init__(self, labels, starts, bugs, days, hours, settings, has_severity, has_priority):
+        self.labels = list(labels)
+        self.starts = starts
+        self.bugs = bugs
+        self.days = days
+        self.hours = hours
+        self.settings = settings
+        self.has_severity = has_severity
+        self.has_priority = has_priority
+
+    def __len__(self):
+        return len(self.labels)
+
+    @property
+    def nbytes(self):
+        """Bytes held by the totals (for cache budgets)."""
+        return int(self.bugs.nbytes + self.days.nbytes + self.hours.nbytes + self.starts.nbytes)
+
+    def variables(self, periods=None):
+        """Summary variables (as ``pipeline.summary_variables``) of the given period indexes (default all)."""
+        index = slice(None) if periods is None else np.atleast_1d(periods)
+        bugs, days, hours = (cube[index].sum(axis=0) for cube in (self.bugs, self.days, self.hours))
+        return cell_variables(bugs, days, hours, self.settings, self.has_severity, self.has_priority)
+
+    def period_totals(self):
+        """One row per period: start date, bug/day/hour totals and bugs per severity bucket."""
+        frame = pd.DataFrame({
+            'Period': self.labels,
+            'Start': pd.to_datetime(self.starts),
+            'Bug count': self.bugs.sum(axis=(1, 2)),
+            'Day count': self.days.sum(axis=(1, 2)),
+            'Hours count': self.hours.sum(axis=(1, 2)),
+        })
+        if self.has_severity:
+            for position, (label, _) in enumerate(self.settings['severity_buckets']):
+                frame[f'{label} bugs'] = self.bugs[:, position, :].sum(axis=1)
+        return frame
+
+    def period_metrics(self, page_story_count=0):
+        """``calculate_qa_metrics`` for every period, as numbers (NaN where a metric is "-").
+
+        Development and testing hours default to each period's total hours,
+        as in the app.
+        """
+        frame = metrics_frame([self.variables(period) for period in range(len(self))], page_story_count)
+        frame.insert(0, 'Period', self.labels)
+        return frame
+
+
+def build_cube(df, settings=None, date_column='Created', sprints=None, dates=None):
+    """``TrendCube`` of an enriched frame (``pipeline.process_upload(...)['df']``).
+
+    Rows are placed by ``date_column``, or by already parsed ``dates`` if
+    given, into ISO weeks or, with ``sprints`` [(name, start, end)], into
+    sprints (rows outside every sprint are left out).
+    """
+    settings = {**DEFAULT_SETTINGS, **(settings or {})}
+    if dates is None:
+        if date_column not in PERIOD_DATE_COLUMNS:
+            raise ValueError(f"date_column must be one of {', '.join(PERIOD_DATE_COLUMNS)}")
+        dates = parse_dates(df[date_column])
+    dates = pd.Series(dates)
+    if getattr(dates.dt, 'tz', None) is not None:
+        dates = dates.dt.tz_localize(None)
+    days = dates.to_numpy(dtype='datetime64[D]')
+    valid = ~np.isnat(days)
+
+    if sprints:
+        codes, labels, starts = _sprint_periods(days[valid], sprints)
+    else:
+        codes, labels, starts = _week_periods(days[valid])
+    rows = np.flatnonzero(valid)[codes >= 0]
+    codes = codes[codes >= 0]
+
+    sev_col = severity_column(df.columns)
+    n_sev = len(settings['severity_buckets']) + 1
+    n_pri = len(settings['priority_buckets']) + 1
+    # Values outside every bucket (-1) go to the trailing "other" slot
+    sev = np.full(len(rows), n_sev - 1)
+    pri = np.full(len(rows), n_pri - 1)
+    if sev_col is not None:
+        sev = assign_buckets(df[sev_col].take(rows), settings['severity_buckets']) % n_sev
+    if 'Priority' in df.columns:
+        pri = assign_buckets(df['Priority'].take(rows), settings['priority_buckets']) % n_pri
+
+    cell = (codes * n_sev + sev) * n_pri + pri
+    size = len(labels) * n_sev * n_pri
+    shape = (len(labels), n_sev, n_pri)
+    bugs = np.bincount(cell, minlength=size).reshape(shape)
+    days = np.bincount(cell, weights=df['Day count'].to_numpy()[rows].astype(np.float64), minlength=size)
+    # Hours stay unrounded floats; working hours are fractional
+    hours = np.bincount(cell, weights=df['Hours count'].to_numpy()[rows].astype(np.float64), minlength=size)
+    return TrendCube(labels, starts, bugs.astype(np.int64), days.round().astype(np.int64).reshape(shape),
+                     hours.reshape(shape), settings,
+                     has_severity=sev_col is not None, has_priority='Priority' in df.columns)
@@ -0,0 +1,323 @@
+import functools
+import re
+import warnings
+
+import numpy as np
+import pandas as pd
+
+# Pattern: DD-MM-YY HH:MM or DD-MM-YY
+_DD_MM_YY_RE = re.compile(r'^(\d{1,2})-(\d{1,2})-(\d{2})(\s+(\d{1,2}):(\d{2}))?')
+
+# Only dates inside this window are accepted
+MIN_YEAR = 1900
+MAX_YEAR = 2100
+
+
+def parse_date_dd_mm_yy(date_val):
+    """Parse dates in DD-MM-YY format (e.g., 11-12-25 = 11 Dec 2025)"""
+    if pd.isna(date_val):
+        return pd.NaT
+
+    if isinstance(date_val, pd.Timestamp):
+        return date_val
+
+    date_str = str(date_val).strip()
+
+    # First, try to parse DD-MM-YY format explicitly (most common in your data)
+    match = _DD_MM_YY_RE.match(date_str)
+    if match:
+        dd, mm, yy = match.groups()[0], match.groups()[1], match.groups()[2]
+        time_part = match.groups()[4] if match.groups()[4] and match.groups()[5] else ''
+        min_part = match.groups()[5] if match.groups()[5] else ''
+
+        # Convert 2-digit year: 00-50 -> 2000-2050, 51-99 -> 1951-1999
+        year = int(yy)
+        if year <= 50:
+            year = 2000 + year
+        else:
+            year = 1900 + year
+
+        # Format: YYYY-MM-DD HH:MM
+        if time_part:
+            fixed_date = f"{year}-{mm.zfill(2)}-{dd.zfill(2)} {time_part.zfill(2)}:{min_part}"
+        else:
+            fixed_date = f"{year}-{mm.zfill(2)}-{dd.zfill(2)}"
+
+        parsed = pd.to_datetime(fixed_date, errors='coerce')
+        if pd.notna(parsed) and MIN_YEAR <= parsed.year <= MAX_YEAR:
+            return parsed
+
+    # Fallback: Try pandas parsing with dayfirst=True
+    parsed = pd.to_datetime(date_str, errors='coerce', dayfirst=True)
+    if pd.notna(parsed) and MIN_YEAR <= parsed.year <= MAX_YEAR:
+        return parsed
+
+    return pd.NaT
+
+
+def _datetime_dtype():
+    """dtype pandas gives to parsed date strings (ns on pandas 2, us on pandas 3)."""
+    return pd.to_datetime(pd.Series(['2000-01-01 00:00'])).dtype
+
+
+def _fixed_date(match):
+    """ISO string the DD-MM-YY branch would hand to ``pd.to_datetime``."""
+    if match is None:
+        return None
+    dd, mm, yy, _, hh, mi = match.groups()
+    # Convert 2-digit year: 00-50 -> 2000-2050, 51-99 -> 1951-1999
+    year = int(yy)
+    year = 2000 + year if year <= 50 else 1900 + year
+    time_part = f"{hh.zfill(2)}:{mi}" if hh and mi else "00:00"
+    return f"{year}-{mm.zfill(2)}-{dd.zfill(2)} {time_part}"
+
+
+def _parse_dd_mm_yy_column(strs):
+    """Column version of the explicit DD-MM-YY [HH:MM] branch.
+
+    Each value is rewritten to the same ``YYYY-MM-DD HH:MM`` string the scalar
+    parser builds and the whole column is then parsed with one fixed format.
+    Returns NaT where the branch does not apply so the caller can send the
+    leftovers to the dayfirst fallback.
+    """
+    fixed = [_fixed_date(match) for match in map(_DD_MM_YY_RE.match, strs)]
+    parsed = pd.to_datetime(pd.Series(fixed, index=strs.index, dtype=object),
+                            format='%Y-%m-%d %H:%M', errors='coerce')
+    return parsed.astype(_datetime_dtype())
+
+
+def _parse_dayfirst_column(strs):
+    """Column version of the ``pd.to_datetime(..., dayfirst=True)`` fallback.
+
+    pandas guesses one format per call, so values are grouped by their shape
+    (digits masked) and by which of the leading numbers could be a month; each
+    group then parses in a single call exactly as a scalar would.  Anything the
+    group format rejects is retried one value at a time.
+    """
+    shape = strs.str.replace(r'\d', '9', regex=True)
+    numbers = strs.str.extract(r'(\d+)\D+(\d+)\D+(\d+)')
+    keys = shape + '|'
+    for col in numbers.columns:
+        month_like = pd.to_numeric(numbers[col], errors='coerce') <= 12
+        keys = keys + np.where(numbers[col].isna(), 'n', np.where(month_like, 's', 'l'))
+
+    parsed = pd.Series(pd.NaT, index=strs.index, dtype=_datetime_dtype())
+    tz_values = {}
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        for _, group in strs.groupby(keys, sort=False):
+            values = pd.to_datetime(group, errors='coerce', dayfirst=True)
+            if not isinstance(values.dtype, np.dtype):
+                # Timezone offsets cannot live in a naive column; keep them as scalars
+                for idx, val in group.items():
+                    tz_values[idx] = pd.to_datetime(val, errors='coerce', dayfirst=True)
+                continue
+            retry = values.isna()
+            parsed[values.index[~retry]] = values[~retry].astype(parsed.dtype).to_numpy()
+            for idx, val in group[retry].items():
+                single = pd.to_datetime(val, errors='coerce', dayfirst=True)
+                if pd.isna(single):
+                    continue
+                if single.tzinfo is not None:
+                    tz_values[idx] = single
+                else:
+                    parsed[idx] = single
+
+    in_window = parsed.dt.year.between(MIN_YEAR, MAX_YEAR)
+    parsed[~in_window] = pd.NaT
+    tz_values = {
+        idx: val for idx, val in tz_values.items()
+        if pd.notna(val) and MIN_YEAR <= val.year <= MAX_YEAR
+    }
+    return parsed, tz_values
+
+
+def parse_dates(values):
+    """Vectorized ``values.apply(parse_date_dd_mm_yy)``.
+
+    Works on whole columns: every distinct value is parsed once, the DD-MM-YY
+    branch goes through a single fixed-format ``pd.to_datetime`` call and the
+    dayfirst fallback runs one call per date layout.  Timestamps pass through.
+    """
+    values = values if isinstance(values, pd.Series) else pd.Series(values)
+    if pd.api.types.is_datetime64_any_dtype(values.dtype):
+        return values.copy()
+
+    codes, uniques = pd.factorize(values, use_na_sentinel=True)
+    uniques = pd.Series(np.asarray(uniques, dtype=object))
+    parsed = pd.Series(pd.NaT, index=uniques.index, dtype=_datetime_dtype())
+    objects = {}
+
+    strs = uniques
+    if pd.api.types.infer_dtype(uniques, skipna=True) != 'string':
+        is_timestamp = uniques.map(lambda val: isinstance(val, pd.Timestamp)).to_numpy(dtype=bool)
+        for idx, val in uniques[is_timestamp].items():
+            if val.tzinfo is None:
+                parsed[idx] = val
+            else:
+                objects[idx] = val
+        # object first: uniques that are all Timestamps are inferred as datetime64
+        strs = uniques[~is_timestamp].astype(object).map(str)
+    strs = strs.str.strip()
+
+    if len(strs):
+        parsed[strs.index] = _parse_dd_mm_yy_column(strs).to_numpy()
+        leftover = strs[parsed[strs.index].isna().to_numpy()]
+        if len(leftover):
+            fallback, tz_values = _parse_dayfirst_column(leftover)
+            parsed[leftover.index] = fallback.to_numpy()
+            objects.update(tz_values)
+
+    # Missing values have code -1, which picks the trailing NaT (also when nothing else is there)
+    result = np.append(parsed.to_numpy(), np.array(['NaT'], dtype=parsed.dtype))[codes]
+    if not objects:
+        return pd.Series(result, index=values.index, name=values.name)
+
+    # Timezone-aware values: fall back to an object column like Series.apply would
+    result = np.array([pd.NaT if pd.isna(v) else pd.Timestamp(v) for v in result], dtype=object)
+    for idx, val in objects.items():
+        result[codes == idx] = val
+    return pd.Series(list(result), index=values.index, name=values.name)
+
+
+# DD-MM-YY [HH:MM] values valid in every month and year; these need no parsing
+_PLAIN_DD_MM_YY = r'(0?[1-9]|1\d|2[0-8])-(0?[1-9]|1[0-2])-\d{2}(\s+([01]?\d|2[0-3]):[0-5]\d)?'
+
+
+def valid_dates(values):
+    """Boolean array equal to ``parse_dates(values).notna()``, but cheaper.
+
+    Used for rows whose dates only matter for the "unreadable dates" count.
+    Plainly valid DD-MM-YY strings are recognised with one regex; only the
+    remaining distinct values are actually parsed.
+    """
+    values = values if isinstance(values, pd.Series) else pd.Series(values)
+    if pd.api.types.is_datetime64_any_dtype(values.dtype):
+        return values.notna().to_numpy()
+
+    codes, uniques = pd.factorize(values, use_na_sentinel=True)
+    uniques = pd.Series(np.asarray(uniques, dtype=object))
+    # Non-strings give NaN here and go through the parser
+    plain = uniques.str.strip().str.fullmatch(_PLAIN_DD_MM_YY).fillna(False).to_numpy(dtype=bool)
+    valid = plain.copy()
+    if not plain.all():
+        valid[~plain] = parse_dates(uniques[~plain]).notna().to_numpy()
+    # Missing values have code -1, which picks the trailing False
+    return np.append(valid, False)[codes]
+
+
+# Hours booked per business day
+HOURS_PER_DAY = 8
+
+
+def _to_days(dates):
+    """Drop the time of day, keeping the local calendar date as datetime64[D]."""
+    dates = pd.Series(dates)
+    if getattr(dates.dt, 'tz', None) is not None:
+        dates = dates.dt.tz_localize(None)
+    return dates.to_numpy(dtype='datetime64[D]')
+
+
+def business_day_counts(created, updated, calendar=None):
+    """Day count for each Created/Updated pair, computed on whole arrays.
+
+    Same date counts as 1, otherwise business days (Mon-Fri, or the working
+    days of ``calendar``, a ``np.busdaycalendar``) from Created to Updated
+    inclusive, minus one, with a floor of 1.  Rows with a missing date get 0.
+    """
+    start = _to_days(created)
+    end = _to_days(updated)
+    valid = ~(np.isnat(start) | np.isnat(end))
+
+    counts = np.zeros(len(start), dtype=np.int32)
+    # busday_count excludes the end date, so count up to end + 1 day to include it
+    calendar = {} if calendar is None else {'busdaycal': calendar}
+    busdays = np.busday_count(start[valid], end[valid] + np.timedelta64(1, 'D'), **calendar)
+    # Subtract 1 day for different dates (as per requirement), ensure at least 1 day
+    counts[valid] = np.where(start[valid] == end[valid], 1, np.maximum(1, busdays - 1))
+    return counts
+
+
+# Working window of the precise hours mode; weekmask and holidays as for np.busdaycalendar
+WORKING_WINDOW = {'start': '09:00', 'end': '17:00', 'weekmask': 'Mon Tue Wed Thu Fri', 'holidays': ()}
+
+
+def _seconds_of_day(text):
+    """Seconds since midnight of an 'HH:MM' time."""
+    hours, _, minutes = str(text).partition(':')
+    try:
+        seconds = int(hours) * 3600 + int(minutes or 0) * 60
+    except ValueError:
+        seconds = -1
+    if not 0 <= seconds <= 24 * 3600:
+        raise ValueError(f"Invalid time of day '{text}'; use HH:MM")
+    return seconds
+
+
+@functools.lru_cache(maxsize=16)
+def business_calendar(weekmask=WORKING_WINDOW['weekmask'], holidays=()):
+    """``np.busdaycalendar`` for a weekmask and tuple of ISO holiday dates, compiled once and reused."""
+    return np.busdaycalendar(weekmask=weekmask, holidays=np.array(holidays, dtype='datetime64[D]'))
+
+
+def normalize_window(window=None):
+    """Complete working window from a partial one; raises ValueError if it is invalid.
+
+    Holidays become a sorted tuple of ISO dates, so equal windows compare
+    (and hash into cache keys) equal.
+    """
+    window = {**WORKING_WINDOW, **(window or {})}
+    unknown = set(window) - set(WORKING_WINDOW)
+    if unknown:
+        raise ValueError(f"Unknown working hours key(s): {', '.join(sorted(unknown))}")
+    if _seconds_of_day(window['end']) <= _seconds_of_day(window['start']):
+        raise ValueError(f"Working hours end ({window['end']}) must be after their start ({window['start']})")
+    try:
+        holidays = np.unique(np.array(list(window['holidays']), dtype='datetime64[D]'))
+        window['holidays'] = tuple(str(day) for day in holidays)
+        business_calendar(window['weekmask'], window['holidays'])
+    except ValueError as e:
+        raise ValueError(f"Invalid working days or holidays: {e}") from None
+    return window
+
+
+def _to_seconds(dates):
+    """Local wall time as datetime64[s]."""
+    dates = pd.Series(dates)
+    if getattr(dates.dt, 'tz', None) is not None:
+        dates = dates.dt.tz_localize(None)
+    return dates.to_numpy(dtype='datetime64[s]')
+
+
+def working_hour_counts(created, updated, window=None):
+    """Working hours from Created to Updated for each pair, computed on whole arrays.
+
+    Only time inside the daily window of ``window`` (see ``WORKING_WINDOW``)
+    on working days counts.  Every working day from Created's date up to
+    Updated's date counts in full; the part of Created's day before Created
+    is then taken off and the part of Updated's day before Updated added, so
+    the time of day at either end is clipped to the window.  Rows with a
+    missing date, or Updated before Created, get 0.  Hours are not rounded,
+    so totals over many rows stay exact; files and tables round them.
+    """
+    window = normalize_window(window)
+    open_at, close_at = _seconds_of_day(window['start']), _seconds_of_day(window['end'])
+    calendar = business_calendar(window['weekmask'], window['holidays'])
+    start = _to_seconds(created)
+    end = _to_seconds(updated)
+    valid = ~(np.isnat(start) | np.isnat(end))
+    start, end = start[valid], end[valid]
+    start_day, end_day = start.astype('datetime64[D]'), end.astype('datetime64[D]')
+
+    def worked_before(day, moment):
+        """Window seconds of ``day`` already gone at ``moment`` (0 on days off)."""
+        offset = (moment - day).astype(np.int64)
+        return np.where(np.is_busday(day, busdaycal=calendar), np.clip(offset - open_at, 0, close_at - open_at), 0)
+
+    seconds = (np.busday_count(start_day, end_day, busdaycal=calendar) * (close_at - open_at)
+               - worked_before(start_day, start) + worked_before(end_day, end))
+    # A reversed span starting on a day off has no whole days to offset the Updated part
+    seconds = np.where(end >= start, seconds, 0)
+    hours = np.zeros(len(valid))
+    hours[valid] = seconds / 3600
+    return hours
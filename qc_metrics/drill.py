@@ -0,0 +1,182 @@
+"""Drill-down index of the summaries by Assignee, Component/s and Sprint.
+
+Built once per result: every row is assigned a group (its combination of
+dimension values, in sorted order) and one pass fills prefix sums over the
+groups of the bug, day and hour totals per severity and priority bucket.
+A filter on the dimensions selects groups, and the selected groups form
+runs of consecutive ones (a filter on the leading dimension is a single
+run), so the summaries of any selection are differences of prefix sums:
+time in proportion to the number of groups, whatever the number of rows.
+"""
+import numpy as np
+import pandas as pd
+
+from qc_metrics.buckets import assign_buckets
+from qc_metrics.cube import cell_variables, metrics_frame
+from qc_metrics.pipeline import DEFAULT_SETTINGS, severity_column, summary_tables
+
+DRILL_COLUMNS = ('Assignee', 'Component/s', 'Sprint')
+
+# Label of rows with no value in a dimension
+MISSING_VALUE = '(none)'
+
+
+class DrillIndex:
+    """Bug/day/hour totals by dimension group, severity bucket and priority bucket.
+
+    ``group_codes`` has shape (groups, dimensions): the position in
+    ``values[dimension]`` of each group's value, groups sorted by them.
+    ``bugs``, ``days`` and ``hours`` are prefix sums over the groups, shape
+    (groups + 1, severity buckets + 1, priority buckets + 1), with the same
+    trailing "other" slots as ``cube.TrendCube``.
+    """
+
+    def __init__(self, dimensions, values, group_codes, bugs, days, hours, settings, has_severity, has_priority):
+        self.dimensions = list(dimensions)
+        self.values = values
+        self.group_codes = group_codes
+        self.bugs = bugs
+        self.days = days
+        self.hours = hours
+        self.settings = settings
+        self.has_severity = has_severity
+        self.has_priority = has_priority
+
+    def __len__(self):
+        return len(self.group_codes)
+
+    @property
+    def nbytes(self):
+        """Bytes held by the index (for cache budgets); the value labels are estimated."""
+        arrays = (self.group_codes, self.bugs, self.days, self.hours)
+        labels = sum(len(value) + 50 for values in self.values.values() for value in values)
+        return int(sum(array.nbytes for array in arrays) + labels)
+
+    def select(self, filters=None):
+        """Boolean mask over the groups matching ``filters`` ({dimension: values to keep}).
+
+        Dimensions not in ``filters``, or with no values, are not filtered.
+        """
+        selected = np.ones(len(self), dtype=bool)
+        for dimension, wanted in (filters or {}).items():
+            if dimension not in self.dimensions:
+                raise ValueError(f"Unknown drill-down dimension '{dimension}'; choose from {', '.join(self.dimensions)}")
+            if not wanted:
+                continue
+            positions = {value: position for position, value in enumerate(self.values[dimension])}
+            keep = np.zeros(len(positions), dtype=bool)
+            keep[[positions[value] for value in wanted if value in positions]] = True
+            selected &= keep[self.group_codes[:, self.dimensions.index(dimension)]]
+        return selected
+
+    def totals(self, filters=None):
+        """(bugs, days, hours) per severity and priority bucket of the selected groups."""
+        selected = self.select(filters)
+        # Starts and ends of the runs of selected groups
+        edges = np.flatnonzero(np.diff(np.concatenate(([False], selected, [False]))))
+        starts, ends = edges[::2], edges[1::2]
+        return tuple((prefix[ends] - prefix[starts]).sum(axis=0) for prefix in (self.bugs, self.days, self.hours))
+
+    def variables(self, filters=None):
+        """Summary variables (as ``pipeline.summary_variables``) of the selected rows."""
+        return cell_variables(*self.totals(filters), self.settings, self.has_severity, self.has_priority)
+
+    def summaries(self, filters=None):
+        """Severity and priority summaries plus variables, as ``pipeline.summarize`` of the selected rows."""
+        return summary_tables(self.variables(filters), self.has_severity, self.has_priority, self.settings)
+
+    def _value_cells(self, dimension, filters):
+        """Per-value (bugs, days, hours) of shape (values, severity + 1, priority + 1), selected groups only."""
+        selected = self.select(filters)
+        codes = self.group_codes[selected, self.dimensions.index(dimension)]
+        n_values = len(self.values[dimension])
+        cells = []
+        for prefix in (self.bugs, self.days, self.hours):
+            per_group = np.diff(prefix, axis=0)[selected]
+            shape = per_group.shape[1:]
+            flat = per_group.reshape(len(per_group), -1)
+            index = (codes[:, None] * flat.shape[1] + np.arange(flat.shape[1])).ravel()
+            summed = np.bincount(index, weights=flat.ravel(), minlength=n_values * flat.shape[1])
+            cells.append(summed.reshape(n_values, *shape))
+        return cells
+
+    def breakdown(self, dimension, filters=None):
+        """One row per value of ``dimension``: bug/day/hour totals and bugs per severity bucket."""
+        bugs, days, hours = self._value_cells(dimension, filters)
+        frame = pd.DataFrame({
+            dimension: self.values[dimension],
+            'Bug count': bugs.sum(axis=(1, 2)).round().astype(np.int64),
+            'Day count': days.sum(axis=(1, 2)).round().astype(np.int64),
+            'Hours count': hours.sum(axis=(1, 2)),
+        })
+        if self.has_severity:
+            for position, (label, _) in enumerate(self.settings['severity_buckets']):
+                frame[f'{label} bugs'] = bugs[:, position, :].sum(axis=1).round().astype(np.int64)
+        return frame[frame['Bug count'] > 0].reset_index(drop=True)
+
+    def breakdown_metrics(self, dimension, filters=None, page_story_count=0):
+        """``calculate_qa_metrics`` for every value of ``dimension`` with bugs, as numbers (NaN where "-")."""
+        bugs, days, hours = self._value_cells(dimension, filters)
+        present = np.flatnonzero(bugs.sum(axis=(1, 2)) > 0)
+        frame = metrics_frame([
+            cell_variables(bugs[value], days[value], hours[value], self.settings, self.has_severity, self.has_priority)
+            for value in present
+        ], page_story_count)
+        frame.insert(0, dimension, [self.values[dimension][value] for value in present])
+        return frame
+
+
+def _codes(values):
+    """(code per row, sorted value labels) with missing values as a trailing MISSING_VALUE."""
+    codes, uniques = pd.factorize(values.astype('string'), sort=True)
+    labels = [str(value) for value in uniques]
+    if (codes < 0).any():
+        codes = np.where(codes < 0, len(labels), codes)
+        labels.append(MISSING_VALUE)
+    return codes, labels
+
+
+def build_drill_index(df, settings=None, dimensions=DRILL_COLUMNS):
+    """``DrillIndex`` of an enriched frame (``pipeline.process_upload(...)['df']``).
+
+    Only the ``dimensions`` the frame has are indexed; values are taken as
+    exported (e.g. a multi-component 'Component/s' cell is one value).
+    """
+    settings = {**DEFAULT_SETTINGS, **(settings or {})}
+    dimensions = [col for col in dimensions if col in df.columns]
+    values = {}
+    codes = []
+    for col in dimensions:
+        col_codes, values[col] = _codes(df[col])
+        codes.append(col_codes)
+    sizes = tuple(len(values[col]) for col in dimensions)
+    if codes:
+        # Row-major combined key, so sorted keys order the groups by their dimension values
+        keys, group = np.unique(np.ravel_multi_index(codes, sizes), return_inverse=True)
+        group_codes = np.column_stack(np.unravel_index(keys, sizes))
+    else:
+        group = np.zeros(len(df), dtype=np.int64)
+        group_codes = np.zeros((1, 0), dtype=np.int64)
+
+    sev_col = severity_column(df.columns)
+    n_sev = len(settings['severity_buckets']) + 1
+    n_pri = len(settings['priority_buckets']) + 1
+    # Values outside every bucket (-1) go to the trailing "other" slot
+    sev = np.full(len(df), n_sev - 1)
+    pri = np.full(len(df), n_pri - 1)
+    if sev_col is not None:
+        sev = assign_buckets(df[sev_col], settings['severity_buckets']) % n_sev
+    if 'Priority' in df.columns:
+        pri = assign_buckets(df['Priority'], settings['priority_buckets']) % n_pri
+
+    cell = (group * n_sev + sev) * n_pri + pri
+    size = len(group_codes) * n_sev * n_pri
+    shape = (len(group_codes), n_sev, n_pri)
+    prefix_sums = []
+    for weights in (None, df['Day count'].to_numpy(dtype=np.float64), df['Hours count'].to_numpy(dtype=np.float64)):
+        totals = np.bincount(cell, weights=weights, minlength=size).reshape(shape)
+        prefix = np.zeros((len(group_codes) + 1, n_sev, n_pri), dtype=totals.dtype)
+        np.cumsum(totals, axis=0, out=prefix[1:])
+        prefix_sums.append(prefix)
+    return DrillIndex(dimensions, values, group_codes, *prefix_sums, settings,
+                      has_severity=sev_col is not None, has_priority='Priority' in df.columns)
@@ -0,0 +1,162 @@
+"""Download formats for the updated data, generated on demand.
+
+Excel output goes through openpyxl's write-only mode, which streams rows to
+disk instead of building the whole workbook in memory.  Parquet is offered
+when pyarrow is installed.
+"""
+import importlib.util
+import io
+
+import pandas as pd
+
+EXPORT_FORMATS = {
+    'xlsx': {
+        'label': "Excel",
+        'file_name': "day_count_calculated.xlsx",
+        'mime': "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    },
+    'csv': {
+        'label': "CSV",
+        'file_name': "day_count_calculated.csv",
+        'mime': "text/csv",
+    },
+    'parquet': {
+        'label': "Parquet",
+        'file_name': "day_count_calculated.parquet",
+        'mime': "application/vnd.apache.parquet",
+    },
+}
+
+# Rows converted per chunk when exporting, and re-read per chunk from a
+# streamed (on-disk CSV) result
+EXPORT_CHUNK_ROWS = 100_000
+
+# Decimals of 'Hours count' in exported files; results keep the unrounded hours
+HOURS_DECIMALS = 2
+
+# Types of the count columns in Parquet made from a streamed result; hours are
+# fractional with working hours
+COUNT_DTYPES = {'Day count': 'int32', 'Hours count': 'float64'}
+
+
+def available_formats():
+    """Export formats usable in this environment."""
+    formats = ['xlsx', 'csv']
+    if importlib.util.find_spec('pyarrow') is not None:
+        formats.append('parquet')
+    return formats
+
+
+def rounded_hours(df):
+    """``df`` with 'Hours count' (if any) rounded to ``HOURS_DECIMALS``, as written to files."""
+    return df.round({'Hours count': HOURS_DECIMALS})
+
+
+def _excel_rows(chunk):
+    """Rows of plain Python values; blanks for NaN/NaT, no timezones (Excel has none)."""
+    chunk = chunk.copy()
+    for col in chunk.columns:
+        if getattr(chunk[col].dtype, 'tz', None) is not None:
+            chunk[col] = chunk[col].dt.tz_localize(None)
+    values = chunk.astype(object)
+    return values.where(chunk.notna(), None).to_numpy().tolist()
+
+
+def write_xlsx(target, sheets):
+    """Write ``sheets`` [(name, iterable of DataFrame chunks)] to an .xlsx file.
+
+    Rows are appended one chunk at a time to a write-only workbook, so only
+    the current chunk is held in memory.
+    """
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    for name, chunks in sheets:
+        worksheet = workbook.create_sheet(title=name)
+        header_written = False
+        for chunk in chunks:
+            if not header_written:
+                worksheet.append([str(col) for col in chunk.columns])
+                header_written = True
+            for row in _excel_rows(chunk):
+                worksheet.append(row)
+    workbook.save(target)
+
+
+def write_parquet(target, chunks):
+    """Write DataFrame chunks to a Parquet file with one row group per chunk."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(_parquet_safe(chunk), preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(target, table.schema)
+            else:
+                table = table.cast(writer.schema)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def _parquet_safe(df):
+    """Object columns holding mixed types (e.g. dates and text) become text."""
+    mixed = [
+        col for col in df.columns
+        if df[col].dtype == object and pd.api.types.infer_dtype(df[col], skipna=True) not in ('string', 'empty')
+    ]
+    if not mixed:
+        return df
+    return df.astype({col: 'string' for col in mixed})
+
+
+def frame_chunks(df, chunksize=EXPORT_CHUNK_ROWS):
+    """Consecutive row slices of ``df``, at most ``chunksize`` rows each (one for an empty frame)."""
+    for start in range(0, max(len(df), 1), chunksize):
+        yield df.iloc[start:start + chunksize]
+
+
+def export_frame(df, fmt, chunksize=EXPORT_CHUNK_ROWS):
+    """Bytes of ``df`` in export format ``fmt`` ('xlsx', 'csv' or 'parquet').
+
+    Excel rows are converted ``chunksize`` at a time, so the Python row lists
+    never cover the whole frame.
+    """
+    df = rounded_hours(df)
+    output = io.BytesIO()
+    if fmt == 'xlsx':
+        write_xlsx(output, [('Sheet1', frame_chunks(df, chunksize))])
+    elif fmt == 'csv':
+        df.to_csv(output, index=False)
+    elif fmt == 'parquet':
+        write_parquet(output, [df])
+    else:
+        raise ValueError(f"Unknown export format: {fmt}")
+    return output.getvalue()
+
+
+def export_csv_file(path, fmt, chunksize=EXPORT_CHUNK_ROWS):
+    """Bytes of an enriched CSV on disk (a streamed result) in format ``fmt``.
+
+    The CSV is re-read in chunks, so converting it never loads it whole.
+    """
+    if fmt == 'csv':
+        with open(path, 'rb') as f:
+            return f.read()
+
+    output = io.BytesIO()
+    if fmt == 'xlsx':
+        write_xlsx(output, [('Sheet1', pd.read_csv(path, chunksize=chunksize))])
+    elif fmt == 'parquet':
+        # Text columns everywhere keep the schema identical from chunk to chunk
+        chunks = (
+            chunk.astype({col: dtype for col, dtype in COUNT_DTYPES.items() if col in chunk.columns})
+            for chunk in pd.read_csv(path, chunksize=chunksize, dtype=str, keep_default_na=False)
+        )
+        write_parquet(output, chunks)
+    else:
+        raise ValueError(f"Unknown export format: {fmt}")
+    return output.getvalue()
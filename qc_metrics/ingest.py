@@ -0,0 +1,214 @@
+"""Reading exports: format sniffing and pluggable reader backends.
+
+The format is taken from the first bytes of the upload, not from its name:
+a ZIP container holding ``xl/workbook.xml`` is an .xlsx workbook, an OLE2
+compound file a legacy .xls, a gzip stream a compressed CSV and anything
+else plain CSV.  Each format is read by a backend from ``READERS``; by
+default the first installed one in ``PREFERRED_READERS`` (calamine for
+workbooks when python-calamine is installed, openpyxl otherwise), or the one
+named by the ``reader`` setting.
+
+Workbooks are read sheet by sheet: every sheet whose header has Created and
+Updated is read (concurrently when there are several) and the sheets are
+stacked in workbook order with a 'Sheet' column naming where each row came
+from (with ``keep_columns``, only when it lists 'Sheet').  When the sheets
+already have a 'Sheet' column, the added one is 'Sheet (2)' (or the next
+free number) instead.  Compressed CSV is decompressed while it is parsed
+and never held in memory uncompressed.
+"""
+import gzip
+import importlib.util
+import io
+import multiprocessing
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pandas as pd
+
+from qc_metrics.pipeline import REQUIRED_COLUMNS, PipelineError, upload_columns
+
+CSV_FORMATS = ('csv', 'csv.gz')
+EXCEL_FORMATS = ('xlsx', 'xls')
+
+# Reader backends: the formats each reads, the package it needs and whether
+# it releases the GIL while parsing (so sheets can be read in threads)
+READERS = {
+    'pandas': {'formats': CSV_FORMATS, 'package': None, 'threads': True},
+    'pyarrow': {'formats': CSV_FORMATS, 'package': 'pyarrow', 'threads': True},
+    'calamine': {'formats': EXCEL_FORMATS, 'package': 'python_calamine', 'threads': True},
+    'openpyxl': {'formats': ('xlsx',), 'package': 'openpyxl', 'threads': False},
+    'xlrd': {'formats': ('xls',), 'package': 'xlrd', 'threads': False},
+}
+
+# Backends tried, in order, when the reader setting is 'auto'.  pyarrow's
+# CSV reader is faster but infers column types differently (ISO timestamps
+# become datetimes), so it is only used when asked for.
+PREFERRED_READERS = {
+    'csv': ('pandas',),
+    'csv.gz': ('pandas',),
+    'xlsx': ('calamine', 'openpyxl'),
+    'xls': ('calamine', 'xlrd'),
+}
+
+# Column added when rows from more than one sheet are stacked
+SHEET_COLUMN = 'Sheet'
+
+_ZIP_MAGIC = b'PK\x03\x04'
+_OLE_MAGIC = b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'
+_GZIP_MAGIC = b'\x1f\x8b'
+
+
+def sniff_format(data):
+    """'xlsx', 'xls', 'csv.gz' or 'csv' from the leading bytes of an upload."""
+    if data.startswith(_ZIP_MAGIC):
+        try:
+            names = zipfile.ZipFile(io.BytesIO(data)).namelist()
+        except zipfile.BadZipFile:
+            raise PipelineError("The file looks like a ZIP archive but cannot be opened") from None
+        if 'xl/workbook.xml' not in names:
+            raise PipelineError("ZIP archives other than .xlsx workbooks are not supported")
+        return 'xlsx'
+    if data.startswith(_OLE_MAGIC):
+        return 'xls'
+    if data.startswith(_GZIP_MAGIC):
+        return 'csv.gz'
+    return 'csv'
+
+
+def available_readers(fmt=None):
+    """Backends usable in this environment, optionally only those reading ``fmt``."""
+    return [
+        name for name, backend in READERS.items()
+        if (fmt is None or fmt in backend['formats'])
+        and (backend['package'] is None or importlib.util.find_spec(backend['package']) is not None)
+    ]
+
+
+def select_reader(fmt, reader='auto'):
+    """Backend name for ``fmt``: ``reader`` when it reads that format, else the preferred installed one."""
+    if reader != 'auto':
+        if reader not in READERS:
+            raise PipelineError(f"Unknown reader '{reader}'; choose from auto, {', '.join(READERS)}")
+        if fmt in READERS[reader]['formats']:
+            if reader not in available_readers():
+                raise PipelineError(f"The '{reader}' reader needs the {READERS[reader]['package']} package")
+            return reader
+    installed = available_readers(fmt)
+    for name in PREFERRED_READERS[fmt]:
+        if name in installed:
+            return name
+    raise PipelineError(f"No reader installed for {fmt} files (install one of: "
+                        f"{', '.join(READERS[name]['package'] for name in PREFERRED_READERS[fmt])})")
+
+
+def source_reader(data, reader='auto'):
+    """'<format>/<backend>' an upload would be read with; part of the ingest cache key."""
+    fmt = sniff_format(data)
+    return f"{fmt}/{select_reader(fmt, reader)}"
+
+
+def open_csv(data, fmt=None):
+    """File object over the CSV text of an upload, decompressing gzip as it is read."""
+    source = io.BytesIO(data)
+    if (fmt or sniff_format(data)) == 'csv.gz':
+        return gzip.GzipFile(fileobj=source, mode='rb')
+    return source
+
+
+def _read_csv(data, fmt, backend, usecols=None, nrows=None):
+    if backend == 'pyarrow' and nrows is None:
+        if usecols is not None:
+            # The pyarrow engine takes a list of names, not a callable
+            usecols = [col for col in _read_csv(data, fmt, 'pandas', nrows=0).columns if usecols(col)]
+        return pd.read_csv(open_csv(data, fmt), engine='pyarrow', usecols=usecols)
+    return pd.read_csv(open_csv(data, fmt), usecols=usecols, nrows=nrows)
+
+
+def _relevant_sheets(workbook):
+    """{sheet: header} of the sheets with Created and Updated; the first sheet if none has them."""
+    headers = {sheet: list(workbook.parse(sheet, nrows=0).columns) for sheet in workbook.sheet_names}
+    relevant = {sheet: header for sheet, header in headers.items() if set(REQUIRED_COLUMNS).issubset(header)}
+    if not relevant and headers:
+        first = workbook.sheet_names[0]
+        relevant = {first: headers[first]}
+    return relevant
+
+
+def _sheet_column(headers):
+    """SHEET_COLUMN, numbered if a sheet already has a column of that name."""
+    taken = {col for header in headers.values() for col in header}
+    column, number = SHEET_COLUMN, 1
+    while column in taken:
+        number += 1
+        column = f"{SHEET_COLUMN} ({number})"
+    return column
+
+
+def _read_sheet(data, backend, sheet, keep_columns=None):
+    """One sheet of a workbook (runs in a worker; opens its own copy of the workbook)."""
+    return pd.read_excel(io.BytesIO(data), sheet_name=sheet, engine=backend, usecols=upload_columns(keep_columns))
+
+
+def _sheet_executor(backend, sheets, max_workers):
+    """Pool for reading ``sheets`` concurrently, or None to read them one after another.
+
+    Backends that release the GIL use threads.  The others use processes,
+    but only with more than one CPU and not from inside a worker process
+    (e.g. one of ``uploads.process_uploads``), which is already parallel.
+    """
+    cpus = os.cpu_count() or 1
+    workers = max_workers or min(len(sheets), cpus)
+    if len(sheets) < 2 or workers < 2:
+        return None
+    if READERS[backend]['threads']:
+        return ThreadPoolExecutor(max_workers=workers)
+    if cpus > 1 and multiprocessing.parent_process() is None:
+        from qc_metrics.uploads import _process_context
+
+        return ProcessPoolExecutor(max_workers=workers, mp_context=_process_context())
+    return None
+
+
+def _read_workbook(data, backend, keep_columns=None, max_workers=None):
+    with pd.ExcelFile(io.BytesIO(data), engine=backend) as workbook:
+        headers = _relevant_sheets(workbook)
+        sheets = list(headers)
+        pool = _sheet_executor(backend, sheets, max_workers)
+        if pool is None:
+            usecols = upload_columns(keep_columns)
+            frames = [workbook.parse(sheet, usecols=usecols) for sheet in sheets]
+    if pool is not None:
+        with pool:
+            futures = [pool.submit(_read_sheet, data, backend, sheet, keep_columns) for sheet in sheets]
+            frames = [future.result() for future in futures]
+    sheet_column = _sheet_column(headers)
+    if len(frames) > 1 and (keep_columns is None or sheet_column in keep_columns):
+        for sheet, frame in zip(sheets, frames):
+            frame[sheet_column] = sheet
+    return frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+
+
+def read_export(data, keep_columns=None, reader='auto', max_workers=None):
+    """Read uploaded bytes into a DataFrame with the backend for their sniffed format.
+
+    ``keep_columns`` is as for ``pipeline.upload_columns``; ``max_workers``
+    caps the sheets of a workbook read at once.
+    """
+    fmt = sniff_format(data)
+    backend = select_reader(fmt, reader)
+    if fmt in CSV_FORMATS:
+        return _read_csv(data, fmt, backend, upload_columns(keep_columns))
+    return _read_workbook(data, backend, keep_columns, max_workers)
+
+
+def read_export_header(data, reader='auto'):
+    """Column names of an upload (of every relevant sheet of a workbook) without reading its rows."""
+    fmt = sniff_format(data)
+    backend = select_reader(fmt, reader)
+    if fmt in CSV_FORMATS:
+        return list(_read_csv(data, fmt, backend, nrows=0).columns)
+    with pd.ExcelFile(io.BytesIO(data), engine=backend) as workbook:
+        headers = _relevant_sheets(workbook)
+    columns = list(dict.fromkeys(col for header in headers.values() for col in header))
+    return columns + [_sheet_column(headers)] if len(headers) > 1 else columns
@@ -0,0 +1,171 @@
+"""On-disk columnar cache of uploads, keyed by file content.
+
+The first time a file is seen it is read with its ``ingest`` backend,
+its Created/Updated columns are parsed, and the lot is stored as an
+uncompressed Arrow IPC file.  Later uploads of the same bytes memory-map that
+file instead of parsing the workbook again.  The directory is capped in size;
+least recently used files are removed first.
+
+Needs pyarrow; without it the cache stays disabled and uploads are always
+read from scratch.
+"""
+import hashlib
+import importlib.util
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+# Bump when the stored layout changes so old files are ignored
+FORMAT_VERSION = 2
+
+# Root of the on-disk caches (this one and the incremental issue store)
+CACHE_DIR = Path(os.environ.get('QC_METRICS_CACHE_DIR', Path.home() / '.cache' / 'qc_metrics'))
+
+DEFAULT_DIRECTORY = CACHE_DIR / 'ingest'
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+
+# Parsed Created/Updated are stored next to the raw columns under these names
+_CREATED = '__qc_created_parsed__'
+_UPDATED = '__qc_updated_parsed__'
+_SUFFIX = '.arrow'
+
+
+def ingest_key(data, reader, keep_columns=None):
+    """Cache key for uploaded bytes; the reader ('<format>/<backend>', see
+    ``ingest.source_reader``) and the columns read are part of it."""
+    digest = hashlib.sha256(data)
+    digest.update(f"|{reader}|v{FORMAT_VERSION}".encode())
+    if keep_columns is not None:
+        digest.update(json.dumps(sorted(keep_columns)).encode())
+    return digest.hexdigest()
+
+
+class IngestCache:
+    """Directory of Arrow IPC files holding read and date-parsed uploads."""
+
+    def __init__(self, directory=DEFAULT_DIRECTORY, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.enabled = importlib.util.find_spec('pyarrow') is not None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __getstate__(self):
+        # Locks do not pickle; a copy sent to a worker process counts its own hits
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        return self.directory / f"{key}{_SUFFIX}"
+
+    def _files(self):
+        if not self.directory.is_dir():
+            return []
+        return [path for path in self.directory.iterdir() if path.suffix == _SUFFIX]
+
+    def load(self, key):
+        """(DataFrame, created, updated) for ``key``, or None if not cached."""
+        if not self.enabled:
+            return None
+        import pyarrow as pa
+
+        path = self._path(key)
+        try:
+            with pa.memory_map(str(path), 'r') as source:
+                table = pa.ipc.open_file(source).read_all()
+            # Mark as recently used for eviction
+            os.utime(path)
+        except (FileNotFoundError, pa.ArrowInvalid):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        # Text columns stay on the mapped Arrow buffers; one block per column lets
+        # numeric and date columns without nulls do the same, and self_destruct
+        # frees whatever has to be copied as soon as it is converted.  The
+        # frame has numpy dtypes, as when the file is read from scratch.
+        df = table.to_pandas(split_blocks=True, self_destruct=True)
+        del table
+        with self._lock:
+            self.hits += 1
+        return df.drop(columns=[_CREATED, _UPDATED]), df[_CREATED], df[_UPDATED]
+
+    def store(self, key, df, created, updated):
+        """Save a read upload with its parsed dates; silently skipped if Arrow can't hold it."""
+        if not self.enabled:
+            return False
+        import pyarrow as pa
+
+        try:
+            table = pa.Table.from_pandas(
+                df.assign(**{_CREATED: created.array, _UPDATED: updated.array}),
+                preserve_index=False,
+            )
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+            # e.g. a column mixing dates and text; keep reading those from scratch
+            return False
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self.evict()
+        return True
+
+    def evict(self):
+        """Delete least recently used files until the directory fits ``max_bytes``."""
+        files = []
+        for path in self._files():
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+        files.sort()
+        total = sum(size for _, size, _ in files)
+        # The newest file is always kept
+        for _, size, path in files[:-1]:
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+    def purge(self):
+        """Delete every cached upload; returns the number of files removed."""
+        removed = 0
+        for path in self._files():
+            path.unlink(missing_ok=True)
+            removed += 1
+        return removed
+
+    def stats(self):
+        sizes = []
+        for path in self._files():
+            try:
+                sizes.append(path.stat().st_size)
+            except FileNotFoundError:
+                # Evicted by another process since the listing
+                continue
+        return {
+            'enabled': self.enabled,
+            'directory': str(self.directory),
+            'files': len(sizes),
+            'bytes': sum(sizes),
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+        }
@@ -0,0 +1,399 @@
+"""Incremental processing of overlapping exports against a local SQLite store.
+
+The store keeps, per dataset (e.g. one team's daily export), the last upload
+issue by issue: raw and parsed Created/Updated, day count, Status, Severity
+and Priority, plus the summary variables of that upload.  On the next upload
+only issues that are new or whose Created/Updated changed are parsed and
+day-counted, and the summary variables are corrected by the difference
+between the old and new rows of the issues that changed or disappeared.
+The result is the same as processing the upload from scratch.
+"""
+import json
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from qc_metrics.dates import business_day_counts, parse_dates
+from qc_metrics.ingest_cache import CACHE_DIR
+from qc_metrics.pipeline import (
+    DEFAULT_SETTINGS,
+    ISSUE_KEY,
+    check_columns,
+    compact_output,
+    load_upload,
+    pipeline_messages,
+    process_frame,
+    severity_column,
+    summary_tables,
+    summary_variables,
+)
+from qc_metrics.profiling import profile_stage
+
+DEFAULT_PATH = CACHE_DIR / 'issues.sqlite'
+
+# Seconds an upload waits for another upload's transaction on the same store
+LOCK_TIMEOUT = 600
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS issues (
+    dataset TEXT NOT NULL,
+    key_hash INTEGER NOT NULL,
+    issue_key TEXT NOT NULL,
+    dates_hash INTEGER NOT NULL,
+    fields_hash INTEGER NOT NULL,
+    created TEXT,
+    updated TEXT,
+    day_count INTEGER NOT NULL,
+    status TEXT,
+    severity TEXT,
+    priority TEXT,
+    PRIMARY KEY (dataset, key_hash)
+);
+CREATE TABLE IF NOT EXISTS datasets (
+    dataset TEXT PRIMARY KEY,
+    fingerprint TEXT NOT NULL,
+    variables TEXT NOT NULL,
+    snapshot BLOB NOT NULL
+);
+"""
+
+# Per-issue hashes and day counts of the last upload, stored as one array so
+# loading a dataset does not go through SQLite row by row
+_SNAPSHOT_DTYPE = np.dtype([
+    ('key_hash', '<i8'), ('dates_hash', '<i8'), ('fields_hash', '<i8'), ('day_count', '<i4'),
+])
+
+_ISSUE_COLUMNS = ('key_hash', 'issue_key', 'dates_hash', 'fields_hash', 'created', 'updated',
+                  'day_count', 'status', 'severity', 'priority')
+_FIELDS = ('status', 'severity', 'priority')
+
+
+def _text(values):
+    """Column as str (None where missing), the form values are stored and compared in."""
+    values = pd.Series(values, dtype=object)
+    if pd.api.types.infer_dtype(values, skipna=True) not in ('string', 'empty'):
+        values = values.map(str, na_action='ignore')
+    return values.where(values.notna(), None)
+
+
+def _iso(dates):
+    """Parsed dates as ISO strings (None where unreadable)."""
+    dates = pd.Series(dates)
+    if pd.api.types.is_datetime64_any_dtype(dates.dtype):
+        text = pd.Series(np.datetime_as_string(dates.to_numpy(dtype='datetime64[s]')), index=dates.index)
+        return text.where(dates.notna(), None)
+    return dates.map(lambda value: None if pd.isna(value) else value.isoformat())
+
+
+def _row_hash(frame):
+    """64-bit hash of every row, signed so it fits an SQLite INTEGER."""
+    if frame.shape[1] == 0:
+        return np.zeros(len(frame), dtype=np.int64)
+    return pd.util.hash_pandas_object(frame, index=False).to_numpy().view(np.int64)
+
+
+def _sql_rows(frame):
+    """Row tuples with None for missing values and plain Python ints."""
+    frame = frame.astype(object).where(frame.notna(), None)
+    return frame.itertuples(index=False, name=None)
+
+
+class IssueStore:
+    """SQLite file holding per-issue results of the last upload of each dataset.
+
+    Issues are matched by a hash of their key, and changes detected by
+    hashes of their raw Created/Updated and of Status/Severity/Priority.
+    Those hashes and the day counts are also kept as one snapshot array per
+    dataset, which is all that is read to decide what to reprocess.  A
+    connection is opened per call, so one store can be shared by threads and
+    processes.  ``load``, ``load_issues`` and ``save`` also take the
+    connection of a ``transaction``, so an upload reads and writes one
+    consistent state.
+    """
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = Path(path)
+
+    def _connect(self, timeout=60):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=timeout)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.executescript(_SCHEMA)
+        return conn
+
+    @contextmanager
+    def _connection(self, conn=None):
+        """``conn`` as is, or a new connection committed and closed after the block."""
+        if conn is not None:
+            yield conn
+            return
+        conn = self._connect()
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @contextmanager
+    def transaction(self):
+        """Connection holding the store's write lock until the block ends.
+
+        Opened with BEGIN IMMEDIATE, so another upload to the store waits (up
+        to ``LOCK_TIMEOUT`` seconds) instead of interleaving its load and save
+        with this one.  Committed when the block ends, rolled back on error.
+        """
+        conn = self._connect(LOCK_TIMEOUT)
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def load(self, dataset, conn=None):
+        """(hashes and day counts indexed by key hash, fingerprint, variables) of ``dataset``."""
+        with self._connection(conn) as conn:
+            meta = conn.execute(
+                'SELECT fingerprint, variables, snapshot FROM datasets WHERE dataset = ?', (dataset,)
+            ).fetchone()
+        snapshot = np.frombuffer(meta[2], dtype=_SNAPSHOT_DTYPE) if meta else np.empty(0, dtype=_SNAPSHOT_DTYPE)
+        issues = pd.DataFrame(
+            {name: snapshot[name] for name in _SNAPSHOT_DTYPE.names[1:]},
+            index=pd.Index(snapshot['key_hash']),
+        )
+        fingerprint, variables = (meta[0], json.loads(meta[1])) if meta else (None, None)
+        return issues, fingerprint, variables
+
+    def load_issues(self, dataset, key_hashes, conn=None):
+        """Stored day count, Status, Severity and Priority of the issues in ``key_hashes``."""
+        with self._connection(conn) as conn:
+            conn.execute('CREATE TEMP TABLE IF NOT EXISTS wanted (key_hash INTEGER PRIMARY KEY)')
+            conn.execute('DELETE FROM wanted')
+            conn.executemany('INSERT OR IGNORE INTO wanted VALUES (?)', ((int(key),) for key in key_hashes))
+            issues = pd.read_sql_query(
+                'SELECT day_count, status, severity, priority FROM issues '
+                'WHERE dataset = ? AND key_hash IN (SELECT key_hash FROM wanted)',
+                conn, params=(dataset,),
+                dtype={'day_count': np.int32, 'status': object, 'severity': object, 'priority': object},
+            )
+        return issues
+
+    def save(self, dataset, snapshot, fresh, refreshed, deleted_keys, fingerprint, variables, conn=None):
+        """Record an upload of ``dataset``.
+
+        ``snapshot`` is the ``_SNAPSHOT_DTYPE`` array of every issue in the
+        upload, ``fresh`` holds newly processed issues (all columns),
+        ``refreshed`` issues whose dates were reused but whose
+        Status/Severity/Priority changed, and ``deleted_keys`` the key hashes
+        no longer in the export.
+        """
+        with self._connection(conn) as conn:
+            conn.executemany(
+                f"INSERT OR REPLACE INTO issues (dataset, {', '.join(_ISSUE_COLUMNS)}) "
+                f"VALUES (?, {', '.join('?' * len(_ISSUE_COLUMNS))})",
+                ((dataset, *row) for row in _sql_rows(fresh[list(_ISSUE_COLUMNS)])),
+            )
+            conn.executemany(
+                'UPDATE issues SET fields_hash = ?, status = ?, severity = ?, priority = ? '
+                'WHERE dataset = ? AND key_hash = ?',
+                ((*row[1:], dataset, row[0])
+                 for row in _sql_rows(refreshed[['key_hash', 'fields_hash', *_FIELDS]])),
+            )
+            conn.executemany(
+                'DELETE FROM issues WHERE dataset = ? AND key_hash = ?',
+                ((dataset, int(key)) for key in deleted_keys),
+            )
+            conn.execute(
+                'INSERT OR REPLACE INTO datasets (dataset, fingerprint, variables, snapshot) VALUES (?, ?, ?, ?)',
+                (dataset, fingerprint, json.dumps(variables), snapshot.tobytes()),
+            )
+
+    def datasets(self):
+        """{dataset: number of stored issues}."""
+        with self._connect() as conn:
+            counts = dict(conn.execute('SELECT dataset, COUNT(*) FROM issues GROUP BY dataset'))
+        conn.close()
+        return counts
+
+    def drop(self, dataset):
+        """Forget everything stored for ``dataset``."""
+        with self._connect() as conn:
+            conn.execute('DELETE FROM issues WHERE dataset = ?', (dataset,))
+            conn.execute('DELETE FROM datasets WHERE dataset = ?', (dataset,))
+        conn.close()
+
+
+def _fingerprint(settings, columns):
+    """Everything besides the rows that the stored totals depend on."""
+    return json.dumps({
+        'statuses': settings['statuses'],
+        'hours_per_day': settings['hours_per_day'],
+        'severity_buckets': settings['severity_buckets'],
+        'priority_buckets': settings['priority_buckets'],
+        'severity_column': severity_column(columns),
+        'has_priority': 'Priority' in columns,
+        'has_status': 'Status' in columns,
+    }, sort_keys=True, default=str)
+
+
+def _counted_rows(issues, columns, settings):
+    """Rows of stored-form ``issues`` that enter the totals, shaped for ``summary_variables``."""
+    counted = issues['day_count'].to_numpy() > 0
+    if 'Status' in columns:
+        counted &= issues['status'].isin(list(settings['statuses'])).to_numpy()
+    issues = issues[counted]
+    frame = pd.DataFrame({
+        'Day count': issues['day_count'].to_numpy(dtype=np.int32),
+        'Hours count': issues['day_count'].to_numpy(dtype=np.int32) * np.int32(settings['hours_per_day']),
+    })
+    if severity_column(columns) is not None:
+        frame[severity_column(columns)] = issues['severity'].to_numpy()
+    if 'Priority' in columns:
+        frame['Priority'] = issues['priority'].to_numpy()
+    return frame
+
+
+def process_incremental(df, store, dataset='default', settings=None, parsed_dates=None, profiler=None):
+    """``process_frame`` for an upload, reusing per-issue results kept in ``store``.
+
+    Needs an 'Issue key' on every row, each key once; otherwise the upload
+    is processed in full and nothing is stored.
+    """
+    settings = {**DEFAULT_SETTINGS, **(settings or {})}
+    if ISSUE_KEY not in df.columns or df[ISSUE_KEY].isna().any() or df[ISSUE_KEY].duplicated().any():
+        result = process_frame(df, settings, parsed_dates, profiler)
+        result['messages'].append(
+            ('info', f"Incremental mode needs a unique '{ISSUE_KEY}' on every row; the file was processed in full.")
+        )
+        return result
+    if settings['working_hours'] is not None:
+        # Only day counts are stored per issue, and working hours depend on the times
+        result = process_frame(df, settings, parsed_dates, profiler)
+        result['messages'].append(
+            ('info', "Incremental mode does not support precise working hours; the file was processed in full.")
+        )
+        return result
+    check_columns(df)
+    sev_col = severity_column(df.columns)
+
+    field_columns = [col for col in ('Status', sev_col, 'Priority') if col in df.columns]
+    key_hash = _row_hash(df[[ISSUE_KEY]])
+    dates_hash = _row_hash(df[['Created', 'Updated']])
+    fields_hash = _row_hash(df[field_columns])
+
+    # One write transaction from load to save: a concurrent upload to the store
+    # waits, so the stored issues and snapshot never mix two uploads
+    with store.transaction() as conn:
+        with profile_stage(profiler, 'issue_store_load') as stage:
+            previous, fingerprint, last_variables = store.load(dataset, conn)
+            stage['rows_out'] = len(previous)
+        position = previous.index.get_indexer(key_hash)
+        known = position >= 0
+        old = {}
+        for name, values in previous.items():
+            old[name] = np.zeros(len(position), dtype=values.dtype)
+            old[name][known] = values.to_numpy()[position[known]]
+        reuse = known & (old['dates_hash'] == dates_hash)
+        fresh = ~reuse
+
+        # Only new issues and issues with new Created/Updated values are parsed and day-counted
+        day_count = np.where(reuse, old['day_count'], 0).astype(np.int32)
+        created_iso = updated_iso = None
+        if fresh.any():
+            if parsed_dates is None:
+                with profile_stage(profiler, 'parse_dates', int(fresh.sum())) as stage:
+                    created = parse_dates(df['Created'][fresh])
+                    updated = parse_dates(df['Updated'][fresh])
+                    stage['rows_out'] = len(created)
+            else:
+                created, updated = parsed_dates[0][fresh], parsed_dates[1][fresh]
+            with profile_stage(profiler, 'day_count', int(fresh.sum())) as stage:
+                day_count[fresh] = business_day_counts(created, updated)
+                created_iso, updated_iso = _iso(created).to_numpy(), _iso(updated).to_numpy()
+                stage['rows_out'] = int(fresh.sum())
+
+        with profile_stage(profiler, 'status_filter', len(df)) as stage:
+            valid = day_count > 0
+            if 'Status' in df.columns:
+                wanted = df['Status'].isin(list(settings['statuses'])).to_numpy()
+                excluded = int((valid & ~wanted).sum())
+            else:
+                wanted = np.ones(len(df), dtype=bool)
+                excluded = None
+            keep = valid & wanted
+            out = df[keep].reset_index(drop=True)
+            out['Day count'] = day_count[keep]
+            out['Hours count'] = out['Day count'] * np.int32(settings['hours_per_day'])
+            stage['rows_out'] = len(out)
+
+        out, memory = compact_output(out, settings, profiler)
+
+        # Issues whose contribution to the totals may differ from the last upload
+        refreshed = reuse & (old['fields_hash'] != fields_hash)
+        changed = fresh | refreshed
+        current = pd.DataFrame({
+            'key_hash': key_hash[changed],
+            'issue_key': _text(df[ISSUE_KEY][changed]).to_numpy(),
+            'dates_hash': dates_hash[changed],
+            'fields_hash': fields_hash[changed],
+            'day_count': day_count[changed],
+            'status': _text(df['Status'][changed]).to_numpy() if 'Status' in df.columns else None,
+            'severity': _text(df[sev_col][changed]).to_numpy() if sev_col else None,
+            'priority': _text(df['Priority'][changed]).to_numpy() if 'Priority' in df.columns else None,
+        })
+        current['created'] = None
+        current['updated'] = None
+        is_fresh = fresh[changed]
+        if created_iso is not None:
+            current.loc[is_fresh, 'created'] = created_iso
+            current.loc[is_fresh, 'updated'] = updated_iso
+
+        matched = np.zeros(len(previous), dtype=bool)
+        matched[position[known]] = True
+        vanished = previous.index[~matched]
+        new_fingerprint = _fingerprint(settings, df.columns)
+        with profile_stage(profiler, 'summaries', len(current) + len(vanished)):
+            if fingerprint == new_fingerprint and last_variables is not None:
+                before = store.load_issues(dataset, [*key_hash[changed & known], *vanished], conn)
+                added = summary_variables(_counted_rows(current, df.columns, settings), settings)
+                dropped = summary_variables(_counted_rows(before, df.columns, settings), settings)
+                variables = {name: last_variables[name] + added[name] - dropped[name] for name in added}
+            else:
+                variables = summary_variables(out, settings)
+
+        snapshot = np.empty(len(df), dtype=_SNAPSHOT_DTYPE)
+        snapshot['key_hash'] = key_hash
+        snapshot['dates_hash'] = dates_hash
+        snapshot['fields_hash'] = fields_hash
+        snapshot['day_count'] = day_count
+        with profile_stage(profiler, 'issue_store_save', len(current) + len(vanished)):
+            store.save(dataset, snapshot, current[is_fresh], current[~is_fresh], vanished, new_fingerprint, variables,
+                       conn)
+
+    messages = pipeline_messages(len(df) - int(valid.sum()), excluded, len(out), settings['statuses'])
+    messages.append(('info', f"Incremental: {int(fresh.sum())} new or updated issue(s) processed, "
+                             f"{int(reuse.sum())} reused, {len(vanished)} no longer in the export."))
+    return {
+        'df': out,
+        'memory': memory,
+        'messages': messages,
+        **summary_tables(variables, sev_col is not None, 'Priority' in df.columns, settings),
+    }
+
+
+def process_upload_incremental(data, store, dataset='default', settings=None, ingest_cache=None, profiler=None):
+    """``pipeline.process_upload`` going through an ``IssueStore``."""
+    settings = {**DEFAULT_SETTINGS, **(settings or {})}
+    keep_columns = settings['keep_columns']
+    # The key is read even when the output should not keep it
+    drop_key = keep_columns is not None and ISSUE_KEY not in keep_columns
+    if drop_key:
+        keep_columns = (*keep_columns, ISSUE_KEY)
+    df, parsed_dates = load_upload(data, ingest_cache, keep_columns, profiler, settings['reader'])
+    result = process_incremental(df, store, dataset, settings, parsed_dates, profiler)
+    if drop_key:
+        result['df'] = result['df'].drop(columns=ISSUE_KEY)
+    return result
@@ -0,0 +1,338 @@
+"""Issues pulled straight from the JIRA search API instead of an exported file.
+
+    with JiraClient('https://jira.example.com', auth=('me@example.com', token)) as client:
+        result = process_jira(client, 'project = QA AND issuetype = Bug')
+
+Two search APIs are supported.  On JIRA Server / Data Center the first page
+of ``/rest/api/2/search`` says how many issues match; the other pages are
+then requested concurrently from an asyncio loop, at most ``concurrency`` at
+a time and no faster than ``rate`` requests per second, over one pooled
+urllib3 connection pool (keep-alive connections are reused between pages).
+JIRA Cloud has retired that endpoint for ``/rest/api/3/search/jql``, where
+every page carries the token of the next one, so its pages are requested
+one after the other.  The API follows the site (``*.atlassian.net`` is
+Cloud) unless ``api`` names one.  Rate limiting (429) and gateway errors
+are retried with exponential backoff, honouring Retry-After.
+
+Each page is turned into export rows, dates included, as soon as it arrives
+while the later pages are still downloading.  The pages are then merged by
+Issue key (an issue updated during the download can show up on two pages)
+and run through the same pipeline as an uploaded export.
+"""
+import asyncio
+import json
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode, urlparse
+
+import pandas as pd
+
+from qc_metrics.pipeline import DEFAULT_SETTINGS, ISSUE_KEY, PipelineError, process_frame, upload_columns
+from qc_metrics.profiling import profile_stage
+from qc_metrics.uploads import merge_uploads
+
+# JIRA Server / Data Center: offset paging
+SEARCH_PATH = '/rest/api/2/search'
+FIELD_PATH = '/rest/api/2/field'
+# JIRA Cloud: token paging
+CLOUD_SEARCH_PATH = '/rest/api/3/search/jql'
+CLOUD_FIELD_PATH = '/rest/api/3/field'
+
+JIRA_APIS = ('cloud', 'server')
+
+# Issues asked for per request; JIRA Cloud serves at most 100 whatever is asked
+DEFAULT_PAGE_SIZE = 100
+DEFAULT_CONCURRENCY = 4
+# Requests started per second, across all concurrent pages
+DEFAULT_RATE = 10.0
+DEFAULT_RETRIES = 5
+# Seconds before the first retry; doubled for every further one
+DEFAULT_BACKOFF = 0.5
+DEFAULT_TIMEOUT = 30.0
+
+RETRY_STATUSES = (429, 502, 503, 504)
+
+# Export column -> JIRA field, in the column order of a CSV export.  Severity
+# is a custom field whose id differs per site, so it is looked up by name.
+FIELD_COLUMNS = {
+    'Issue Type': 'issuetype',
+    'Summary': 'summary',
+    'Status': 'status',
+    'Priority': 'priority',
+    'Severity': None,
+    'Assignee': 'assignee',
+    'Component/s': 'components',
+    'Created': 'created',
+    'Updated': 'updated',
+}
+
+_DONE = object()
+
+
+def _cell(value):
+    """Export cell for a JIRA field value (named objects, lists of them, plain values)."""
+    if isinstance(value, dict):
+        return value.get('name') or value.get('value') or value.get('displayName')
+    if isinstance(value, list):
+        # Null entries (and objects without a name) are left out rather than shown as 'None'
+        cells = (_cell(item) for item in value)
+        return ', '.join(str(cell) for cell in cells if cell is not None) or None
+    return value
+
+
+def jira_timestamps(values):
+    """Parse JIRA timestamps ('2025-08-01T09:40:00.000+0530') as the wall time they show.
+
+    The offset is the requesting user's time zone, so the result matches the
+    dates of a CSV export made by the same user.
+    """
+    values = pd.Series(values, dtype=object)
+    return pd.to_datetime(values.str.slice(0, 19), format='%Y-%m-%dT%H:%M:%S', errors='coerce')
+
+
+def issues_frame(issues, severity_field=None, keep_columns=None):
+    """Export rows for the ``issues`` of a search page; Created/Updated are already parsed.
+
+    The Issue key is always included; ``keep_columns`` is as for
+    ``pipeline.upload_columns``.
+    """
+    wanted = upload_columns(keep_columns)
+    columns = {ISSUE_KEY: [issue['key'] for issue in issues]}
+    for column, field in FIELD_COLUMNS.items():
+        field = severity_field if column == 'Severity' else field
+        if field is None or (wanted is not None and not wanted(column)):
+            continue
+        columns[column] = [_cell(issue.get('fields', {}).get(field)) for issue in issues]
+    df = pd.DataFrame(columns)
+    for column in ('Created', 'Updated'):
+        df[column] = jira_timestamps(df[column])
+    return df
+
+
+class _Throttle:
+    """At most ``concurrency`` requests in flight, started at least 1/``rate`` seconds apart."""
+
+    def __init__(self, concurrency, rate):
+        self.slots = asyncio.Semaphore(concurrency)
+        self.interval = 1 / rate if rate else 0.0
+        self.lock = asyncio.Lock()
+        self.next_start = 0.0
+
+    async def wait_turn(self):
+        async with self.lock:
+            now = asyncio.get_running_loop().time()
+            delay = self.next_start - now
+            self.next_start = max(now, self.next_start) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class JiraClient:
+    """Connection settings and the pooled HTTP connections to one JIRA site.
+
+    ``auth`` is a (user, API token) pair for basic auth or a personal access
+    token string for bearer auth.  ``severity_field`` is the id of the
+    Severity custom field (e.g. 'customfield_10100'); by default the field
+    named 'Severity' is looked up.  ``api`` is 'cloud' or 'server' (Server /
+    Data Center); by default sites on atlassian.net are Cloud.
+    """
+
+    def __init__(self, base_url, auth=None, concurrency=DEFAULT_CONCURRENCY, rate=DEFAULT_RATE,
+                 retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF, timeout=DEFAULT_TIMEOUT, severity_field=None,
+                 api=None):
+        import urllib3
+
+        self.base_url = base_url.rstrip('/')
+        if api is None:
+            host = urlparse(self.base_url).hostname or ''
+            api = 'cloud' if host.endswith('.atlassian.net') else 'server'
+        if api not in JIRA_APIS:
+            raise ValueError(f"Unknown JIRA API '{api}'; choose from {', '.join(JIRA_APIS)}")
+        self.api = api
+        self.concurrency = concurrency
+        self.rate = rate
+        self.retries = retries
+        self.backoff = backoff
+        self._severity_field = severity_field
+        self.headers = {'Accept': 'application/json'}
+        if isinstance(auth, (tuple, list)):
+            self.headers.update(urllib3.make_headers(basic_auth=':'.join(auth)))
+        elif auth:
+            self.headers['Authorization'] = f'Bearer {auth}'
+        # One connection per concurrent page, kept alive between pages
+        self.pool = urllib3.PoolManager(
+            num_pools=1, maxsize=concurrency, block=True, retries=False, timeout=urllib3.Timeout(total=timeout),
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.pool.clear()
+
+    def _request(self, path, params):
+        """One GET; returns (status, Retry-After seconds or None, decoded JSON or None)."""
+        import urllib3
+
+        url = f"{self.base_url}{path}?{urlencode(params)}" if params else f"{self.base_url}{path}"
+        try:
+            response = self.pool.request('GET', url, headers=self.headers)
+        except urllib3.exceptions.HTTPError as e:
+            return None, None, str(e)
+        try:
+            body = json.loads(response.data) if response.data else None
+        except ValueError:
+            body = None
+        retry_after = response.headers.get('Retry-After')
+        return response.status, float(retry_after) if retry_after and retry_after.isdigit() else None, body
+
+    def get_json(self, path, params=None):
+        """Blocking GET with the same retries as the concurrent fetch."""
+        return asyncio.run(self._get_json(_Throttle(1, None), None, path, params))
+
+    async def _get_json(self, throttle, executor, path, params, expect=None):
+        """GET with retries; with ``expect``, the body must be a JSON object holding that list."""
+        loop = asyncio.get_running_loop()
+        for attempt in range(self.retries + 1):
+            async with throttle.slots:
+                await throttle.wait_turn()
+                status, retry_after, body = await loop.run_in_executor(executor, self._request, path, params)
+            if status is not None and status < 400:
+                if expect is not None and not (isinstance(body, dict) and isinstance(body.get(expect), list)):
+                    site = 'JIRA Cloud' if self.api == 'cloud' else 'JIRA Server / Data Center'
+                    raise PipelineError(f"JIRA returned HTTP {status} for {path} without a list of {expect}; "
+                                        f"is {self.base_url} a {site} site?")
+                return body
+            if status is not None and status not in RETRY_STATUSES:
+                errors = '; '.join(body.get('errorMessages', [])) if isinstance(body, dict) else ''
+                raise PipelineError(f"JIRA returned HTTP {status} for {path}" + (f": {errors}" if errors else ''))
+            if attempt < self.retries:
+                await asyncio.sleep(max(self.backoff * 2 ** attempt, retry_after or 0))
+        reason = f"HTTP {status}" if status is not None else body
+        raise PipelineError(f"JIRA request to {path} failed after {self.retries + 1} attempt(s): {reason}")
+
+    @property
+    def severity_field(self):
+        """Id of the Severity custom field, or None if the site has none."""
+        if self._severity_field is None:
+            fields = self.get_json(CLOUD_FIELD_PATH if self.api == 'cloud' else FIELD_PATH) or []
+            self._severity_field = next((field['id'] for field in fields if field.get('name') == 'Severity'), '')
+        return self._severity_field or None
+
+    def search_fields(self):
+        return ','.join(field for field in (*FIELD_COLUMNS.values(), self.severity_field) if field)
+
+    async def fetch_pages(self, jql, put, page_size=DEFAULT_PAGE_SIZE):
+        """Call ``put(issues)`` for every page of ``jql``, in the order the pages arrive."""
+        if self.api == 'cloud':
+            return await self._fetch_token_pages(jql, put, page_size)
+        fields = self.search_fields()
+        throttle = _Throttle(self.concurrency, self.rate)
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='jira') as executor:
+            def page(start):
+                params = {'jql': jql, 'startAt': start, 'maxResults': page_size, 'fields': fields}
+                return self._get_json(throttle, executor, SEARCH_PATH, params, expect='issues')
+
+            first = await page(0)
+            put(first['issues'])
+            # The server may serve fewer issues per page than asked for
+            step = first.get('maxResults') or len(first['issues'])
+            if not step:
+                return
+            tasks = [asyncio.ensure_future(page(start)) for start in range(step, first.get('total', 0), step)]
+            try:
+                for next_page in asyncio.as_completed(tasks):
+                    put((await next_page)['issues'])
+            finally:
+                for task in tasks:
+                    task.cancel()
+
+    async def _fetch_token_pages(self, jql, put, page_size):
+        """``fetch_pages`` on JIRA Cloud: each page names the next, so they are requested in turn."""
+        fields = self.search_fields()
+        throttle = _Throttle(1, self.rate)
+        params = {'jql': jql, 'maxResults': page_size, 'fields': fields}
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix='jira') as executor:
+            while True:
+                body = await self._get_json(throttle, executor, CLOUD_SEARCH_PATH, params, expect='issues')
+                put(body['issues'])
+                token = body.get('nextPageToken')
+                if body.get('isLast', not token) or not token or not body['issues']:
+                    return
+                params = {**params, 'nextPageToken': token}
+
+    def iter_pages(self, jql, page_size=DEFAULT_PAGE_SIZE):
+        """Yield the issues of each page as soon as it is downloaded.
+
+        The downloads run on an event loop in a background thread, so they
+        continue while the caller works on the pages already yielded.
+        """
+        pages = queue.Queue()
+
+        def run():
+            try:
+                asyncio.run(self.fetch_pages(jql, pages.put, page_size))
+            except BaseException as e:
+                pages.put(e)
+            else:
+                pages.put(_DONE)
+
+        thread = threading.Thread(target=run, name='jira-fetch', daemon=True)
+        thread.start()
+        while True:
+            item = pages.get()
+            if item is _DONE:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+        thread.join()
+
+
+def load_jira(client, jql, keep_columns=None, profiler=None, page_size=DEFAULT_PAGE_SIZE):
+    """Fetch ``jql`` and merge its pages; returns the frame, parsed dates, pages and duplicates dropped."""
+    severity_field = client.severity_field
+    loaded = []
+    pages = client.iter_pages(jql, page_size)
+    while True:
+        with profile_stage(profiler, 'fetch') as stage:
+            issues = next(pages, None)
+            stage['rows_out'] = 0 if issues is None else len(issues)
+        if issues is None:
+            break
+        with profile_stage(profiler, 'read', len(issues)) as stage:
+            df = issues_frame(issues, severity_field, keep_columns)
+            loaded.append((df, (df['Created'], df['Updated'])))
+            stage['rows_out'] = len(df)
+
+    with profile_stage(profiler, 'merge', sum(len(df) for df, _ in loaded)) as stage:
+        df, parsed_dates, duplicates = merge_uploads(loaded)
+        stage['rows_out'] = len(df)
+    return df, parsed_dates, len(loaded), duplicates
+
+
+def process_jira(client, jql, settings=None, profiler=None, store=None, dataset='default',
+                 page_size=DEFAULT_PAGE_SIZE):
+    """``pipeline.process_upload`` for the issues matching ``jql`` on ``client``'s site.
+
+    With an ``IssueStore`` as ``store`` the issues are processed
+    incrementally (see ``issue_store.process_incremental``).
+    """
+    settings = {**DEFAULT_SETTINGS, **(settings or {})}
+    keep_columns = settings['keep_columns']
+    df, parsed_dates, pages, duplicates = load_jira(client, jql, keep_columns, profiler, page_size)
+    if store is None:
+        result = process_frame(df, settings, parsed_dates, profiler)
+    else:
+        from qc_metrics.issue_store import process_incremental
+
+        result = process_incremental(df, store, dataset, settings, parsed_dates, profiler)
+    if keep_columns is not None and ISSUE_KEY not in keep_columns and ISSUE_KEY in result['df'].columns:
+        result['df'] = result['df'].drop(columns=ISSUE_KEY)
+    result['messages'].insert(0, ('info', f"Fetched {len(df) + duplicates} issue(s) from JIRA in {pages} page(s); "
+                                          f"{duplicates} duplicate(s) dropped, keeping the latest Updated."))
+    return result
@@ -0,0 +1,97 @@
+# The nine QA metrics in display order: (name, numerator, denominator inputs,
+# scale).  The denominator is the sum of its inputs; a metric is null when
+# its numerator or any denominator input is missing or zero.
+QA_METRICS = (
+    # Defect Density (Critical) - page_story_count && critical ? (critical_blocker_bug_count / page_story_count).toFixed(2) : "-"
+    ('Defect Density (Critical)', 'critical_blocker_bug_count', ('page_story_count',), 1),
+    # Defect Density (Total) - page_story_count && total_bugs ? (total_bugs / page_story_count).toFixed(2) : "-"
+    ('Defect Density (Total)', 'total_bugs', ('page_story_count',), 1),
+    # MTFB - High (hrs) - highHrs && highCount ? (highest_high_hours_count / highest_high_bug_count).toFixed(2) : "-"
+    ('MTFB - High (hrs)', 'highest_high_hours_count', ('highest_high_bug_count',), 1),
+    # MTFB - Medium (hrs) - medHrs && medCount ? (medium_hours_count / medium_bug_count).toFixed(2) : "-"
+    ('MTFB - Medium (hrs)', 'medium_hours_count', ('medium_bug_count',), 1),
+    # MTFB - Low (hrs) - lowHrs && lowCount ? (low_lowest_hours_count / low_lowest_bug_count).toFixed(2) : "-"
+    ('MTFB - Low (hrs)', 'low_lowest_hours_count', ('low_lowest_bug_count',), 1),
+    # Severity Ratio (Critical) % - total_bugs && critical ? ((critical_blocker_bug_count / total_bugs) * 100).toFixed(2) + "%" : "-"
+    ('Severity Ratio (Critical) %', 'critical_blocker_bug_count', ('total_bugs',), 100),
+    # Severity Ratio (Major) % - total_bugs && major ? ((major_bug_count / total_bugs) * 100).toFixed(2) + "%" : "-"
+    ('Severity Ratio (Major) %', 'major_bug_count', ('total_bugs',), 100),
+    # Defect Rate - total_bugs && devHrs && testHrs ? (total_bugs / (Number(devHrs) + Number(testHrs))).toFixed(2) : "-"
+    ('Defect Rate', 'total_bugs', ('dev_hrs', 'test_hrs'), 1),
+    # Defect Detection Rate - total_bugs && testHrs ? (total_bugs / testHrs).toFixed(2) : "-"
+    ('Defect Detection Rate', 'total_bugs', ('test_hrs',), 1),
+)
+
+# Input columns of qa_metrics_table: summary variables plus the calculator inputs
+QA_INPUTS = tuple(dict.fromkeys(
+    name for _, numerator, denominator, _ in QA_METRICS for name in (numerator, *denominator)
+))
+
+
+def qa_metrics_table(inputs):
+    """The nine QA metrics for every row of ``inputs``, computed on whole columns.
+
+    ``inputs`` is a DataFrame (or anything ``pd.DataFrame`` accepts, e.g. a
+    list of dicts) with one row per project and the ``QA_INPUTS`` columns:
+    summary variables (see ``pipeline.summarize``) plus 'page_story_count',
+    'dev_hrs' and 'test_hrs'.  Missing columns and values count as 0.
+    Returns a numeric DataFrame on the same index, NaN where the calculator
+    shows "-"; ``format_qa_metrics`` turns it into display strings.
+    """
+    import numpy as np
+    import pandas as pd
+
+    inputs = inputs if isinstance(inputs, pd.DataFrame) else pd.DataFrame(inputs)
+    values = {
+        name: pd.to_numeric(inputs[name], errors='coerce').fillna(0).to_numpy(dtype=np.float64)
+        if name in inputs.columns else np.zeros(len(inputs))
+        for name in QA_INPUTS
+    }
+    columns = {}
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for name, numerator, denominator, scale in QA_METRICS:
+            bottom = sum(values[col] for col in denominator)
+            defined = (values[numerator] != 0) & (bottom != 0)
+            for col in denominator:
+                defined &= values[col] != 0
+            columns[name] = np.where(defined, values[numerator] / bottom * scale, np.nan)
+    return pd.DataFrame(columns, index=inputs.index)
+
+
+def _format_metric(value, scale):
+    """Display string of one metric value: two decimals, '%' on ratios and "-" for null."""
+    if value != value:
+        return "-"
+    return f"{value:.2f}%" if scale == 100 else f"{value:.2f}"
+
+
+def format_qa_metrics(table):
+    """Display strings of a ``qa_metrics_table``."""
+    import pandas as pd
+
+    return pd.DataFrame({
+        name: [_format_metric(value, scale) for value in table[name].to_numpy()]
+        for name, _, _, scale in QA_METRICS
+    }, index=table.index)
+
+
+def calculate_qa_metrics(calc_vars, page_story_count, dev_hrs, test_hrs):
+    """The nine QA metrics as display rows ({"name", "value"}).
+
+    ``calc_vars`` holds the stored calculated variables (see
+    ``pipeline.summarize``); a metric whose inputs are missing or zero is "-".
+    The scalar counterpart of ``qa_metrics_table`` for a single project.
+    """
+    values = {
+        **{name: calc_vars.get(name, 0) for name in QA_INPUTS},
+        'page_story_count': page_story_count,
+        'dev_hrs': float(dev_hrs or 0),
+        'test_hrs': float(test_hrs or 0),
+    }
+    metrics = []
+    for name, numerator, denominator, scale in QA_METRICS:
+        bottom = sum(values[col] for col in denominator)
+        defined = values[numerator] and bottom and all(values[col] for col in denominator)
+        value = values[numerator] / bottom * scale if defined else float('nan')
+        metrics.append({"name": name, "value": _format_metric(value, scale)})
+    return metrics
@@ -0,0 +1,430 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from qc_metrics.buckets import (
+    PRIORITY_BUCKETS,
+    SEVERITY_BUCKETS,
+    assign_buckets,
+    bucket_prefix,
+    bucket_totals,
+    hours_value,
+    normalize_buckets,
+)
+from qc_metrics.dates import (
+    HOURS_PER_DAY,
+    business_calendar,
+    business_day_counts,
+    normalize_window,
+    parse_dates,
+    valid_dates,
+    working_hour_counts,
+)
+from qc_metrics.ingest_cache import ingest_key
+from qc_metrics.profiling import profile_stage
+
+# Must have these two columns
+REQUIRED_COLUMNS = ('Created', 'Updated')
+
+# Severity may come under either of these column names
+SEVERITY_COLUMNS = ('Severity', 'Custom field (Severity)')
+
+# Identifies an issue across exports (incremental mode, multi-file de-duplication)
+ISSUE_KEY = 'Issue key'
+
+# Every column the pipeline itself looks at
+PIPELINE_COLUMNS = REQUIRED_COLUMNS + ('Status',) + SEVERITY_COLUMNS + ('Priority',)
+
+# Settings that change the pipeline output; part of every cache key.
+# keep_columns=None keeps every column of the export; a list of names reads
+# only PIPELINE_COLUMNS plus those (much faster for wide exports).
+# compact_dtypes stores Status/Severity/Priority as categoricals and the
+# counts in the narrowest integer type that holds them.  reader names the
+# ingest backend ('auto' or one of ``ingest.READERS``).  working_hours=None
+# books hours_per_day for every day counted; a working window (see
+# ``dates.WORKING_WINDOW``, e.g. {"start": "09:00", "end": "17:00",
+# "holidays": ["2025-12-25"]}) instead counts the actual working hours from
+# Created to Updated, and its working days for the day count.
+DEFAULT_SETTINGS = {
+    'statuses': ('Done', 'Merge Request'),
+    'hours_per_day': HOURS_PER_DAY,
+    'severity_buckets': SEVERITY_BUCKETS,
+    'priority_buckets': PRIORITY_BUCKETS,
+    'keep_columns': None,
+    'compact_dtypes': True,
+    'reader': 'auto',
+    'working_hours': None,
+}
+
+COUNT_COLUMNS = ('Day count', 'Hours count')
+
+
+class PipelineError(ValueError):
+    """Raised when an upload cannot be processed at all."""
+
+
+def load_settings(path=None):
+    """Pipeline settings, with overrides from a JSON config file if given.
+
+    The file may set any of the DEFAULT_SETTINGS keys, e.g.::
+
+        {"severity_buckets": {"Major": ["Major"], "Minor": ["Minor"],
+                              "Critical/Blocker": ["Critical", "Blocker"],
+                              "Trivial": ["Trivial"]}}
+    """
+    settings = dict(DEFAULT_SETTINGS)
+    if path:
+        with open(path, encoding='utf-8') as f:
+            overrides = json.load(f)
+        unknown = set(overrides) - set(DEFAULT_SETTINGS)
+        if unknown:
+            raise PipelineError(f"Unknown setting(s) in {path}: {', '.join(sorted(unknown))}")
+        settings.update(overrides)
+    settings['statuses'] = tuple(settings['statuses'])
+    if settings['keep_columns'] is not None:
+        settings['keep_columns'] = tuple(settings['keep_columns'])
+    settings['severity_buckets'] = normalize_buckets(settings['severity_buckets'])
+    settings['priority_buckets'] = normalize_buckets(settings['priority_buckets'])
+    if settings['working_hours'] is not None:
+        try:
+            settings['working_hours'] = normalize_window(settings['working_hours'])
+        except ValueError as e:
+            raise PipelineError(str(e)) from None
+    return settings
+
+
+def upload_columns(keep_columns=None):
+    """``usecols`` for reading an export with only the given extra columns.
+
+    None reads every column; otherwise PIPELINE_COLUMNS and ``keep_columns``
+    are read, in file order.
+    """
+    if keep_columns is None:
+        return None
+    wanted = set(PIPELINE_COLUMNS).union(keep_columns)
+    return wanted.__contains__
+
+
+def read_upload(data, keep_columns=None, reader='auto'):
+    """Read uploaded bytes into a DataFrame.
+
+    The format is sniffed from the content, never taken from the file name;
+    see ``ingest.read_export``.
+    """
+    from qc_metrics.ingest import read_export
+
+    return read_export(data, keep_columns, reader)
+
+
+def read_header(data, reader='auto'):
+    """Column names of an upload without reading its rows."""
+    from qc_metrics.ingest import read_export_header
+
+    return read_export_header(data, reader)
+
+
+def check_columns(df):
+    if not set(REQUIRED_COLUMNS).issubset(df.columns):
+        raise PipelineError("Excel must contain 'Created' and 'Updated' columns")
+
+
+def add_day_counts(df, hours_per_day=HOURS_PER_DAY, parsed_dates=None, profiler=None, working_hours=None):
+    """Parse Created/Updated and add 'Day count' and 'Hours count'.
+
+    ``parsed_dates`` may supply already parsed (created, updated) Series.
+    With a ``working_hours`` window the hours are the working hours between
+    the two timestamps (floats) instead of ``hours_per_day`` a day.
+    Rows whose dates cannot be read are dropped.  Returns the new frame and
+    the number of rows removed.
+    """
+    check_columns(df)
+
+    # Handle DD-MM-YY format (day-month-year with 2-digit year), whole column at a time
+    if parsed_dates is None:
+        with profile_stage(profiler, 'parse_dates', len(df)) as stage:
+            created_datetime = parse_dates(df['Created'])
+            updated_datetime = parse_dates(df['Updated'])
+            stage['rows_out'] = len(df)
+    else:
+        created_datetime, updated_datetime = parsed_dates
+
+    with profile_stage(profiler, 'day_count', len(df)) as stage:
+        # Remove rows where date couldn't be parsed
+        invalid = created_datetime.isna() | updated_datetime.isna()
+        removed = int(invalid.sum())
+        if removed:
+            df = df[~invalid].reset_index(drop=True)
+            created_datetime = created_datetime[~invalid].reset_index(drop=True)
+            updated_datetime = updated_datetime[~invalid].reset_index(drop=True)
+        else:
+            df = df.copy()
+
+        # Calculate day count - slice timestamps to dates only, exclude weekends
+        if working_hours is None:
+            df['Day count'] = business_day_counts(created_datetime, updated_datetime)
+            df['Hours count'] = df['Day count'] * np.int32(hours_per_day)
+        else:
+            window = normalize_window(working_hours)
+            calendar = business_calendar(window['weekmask'], window['holidays'])
+            df['Day count'] = business_day_counts(created_datetime, updated_datetime, calendar)
+            df['Hours count'] = working_hour_counts(created_datetime, updated_datetime, window)
+        stage['rows_out'] = len(df)
+    return df, removed
+
+
+def filter_status(df, statuses=DEFAULT_SETTINGS['statuses']):
+    """Keep only rows whose Status is an exact match for one of ``statuses``.
+
+    Returns the new frame and the number of rows excluded (None when there is
+    no Status column and nothing was filtered).
+    """
+    if 'Status' not in df.columns:
+        return df, None
+
+    initial_count = len(df)
+    df = df[df['Status'].isin(list(statuses))].reset_index(drop=True)
+    return df, initial_count - len(df)
+
+
+def filter_and_count(df, hours_per_day=HOURS_PER_DAY, statuses=DEFAULT_SETTINGS['statuses'],
+                     parsed_dates=None, profiler=None, working_hours=None):
+    """``add_day_counts`` followed by ``filter_status``, with the filter run first.
+
+    Dates are parsed and day-counted only for rows with a wanted Status.  The
+    other rows are merely checked for readable dates, so the removed and
+    excluded counts match running the two steps in their original order.
+    Returns the new frame, the rows removed and the rows excluded.
+    """
+    if 'Status' not in df.columns:
+        df, removed = add_day_counts(df, hours_per_day, parsed_dates, profiler, working_hours)
+        return df, removed, None
+
+    check_columns(df)
+    with profile_stage(profiler, 'status_filter', len(df)) as stage:
+        wanted = df['Status'].isin(list(statuses)).to_numpy()
+        others = ~wanted
+        if parsed_dates is None:
+            other_created, other_updated = df['Created'][others], df['Updated'][others]
+            others_valid = valid_dates(other_created)
+            # Updated only matters where Created was readable
+            others_valid[others_valid] = valid_dates(other_updated[others_valid])
+        else:
+            created, updated = parsed_dates
+            others_valid = (created[others].notna() & updated[others].notna()).to_numpy()
+            parsed_dates = (created[wanted].reset_index(drop=True), updated[wanted].reset_index(drop=True))
+        df = df[wanted].reset_index(drop=True)
+        stage['rows_out'] = len(df)
+
+    df, removed = add_day_counts(df, hours_per_day, parsed_dates, profiler, working_hours)
+    excluded = int(others_valid.sum())
+    return df, removed + (len(others_valid) - excluded), excluded
+
+
+def _categories(values, known):
+    """Fixed categories: the ``known`` values in order, then any others seen, sorted."""
+    known = list(dict.fromkeys(known))
+    seen = set(known)
+    others = [value for value in pd.unique(values.dropna()) if value not in seen]
+    return known + sorted(others, key=str)
+
+
+def _narrow_int(values):
+    """``values`` in the smallest signed integer type that holds them."""
+    low, high = (int(values.min()), int(values.max())) if len(values) else (0, 0)
+    for dtype in (np.int8, np.int16, np.int32):
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return values.astype(dtype)
+    return values
+
+
+def compact_dtypes(df, settings=None):
+    """``df`` with Status/Severity/Priority as categoricals and narrow count columns.
+
+    Categories are the configured statuses and bucket values plus whatever
+    else appears, so equal settings give equal category sets and the
+    summaries work on category codes instead of strings.
+    """
+    settings = {**DEFAULT_SETTINGS, **(settings or {})}
+    known = {
+        'Status': settings['statuses'],
+        severity_column(df.columns): [raw for _, values in settings['severity_buckets'] for raw in values],
+        'Priority': [raw for _, values in settings['priority_buckets'] for raw in values],
+    }
+    columns = {}
+    for col, values in known.items():
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            columns[col] = pd.Categorical(df[col], categories=_categories(df[col], values))
+    for col in COUNT_COLUMNS:
+        # Hours are floats in the precise working hours mode
+        if col in df.columns and pd.api.types.is_integer_dtype(df[col].dtype):
+            columns[col] = _narrow_int(df[col])
+    return df.assign(**columns) if columns else df
+
+
+def memory_per_row(df):
+    """Average in-memory bytes per row, strings and categories included."""
+    return int(df.memory_usage(deep=True).sum()) / len(df) if len(df) else 0.0
+
+
+def compact_output(df, settings=None, profiler=None):
+    """``compact_dtypes`` when the settings ask for it.
+
+    Returns the frame and {'bytes_per_row_before', 'bytes_per_row_after'}
+    (None when nothing was compacted).
+    """
+    settings = {**DEFAULT_SETTINGS, **(settings or {})}
+    if not settings['compact_dtypes']:
+        return df, None
+    with profile_stage(profiler, 'compact_dtypes', len(df)) as stage:
+        before = memory_per_row(df)
+        df = compact_dtypes(df, settings)
+        stage['rows_out'] = len(df)
+    return df, {'bytes_per_row_before': before, 'bytes_per_row_after': memory_per_row(df)}
+
+
+def pipeline_messages(removed, excluded, remaining, statuses=DEFAULT_SETTINGS['statuses']):
+    """(level, message) notes for the UI about rows dropped along the way."""
+    messages = []
+    if removed:
+        messages.append(('warning', f"{removed} row(s) had unreadable dates and were removed."))
+    if excluded is None:
+        messages.append(('warning', "No 'Status' column found. All rows will be included in calculations."))
+    elif excluded:
+        wanted = ' or '.join(f"'{status}'" for status in statuses)
+        messages.append(('info', f"Filtered by Status: {excluded} row(s) excluded "
+                                 f"(Status not {wanted}). {remaining} row(s) remaining."))
+    return messages
+
+
+def severity_column(columns):
+    """Severity column name if available (check both possible column names)."""
+    return next((col for col in SEVERITY_COLUMNS if col in columns), None)
+
+
+def _add_bucket_variables(variables, df, column, buckets):
+    """Totals for every bucket of ``column`` from a single aggregation pass."""
+    if column is not None and len(df):
+        bucket_ids = assign_buckets(df[column], buckets)
+        bugs, days, hours = bucket_totals(bucket_ids, len(buckets), df['Day count'], df['Hours count'])
+    else:
+        bugs = days = hours = [0] * len(buckets)
+    for index, (label, _) in enumerate(buckets):
+        prefix = bucket_prefix(label)
+        variables[f'{prefix}_bug_count'] = int(bugs[index])
+        variables[f'{prefix}_day_count'] = int(days[index])
+        variables[f'{prefix}_hours_count'] = hours_value(hours[index])
+
+
+def summary_variables(df, settings=None):
+    """Bug/day/hour totals per severity and priority bucket, plus overall totals.
+
+    Every value is a count or a sum, so variables of disjoint row sets can be
+    added together.
+    """
+    settings = {**DEFAULT_SETTINGS, **(settings or {})}
+    variables = {}
+    _add_bucket_variables(variables, df, severity_column(df.columns), settings['severity_buckets'])
+    _add_bucket_variables(variables, df, 'Priority' if 'Priority' in df.columns else None,
+                          settings['priority_buckets'])
+
+    # Bug count: actual row count from Excel
+    variables['total_bugs'] = len(df)
+    variables['total_hours'] = hours_value(df['Hours count'].sum()) if 'Hours count' in df.columns else 0
+    variables['total_day_count'] = int(df['Day count'].sum()) if 'Day count' in df.columns else 0
+    return variables
+
+
+def _summary_rows(variables, name, buckets):
+    return [
+        {
+            name: label,
+            "Bug count": variables[f'{bucket_prefix(label)}_bug_count'],
+            "Day count": variables[f'{bucket_prefix(label)}_day_count'],
+            "Hours count": variables[f'{bucket_prefix(label)}_hours_count']
+        }
+        for label, _ in buckets
+    ]
+
+
+def summary_tables(variables, has_severity, has_priority, settings=None):
+    """Severity and priority summary rows built from the calculated variables."""
+    settings = {**DEFAULT_SETTINGS, **(settings or {})}
+    return {
+        'severity_summary': _summary_rows(variables, "Severity", settings['severity_buckets']) if has_severity else [],
+        'priority_summary': _summary_rows(variables, "Priority", settings['priority_buckets']) if has_priority else [],
+        'variables': variables,
+    }
+
+
+def summarize(df, settings=None):
+    """Severity and priority summaries plus the variables behind the QA metrics."""
+    return summary_tables(
+        summary_variables(df, settings),
+        has_severity=severity_column(df.columns) is not None,
+        has_priority='Priority' in df.columns,
+        settings=settings,
+    )
+
+
+def process_frame(df, settings=None, parsed_dates=None, profiler=None):
+    """Day counts, Status filter and summaries for an already-read DataFrame."""
+    settings = {**DEFAULT_SETTINGS, **(settings or {})}
+    df, removed, excluded = filter_and_count(
+        df, settings['hours_per_day'], settings['statuses'], parsed_dates, profiler, settings['working_hours']
+    )
+    df, memory = compact_output(df, settings, profiler)
+    with profile_stage(profiler, 'summaries', len(df)):
+        summaries = summarize(df, settings)
+    return {
+        'df': df,
+        'messages': pipeline_messages(removed, excluded, len(df), settings['statuses']),
+        'memory': memory,
+        **summaries,
+    }
+
+
+def load_upload(data, ingest_cache=None, keep_columns=None, profiler=None, reader='auto'):
+    """Read uploaded bytes, going through the on-disk ``IngestCache`` if given.
+
+    Returns the DataFrame and the parsed (created, updated) dates, or None
+    for the dates when they still have to be parsed.
+    """
+    if ingest_cache is None:
+        with profile_stage(profiler, 'read') as stage:
+            df = read_upload(data, keep_columns, reader)
+            stage['rows_out'] = len(df)
+        return df, None
+
+    from qc_metrics.ingest import source_reader
+
+    key = ingest_key(data, source_reader(data, reader), keep_columns)
+    with profile_stage(profiler, 'ingest_cache_load') as stage:
+        cached = ingest_cache.load(key)
+        stage['rows_out'] = 0 if cached is None else len(cached[0])
+    if cached is not None:
+        df, created, updated = cached
+        return df, (created, updated)
+
+    with profile_stage(profiler, 'read') as stage:
+        df = read_upload(data, keep_columns, reader)
+        stage['rows_out'] = len(df)
+    check_columns(df)
+    with profile_stage(profiler, 'parse_dates', len(df)) as stage:
+        parsed_dates = parse_dates(df['Created']), parse_dates(df['Updated'])
+        stage['rows_out'] = len(df)
+    with profile_stage(profiler, 'ingest_cache_store', len(df)):
+        ingest_cache.store(key, df, *parsed_dates)
+    return df, parsed_dates
+
+
+def process_upload(data, settings=None, ingest_cache=None, profiler=None):
+    """Full pipeline for uploaded file bytes: read, filter, parse, count, summarize.
+
+    The format is sniffed from ``data``.
+    Pass a ``profiling.Profiler`` to record the time spent in each stage.
+    """
+    settings = {**DEFAULT_SETTINGS, **(settings or {})}
+    df, parsed_dates = load_upload(data, ingest_cache, settings['keep_columns'], profiler, settings['reader'])
+    return process_frame(df, settings, parsed_dates, profiler)
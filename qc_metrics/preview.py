@@ -0,0 +1,79 @@
+"""Paged, server-side preview of the updated data.
+
+The app keeps the enriched frame on the server and only sends the rows of
+the page being looked at, so a rerun costs the same for 1,000 rows as for
+10 million.  Filtering and sorting produce an array of row positions, which
+the caller can keep between reruns: turning a page is then just a ``take``.
+"""
+import numpy as np
+import pandas as pd
+
+from qc_metrics.pipeline import severity_column
+
+PAGE_SIZES = (50, 100, 500, 1000)
+DEFAULT_PAGE_SIZE = 100
+
+DAY_COUNT = 'Day count'
+
+
+def filter_columns(columns):
+    """Columns the preview can filter by value: Status, Severity, Priority where present."""
+    return [col for col in ('Status', severity_column(columns), 'Priority') if col is not None and col in columns]
+
+
+def filter_options(df):
+    """{column: sorted distinct values} for the value filters, plus the Day count range."""
+    options = {}
+    for col in filter_columns(df.columns):
+        options[col] = sorted(map(str, df[col].dropna().unique()))
+    if DAY_COUNT in df.columns and len(df):
+        options[DAY_COUNT] = (int(df[DAY_COUNT].min()), int(df[DAY_COUNT].max()))
+    return options
+
+
+def filter_mask(df, filters):
+    """Boolean array of the rows matching ``filters``.
+
+    ``filters`` maps a value-filter column to the values to keep (an empty
+    selection keeps everything) and may hold a ``(low, high)`` Day count range.
+    """
+    mask = np.ones(len(df), dtype=bool)
+    for col, wanted in (filters or {}).items():
+        if col == DAY_COUNT:
+            low, high = wanted
+            day_count = df[DAY_COUNT].to_numpy()
+            mask &= (day_count >= low) & (day_count <= high)
+        elif wanted:
+            mask &= df[col].astype(str).isin(list(wanted)).to_numpy() & df[col].notna().to_numpy()
+    return mask
+
+
+def matching_positions(df, filters=None, sort_by=None, ascending=True):
+    """Row positions of ``df`` that match ``filters``, in display order.
+
+    Sorting is stable with missing values last, so ties keep file order.
+    """
+    if filters:
+        positions = np.flatnonzero(filter_mask(df, filters))
+    else:
+        positions = np.arange(len(df))
+    if sort_by is not None:
+        keys = df[sort_by].take(positions).reset_index(drop=True)
+        order = keys.sort_values(ascending=ascending, kind='stable', na_position='last').index.to_numpy()
+        positions = positions[order]
+    return positions
+
+
+def page_count(matching, page_size):
+    return max(1, -(-matching // page_size))
+
+
+def page_rows(df, positions, page, page_size=DEFAULT_PAGE_SIZE):
+    """Rows of page ``page`` (0-based) of ``positions``, keeping their original row numbers.
+
+    ``positions`` None means every row in file order (nothing filtered or sorted).
+    """
+    start = page * page_size
+    if positions is None:
+        return df.iloc[start:start + page_size]
+    return df.take(positions[start:start + page_size])
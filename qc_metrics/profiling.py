@@ -0,0 +1,159 @@
+"""Per-stage timing of the pipeline and the structured log it goes to.
+
+A ``Profiler`` is passed down the pipeline; every stage runs inside
+``profiler.stage(name, rows_in)`` and records its wall time, rows in and out
+and the change in resident memory.  A stage entered again (e.g. once per
+chunk when streaming) adds to the same record.
+
+Profiles are logged as one JSON object per line on the ``qc_metrics.profile``
+logger; ``python -m qc_metrics.profiling LOG`` prints latency percentiles
+per stage from such a log.
+"""
+import argparse
+import datetime as dt
+import json
+import logging
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger('qc_metrics.profile')
+
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+def rss_bytes():
+    """Resident memory of this process, or None where it cannot be read cheaply."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class Profiler:
+    """Collects stage records in the order the stages first ran."""
+
+    def __init__(self):
+        self._records = {}
+
+    @contextmanager
+    def stage(self, name, rows_in=None):
+        """Time the block; set ``record['rows_out']`` inside it to log the rows produced."""
+        record = {'rows_out': None}
+        rss_before = rss_bytes()
+        started = time.perf_counter()
+        try:
+            yield record
+        finally:
+            seconds = time.perf_counter() - started
+            rss_after = rss_bytes()
+            memory_delta = None if rss_before is None or rss_after is None else rss_after - rss_before
+            self._add(name, seconds, rows_in, record['rows_out'], memory_delta)
+
+    def _add(self, name, seconds, rows_in, rows_out, memory_delta):
+        total = self._records.setdefault(name, {
+            'stage': name, 'seconds': 0.0, 'rows_in': None, 'rows_out': None, 'memory_delta_bytes': None,
+        })
+        total['seconds'] += seconds
+        for key, value in (('rows_in', rows_in), ('rows_out', rows_out), ('memory_delta_bytes', memory_delta)):
+            if value is not None:
+                total[key] = (total[key] or 0) + int(value)
+
+    def records(self):
+        """Stage records as plain dicts (seconds rounded to microseconds)."""
+        return [{**record, 'seconds': round(record['seconds'], 6)} for record in self._records.values()]
+
+    @property
+    def total_seconds(self):
+        return sum(record['seconds'] for record in self._records.values())
+
+
+@contextmanager
+def profile_stage(profiler, name, rows_in=None):
+    """``profiler.stage(...)``, or a no-op when ``profiler`` is None."""
+    if profiler is None:
+        yield {'rows_out': None}
+    else:
+        with profiler.stage(name, rows_in) as record:
+            yield record
+
+
+def configure_profile_log(path):
+    """Append profile records to ``path`` as JSON lines (once per path)."""
+    path = os.path.abspath(path)
+    if any(getattr(handler, 'baseFilename', None) == path for handler in logger.handlers):
+        return
+    handler = logging.FileHandler(path, encoding='utf-8')
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
+def log_profile(stages, **fields):
+    """Write one JSON line with the ``stages`` records and any extra ``fields``."""
+    if not logger.isEnabledFor(logging.INFO):
+        return
+    entry = {
+        'time': dt.datetime.now(dt.timezone.utc).isoformat(timespec='milliseconds'),
+        **fields,
+        'total_seconds': round(sum(stage['seconds'] for stage in stages), 6),
+        'stages': stages,
+    }
+    logger.info(json.dumps(entry, default=str))
+
+
+def latency_percentiles(entries, percentiles=(50, 90, 99)):
+    """{stage: {'count', 'p50', ...}} in seconds over logged profile entries.
+
+    The whole run is reported under 'total'.
+    """
+    import numpy as np
+
+    seconds = {'total': []}
+    for entry in entries:
+        seconds['total'].append(entry['total_seconds'])
+        for stage in entry['stages']:
+            seconds.setdefault(stage['stage'], []).append(stage['seconds'])
+    return {
+        stage: {'count': len(values), **{
+            f'p{p}': float(value) for p, value in zip(percentiles, np.percentile(values, percentiles))
+        }}
+        for stage, values in seconds.items()
+    }
+
+
+def read_profile_log(path):
+    """Entries of a JSON-lines profile log; lines that are not profiles are skipped."""
+    entries = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(entry, dict) and 'stages' in entry:
+                entries.append(entry)
+    return entries
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m qc_metrics.profiling',
+                                     description="Latency percentiles per pipeline stage from a profile log.")
+    parser.add_argument('log', help="JSON-lines profile log (QC_METRICS_PROFILE_LOG / --profile-log)")
+    args = parser.parse_args(argv)
+
+    entries = read_profile_log(args.log)
+    if not entries:
+        print("No profile entries found.", file=sys.stderr)
+        return 1
+    print(f"{'stage':<16} {'count':>7} {'p50 s':>9} {'p90 s':>9} {'p99 s':>9}")
+    for stage, stats in latency_percentiles(entries).items():
+        print(f"{stage:<16} {stats['count']:>7} {stats['p50']:>9.3f} {stats['p90']:>9.3f} {stats['p99']:>9.3f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
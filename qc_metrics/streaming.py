@@ -0,0 +1,121 @@
+"""Chunked CSV processing with memory bounded by the chunk size.
+
+Each chunk is Status-filtered, parsed and day-counted on its own; its summary
+variables (all counts and sums) are folded into running totals and the
+enriched rows are appended to the output instead of being kept around.
+"""
+import os
+import tempfile
+
+import pandas as pd
+
+from qc_metrics.export import rounded_hours
+from qc_metrics.pipeline import (
+    DEFAULT_SETTINGS,
+    filter_and_count,
+    pipeline_messages,
+    severity_column,
+    summary_tables,
+    summary_variables,
+    upload_columns,
+)
+from qc_metrics.profiling import profile_stage
+
+# Rows read per chunk; peak memory scales with this, not with the file size
+DEFAULT_CHUNKSIZE = 100_000
+
+
+def _add_variables(totals, variables):
+    if totals is None:
+        return dict(variables)
+    for name, value in variables.items():
+        totals[name] += value
+    return totals
+
+
+def stream_csv(source, output=None, settings=None, chunksize=DEFAULT_CHUNKSIZE, preview_rows=0, profiler=None):
+    """Run the pipeline over a CSV in chunks of ``chunksize`` rows.
+
+    ``source`` is anything ``pd.read_csv`` accepts.  When ``output`` (a path
+    or text file object) is given the enriched rows are written to it as CSV
+    chunk by chunk.  The result has the same keys as
+    ``pipeline.process_frame`` except that ``df`` only holds the first
+    ``preview_rows`` enriched rows.  A ``profiling.Profiler`` gets the
+    stage times summed over all chunks.
+    """
+    settings = {**DEFAULT_SETTINGS, **(settings or {})}
+    handle = open(output, 'w', newline='', encoding='utf-8') if isinstance(output, str) else output
+
+    totals = None
+    removed = 0
+    excluded = 0
+    remaining = 0
+    has_severity = has_priority = False
+    preview = []
+    preview_count = 0
+    write_header = True
+    try:
+        usecols = upload_columns(settings['keep_columns'])
+        reader = iter(pd.read_csv(source, chunksize=chunksize, usecols=usecols))
+        while True:
+            with profile_stage(profiler, 'read') as stage:
+                raw = next(reader, None)
+                stage['rows_out'] = 0 if raw is None else len(raw)
+            if raw is None:
+                break
+            chunk, chunk_removed, chunk_excluded = filter_and_count(
+                raw, settings['hours_per_day'], settings['statuses'], profiler=profiler,
+                working_hours=settings['working_hours'],
+            )
+            removed += chunk_removed
+            excluded = None if chunk_excluded is None else excluded + chunk_excluded
+            remaining += len(chunk)
+            has_severity = severity_column(chunk.columns) is not None
+            has_priority = 'Priority' in chunk.columns
+            with profile_stage(profiler, 'summaries', len(chunk)):
+                totals = _add_variables(totals, summary_variables(chunk, settings))
+
+            if handle is not None:
+                with profile_stage(profiler, 'write_csv', len(chunk)) as stage:
+                    rounded_hours(chunk).to_csv(handle, index=False, header=write_header)
+                    stage['rows_out'] = len(chunk)
+                write_header = False
+            if preview_count < preview_rows:
+                preview.append(chunk.head(preview_rows - preview_count))
+                preview_count += len(preview[-1])
+    finally:
+        if handle is not None and handle is not output:
+            handle.close()
+
+    if totals is None:
+        raise pd.errors.EmptyDataError("No rows to process")
+
+    return {
+        'df': pd.concat(preview, ignore_index=True) if preview else chunk.head(0),
+        'messages': pipeline_messages(removed, excluded, remaining, settings['statuses']),
+        **summary_tables(totals, has_severity, has_priority, settings),
+    }
+
+
+def stream_to_tempfile(source, settings=None, chunksize=DEFAULT_CHUNKSIZE, preview_rows=0, profiler=None):
+    """``stream_csv`` writing the enriched rows to a temporary CSV.
+
+    The path is returned under ``output_path``; remove it with
+    ``discard_output`` once the result is no longer needed.
+    """
+    fd, path = tempfile.mkstemp(prefix='qc_metrics_', suffix='.csv')
+    os.close(fd)
+    try:
+        result = stream_csv(source, path, settings, chunksize, preview_rows, profiler)
+    except BaseException:
+        os.remove(path)
+        raise
+    result['output_path'] = path
+    return result
+
+
+def discard_output(result):
+    """Delete the temporary CSV behind a streamed result, if any."""
+    path = result.get('output_path') if isinstance(result, dict) else None
+    if path and os.path.exists(path):
+        os.remove(path)
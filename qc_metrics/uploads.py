@@ -0,0 +1,155 @@
+"""Several exports uploaded together, processed as one.
+
+Every file is read and date-parsed in its own worker, so the wall time
+follows the slowest file rather than the sum.  The frames are concatenated
+and issues appearing more than once (same Issue key) keep only the row with
+the latest Updated.  Day counts, the Status filter and the summaries then run
+once on the merged frame, exactly as for a single upload.
+"""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from qc_metrics.dates import parse_dates
+from qc_metrics.ingest import EXCEL_FORMATS, sniff_format
+from qc_metrics.pipeline import (
+    DEFAULT_SETTINGS,
+    ISSUE_KEY,
+    PipelineError,
+    check_columns,
+    load_upload,
+    process_frame,
+)
+from qc_metrics.profiling import profile_stage
+
+PARALLEL_MODES = ('auto', 'thread', 'process')
+
+
+def load_parsed(data, name, keep_columns=None, ingest_cache=None, reader='auto'):
+    """Read one upload and parse its Created/Updated (runs in a worker)."""
+    try:
+        df, parsed_dates = load_upload(data, ingest_cache, keep_columns, reader=reader)
+        if parsed_dates is None:
+            check_columns(df)
+            parsed_dates = parse_dates(df['Created']), parse_dates(df['Updated'])
+    except PipelineError as e:
+        raise PipelineError(f"{name}: {e}") from None
+    return df, parsed_dates
+
+
+def _process_context():
+    """Start method for worker processes.
+
+    forkserver children fork from a server that has already imported the
+    pipeline, so they neither re-import pandas nor inherit the app's threads.
+    """
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('forkserver')
+        context.set_forkserver_preload(['qc_metrics.uploads'])
+        return context
+    return multiprocessing.get_context('spawn')
+
+
+def _executor(files, parallel, max_workers):
+    """Pool for reading ``files``.
+
+    'auto' picks processes when there is an Excel file (openpyxl holds the GIL
+    for the whole parse) and more than one CPU, threads otherwise (the CSV
+    parser releases it, and threads need no pickling of the frames).
+    """
+    if parallel not in PARALLEL_MODES:
+        raise ValueError(f"parallel must be one of {', '.join(PARALLEL_MODES)}")
+    workers = max_workers or min(len(files), os.cpu_count() or 1)
+    if parallel == 'auto':
+        excel = any(sniff_format(data) in EXCEL_FORMATS for data, _ in files)
+        parallel = 'process' if excel and (os.cpu_count() or 1) > 1 else 'thread'
+    if parallel == 'process':
+        return ProcessPoolExecutor(max_workers=workers, mp_context=_process_context())
+    return ThreadPoolExecutor(max_workers=workers)
+
+
+def merge_uploads(loaded):
+    """Concatenate (df, (created, updated)) pairs and drop duplicate issues.
+
+    Of the rows sharing an Issue key the one with the latest Updated is kept;
+    on a tie the later file wins and an unreadable Updated counts as oldest.
+    Rows without a key are all kept.  Returns the frame, its parsed dates and
+    the number of rows dropped.
+    """
+    df = pd.concat([frame for frame, _ in loaded], ignore_index=True)
+    created = pd.concat([dates[0] for _, dates in loaded], ignore_index=True)
+    updated = pd.concat([dates[1] for _, dates in loaded], ignore_index=True)
+    if ISSUE_KEY not in df.columns:
+        return df, (created, updated), 0
+
+    # Oldest first, file order among equals, so the last of each key is the one to keep
+    ranked = updated.sort_values(na_position='first', kind='stable').index.to_numpy()
+    keys = df[ISSUE_KEY].take(ranked).reset_index(drop=True)
+    older = (keys.duplicated(keep='last') & keys.notna()).to_numpy()
+    if not older.any():
+        return df, (created, updated), 0
+    keep = np.ones(len(df), dtype=bool)
+    keep[ranked[older]] = False
+    return (
+        df[keep].reset_index(drop=True),
+        (created[keep].reset_index(drop=True), updated[keep].reset_index(drop=True)),
+        int((~keep).sum()),
+    )
+
+
+def load_uploads(files, ingest_cache=None, keep_columns=None, profiler=None, parallel='auto', max_workers=None,
+                 reader='auto'):
+    """Read, parse and merge ``files`` [(bytes, name)] in parallel.
+
+    Returns the merged frame, its parsed (created, updated) dates and the
+    number of duplicate rows dropped.
+    """
+    names = [name for _, name in files]
+    with profile_stage(profiler, 'read') as stage:
+        if len(files) == 1:
+            loaded = [load_parsed(files[0][0], names[0], keep_columns, ingest_cache, reader)]
+        else:
+            with _executor(files, parallel, max_workers) as pool:
+                futures = [pool.submit(load_parsed, data, name, keep_columns, ingest_cache, reader)
+                           for data, name in files]
+                loaded = [future.result() for future in futures]
+        stage['rows_out'] = sum(len(df) for df, _ in loaded)
+
+    with profile_stage(profiler, 'merge', stage['rows_out']) as stage:
+        df, parsed_dates, duplicates = merge_uploads(loaded)
+        stage['rows_out'] = len(df)
+    return df, parsed_dates, duplicates
+
+
+def process_uploads(files, settings=None, ingest_cache=None, profiler=None, parallel='auto', max_workers=None,
+                    store=None, dataset='default'):
+    """``pipeline.process_upload`` for several files merged into one export.
+
+    With an ``IssueStore`` as ``store`` the merged frame is processed
+    incrementally (see ``issue_store.process_incremental``).
+    """
+    settings = {**DEFAULT_SETTINGS, **(settings or {})}
+    keep_columns = settings['keep_columns']
+    # The key is read for de-duplication even when the output should not keep it
+    drop_key = keep_columns is not None and ISSUE_KEY not in keep_columns
+    if drop_key:
+        keep_columns = (*keep_columns, ISSUE_KEY)
+
+    df, parsed_dates, duplicates = load_uploads(
+        files, ingest_cache, keep_columns, profiler, parallel, max_workers, settings['reader']
+    )
+    if store is None:
+        result = process_frame(df, settings, parsed_dates, profiler)
+    else:
+        from qc_metrics.issue_store import process_incremental
+
+        result = process_incremental(df, store, dataset, settings, parsed_dates, profiler)
+    if drop_key and ISSUE_KEY in result['df'].columns:
+        result['df'] = result['df'].drop(columns=ISSUE_KEY)
+    if len(files) > 1:
+        result['messages'].insert(0, ('info', f"Merged {len(files)} files into {len(df)} row(s); "
+                                              f"{duplicates} duplicate issue(s) dropped, keeping the latest Updated."))
+    return result
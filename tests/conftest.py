@@ -0,0 +1,12 @@
+import pytest
+
+from benchmarks.generate import generate_frame
+
+
+@pytest.fixture
+def make_export():
+    """CSV bytes of a synthetic export (mixed date layouts, some unparseable)."""
+    def make(rows=2_000, seed=0):
+        return generate_frame(rows, seed).to_csv(index=False).encode('utf-8')
+
+    return make
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from qc_metrics.buckets import PRIORITY_BUCKETS, assign_buckets, bucket_prefix
+from qc_metrics.pipeline import summary_variables
+
+# 'Critical' is listed twice: it counts for the first bucket only
+OVERLAPPING = (
+    ('Critical/Blocker', ('Critical', 'Blocker')),
+    ('Major', ('Major', 'Critical')),
+    ('Minor', ('Minor',)),
+)
+VALUES = ['Critical', 'Blocker', 'Major', 'Minor', 'Trivial', None, 'major', ' Major']
+
+
+def random_frame(rows=2_000, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'Severity': pd.Series(rng.choice(np.array(VALUES, dtype=object), rows), dtype=object),
+        'Priority': pd.Series(rng.choice(np.array(['Highest', 'High', 'Medium', 'Low', 'Lowest', None],
+                                                  dtype=object), rows), dtype=object),
+        'Day count': rng.integers(0, 30, rows),
+        'Hours count': rng.random(rows) * 100,
+    })
+
+
+def naive_totals(df, column, buckets):
+    """Bug/day/hour totals per bucket with one boolean mask per bucket, first bucket winning."""
+    claimed = pd.Series(False, index=df.index)
+    totals = {}
+    for label, raw_values in buckets:
+        mask = df[column].isin(raw_values) & ~claimed
+        claimed |= mask
+        prefix = bucket_prefix(label)
+        totals[f'{prefix}_bug_count'] = int(mask.sum())
+        totals[f'{prefix}_day_count'] = int(df.loc[mask, 'Day count'].sum())
+        totals[f'{prefix}_hours_count'] = df.loc[mask, 'Hours count'].sum()
+    return totals
+
+
+@pytest.mark.parametrize('categorical', [False, True])
+def test_single_pass_matches_masks(categorical):
+    df = random_frame()
+    if categorical:
+        df['Severity'] = df['Severity'].astype('category')
+    settings = {'severity_buckets': OVERLAPPING}
+    variables = summary_variables(df, settings)
+
+    expected = {**naive_totals(df, 'Severity', OVERLAPPING),
+                **naive_totals(df, 'Priority', PRIORITY_BUCKETS)}
+    assert variables == pytest.approx(expected | {
+        'total_bugs': len(df), 'total_hours': df['Hours count'].sum(), 'total_day_count': int(df['Day count'].sum()),
+    })
+
+
+def test_assign_buckets_marks_unknown_and_missing():
+    values = pd.Series(['Blocker', 'Trivial', None, 'Critical', 'Minor'], dtype=object)
+    assert assign_buckets(values, OVERLAPPING).tolist() == [0, -1, -1, 0, 2]
+    assert assign_buckets(values.astype('category'), OVERLAPPING).tolist() == [0, -1, -1, 0, 2]
+
+
+def test_empty_frame_has_zero_totals():
+    variables = summary_variables(random_frame().head(0))
+    assert set(variables.values()) == {0}
@@ -0,0 +1,18 @@
+import pytest
+
+from qc_metrics.cli import check_stems
+
+
+def test_distinct_stems_pass():
+    check_stems(['a/export.csv', 'a/export-2.csv.gz', 'b/other.xlsx'], jira_name='jira')
+
+
+@pytest.mark.parametrize('inputs, jira_name', [
+    (['a/export.csv', 'b/export.csv'], None),
+    (['x.csv', 'x.xlsx'], None),
+    (['Export.csv', 'export.csv.gz'], None),
+    (['jira.csv'], 'jira'),
+])
+def test_clashing_stems_are_refused(inputs, jira_name):
+    with pytest.raises(ValueError, match="overwrite each other's outputs"):
+        check_stems(inputs, jira_name)
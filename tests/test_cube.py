@@ -0,0 +1,78 @@
+import datetime as dt
+
+import pandas as pd
+import pytest
+
+from qc_metrics.cube import build_cube
+from qc_metrics.dates import normalize_window, parse_dates
+from qc_metrics.metrics import qa_metrics_table
+from qc_metrics.pipeline import process_upload, summary_variables
+
+SPRINTS = [
+    ('Sprint A', dt.date(2021, 3, 1), dt.date(2021, 3, 14)),
+    ('Sprint B', dt.date(2021, 3, 15), dt.date(2021, 3, 28)),
+    # Gap before the next sprint: those rows belong to no period
+    ('Sprint C', dt.date(2021, 4, 12), dt.date(2021, 5, 9)),
+]
+
+
+@pytest.fixture(scope='module')
+def enriched():
+    from benchmarks.generate import generate_frame
+
+    data = generate_frame(4_000, seed=7).to_csv(index=False).encode('utf-8')
+    # Working hours make the hour totals fractional
+    settings = {'working_hours': normalize_window({'start': '09:00', 'end': '17:00'})}
+    return process_upload(data, settings)['df']
+
+
+def local_days(df, column='Created'):
+    dates = parse_dates(df[column])
+    if getattr(dates.dt, 'tz', None) is not None:
+        dates = dates.dt.tz_localize(None)
+    return dates.dt.normalize()
+
+
+def test_week_totals_match_summaries_of_the_weeks_rows(enriched):
+    cube = build_cube(enriched)
+    days = local_days(enriched)
+    mondays = days - pd.to_timedelta(days.dt.weekday, unit='D')
+
+    assert len(cube) == mondays.nunique()
+    for period, start in enumerate(pd.to_datetime(cube.starts)):
+        rows = enriched[mondays == start]
+        assert cube.labels[period] == f"{start.isocalendar()[0]}-W{start.isocalendar()[1]:02d}"
+        assert cube.variables(period) == pytest.approx(summary_variables(rows))
+    # Rows with an unreadable Created fall outside every week
+    assert cube.variables() == pytest.approx(summary_variables(enriched[days.notna()]))
+
+
+def test_sprint_totals_leave_out_rows_between_sprints(enriched):
+    cube = build_cube(enriched, date_column='Updated', sprints=SPRINTS)
+    days = local_days(enriched, 'Updated')
+
+    assert cube.labels == [name for name, _, _ in SPRINTS]
+    inside = pd.Series(False, index=enriched.index)
+    for period, (_, start, end) in enumerate(SPRINTS):
+        in_sprint = (days >= pd.Timestamp(start)) & (days <= pd.Timestamp(end))
+        inside |= in_sprint
+        assert cube.variables(period) == pytest.approx(summary_variables(enriched[in_sprint]))
+    assert cube.variables([0, 2]) == pytest.approx(summary_variables(
+        enriched[(days >= pd.Timestamp(SPRINTS[0][1])) & (days <= pd.Timestamp(SPRINTS[0][2]))
+                 | (days >= pd.Timestamp(SPRINTS[2][1])) & (days <= pd.Timestamp(SPRINTS[2][2]))]
+    ))
+    assert cube.variables()['total_bugs'] == inside.sum() < len(enriched)
+
+
+def test_period_metrics_match_metrics_of_the_periods_rows(enriched):
+    cube = build_cube(enriched)
+    days = local_days(enriched)
+    mondays = days - pd.to_timedelta(days.dt.weekday, unit='D')
+    metrics = cube.period_metrics(page_story_count=40)
+
+    variables = pd.DataFrame([summary_variables(enriched[mondays == start])
+                              for start in pd.to_datetime(cube.starts)])
+    hours = variables['total_hours']
+    expected = qa_metrics_table(variables.assign(page_story_count=40, dev_hrs=hours, test_hrs=hours))
+    assert metrics['Period'].tolist() == cube.labels
+    pd.testing.assert_frame_equal(metrics.drop(columns='Period'), expected)
@@ -0,0 +1,98 @@
+import datetime as dt
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from qc_metrics.dates import business_calendar, business_day_counts, normalize_window, working_hour_counts
+
+HOLIDAYS = ['2025-03-05', '2025-03-17']
+
+
+def brute_force_hours(created, updated, window):
+    """Working hours from ``created`` to ``updated`` by walking the span minute by minute."""
+    window = normalize_window(window)
+    open_at = dt.time.fromisoformat(window['start'])
+    close_at = dt.time.fromisoformat(window['end'])
+    weekdays = {'Mon': 0, 'Tue': 1, 'Wed': 2, 'Thu': 3, 'Fri': 4, 'Sat': 5, 'Sun': 6}
+    working_days = {weekdays[day] for day in window['weekmask'].split()}
+    holidays = {dt.date.fromisoformat(day) for day in window['holidays']}
+    minutes = 0
+    moment = created
+    while moment < updated:
+        if (moment.weekday() in working_days and moment.date() not in holidays
+                and open_at <= moment.time() < close_at):
+            minutes += 1
+        moment += dt.timedelta(minutes=1)
+    return minutes / 60
+
+
+def random_pairs(count, seed):
+    rng = random.Random(seed)
+    start = dt.datetime(2025, 3, 1)
+    pairs = []
+    for _ in range(count):
+        created = start + dt.timedelta(minutes=rng.randrange(0, 25 * 24 * 60))
+        # About a fifth of the spans run backwards
+        updated = created + dt.timedelta(minutes=rng.randrange(-2 * 24 * 60, 8 * 24 * 60))
+        pairs.append((created, updated))
+    return pairs
+
+
+@pytest.mark.parametrize('window', [
+    None,
+    {'start': '08:30', 'end': '17:15', 'holidays': HOLIDAYS},
+    {'start': '10:00', 'end': '18:00', 'weekmask': 'Sun Mon Tue Wed Thu'},
+])
+def test_working_hours_match_brute_force(window):
+    pairs = random_pairs(400, seed=len(str(window)))
+    created = pd.Series([pair[0] for pair in pairs])
+    updated = pd.Series([pair[1] for pair in pairs])
+    expected = [brute_force_hours(c, u, window) for c, u in pairs]
+    np.testing.assert_allclose(working_hour_counts(created, updated, window), expected)
+
+
+def test_reversed_span_from_a_day_off_is_zero():
+    # Created on a Sunday, Updated the Friday before, late in the evening
+    created = pd.Series([pd.Timestamp('2025-03-09 10:00')])
+    updated = pd.Series([pd.Timestamp('2025-03-07 22:53')])
+    assert working_hour_counts(created, updated).tolist() == [0.0]
+
+
+def test_missing_dates_count_zero():
+    created = pd.Series([pd.Timestamp('2025-03-03 09:00'), pd.NaT])
+    updated = pd.Series([pd.NaT, pd.Timestamp('2025-03-03 17:00')])
+    assert working_hour_counts(created, updated).tolist() == [0.0, 0.0]
+
+
+def scalar_day_count(created, updated, weekmask='1111100', holidays=()):
+    """The original row-by-row Day count: 1 on the same date, else business days from Created to Updated minus one."""
+    if created is None or updated is None:
+        return 0
+    if created.date() == updated.date():
+        return 1
+    end = updated.date() + dt.timedelta(days=1)
+    return max(1, int(np.busday_count(created.date(), end, weekmask=weekmask, holidays=list(holidays))) - 1)
+
+
+@pytest.mark.parametrize('calendar', [None, ('1111100', HOLIDAYS), ('0111110', ())])
+def test_day_counts_match_row_by_row(calendar):
+    pairs = random_pairs(500, seed=7)
+    # Missing dates on either side
+    pairs += [(None, pairs[0][1]), (pairs[1][0], None), (None, None)]
+    created = pd.Series([pair[0] for pair in pairs], dtype='datetime64[us]')
+    updated = pd.Series([pair[1] for pair in pairs], dtype='datetime64[us]')
+    weekmask, holidays = calendar or ('1111100', ())
+    expected = [scalar_day_count(c, u, weekmask, holidays) for c, u in pairs]
+
+    busdaycal = None if calendar is None else business_calendar(weekmask, tuple(holidays))
+    assert business_day_counts(created, updated, busdaycal).tolist() == expected
+
+
+def test_day_counts_use_local_dates_of_aware_timestamps():
+    # Saturday 02:00 in India is still Friday in UTC
+    created = pd.Series(pd.to_datetime(['2025-03-08 02:00']).tz_localize('Asia/Kolkata'))
+    updated = pd.Series(pd.to_datetime(['2025-03-11 10:00']).tz_localize('Asia/Kolkata'))
+    # Saturday to Tuesday locally: Monday and Tuesday, minus one (Friday to Tuesday would give 2)
+    assert business_day_counts(created, updated).tolist() == [1]
@@ -0,0 +1,60 @@
+import pandas as pd
+import pytest
+
+from qc_metrics.dates import normalize_window
+from qc_metrics.drill import MISSING_VALUE, build_drill_index
+from qc_metrics.pipeline import process_upload, summarize
+
+FILTERS = [
+    {},
+    {'Assignee': ['dev01', 'dev03', 'dev17']},
+    {'Component/s': ['UI'], 'Sprint': ['Sprint 2', 'Sprint 5', 'Sprint 26']},
+    {'Assignee': [MISSING_VALUE, 'dev04'], 'Component/s': ['API', 'Auth']},
+    # Values the export does not have select nothing
+    {'Sprint': ['Sprint 99']},
+]
+
+
+@pytest.fixture(scope='module')
+def enriched():
+    from benchmarks.generate import generate_frame
+
+    frame = generate_frame(4_000, seed=11)
+    frame.loc[::37, 'Assignee'] = None
+    data = frame.to_csv(index=False).encode('utf-8')
+    # Working hours make the hour totals fractional
+    settings = {'working_hours': normalize_window({'start': '09:00', 'end': '17:00'})}
+    return process_upload(data, settings)['df']
+
+
+def matching_rows(df, filters):
+    keep = pd.Series(True, index=df.index)
+    for column, wanted in filters.items():
+        keep &= df[column].astype('string').fillna(MISSING_VALUE).isin(wanted)
+    return df[keep]
+
+
+@pytest.mark.parametrize('filters', FILTERS)
+def test_summaries_match_summarize_of_the_selected_rows(enriched, filters):
+    index = build_drill_index(enriched)
+    summaries = index.summaries(filters)
+
+    expected = summarize(matching_rows(enriched, filters))
+    assert summaries['variables'] == pytest.approx(expected['variables'])
+    for name in ('severity_summary', 'priority_summary'):
+        # Hours are float sums, added up group by group
+        pd.testing.assert_frame_equal(pd.DataFrame(summaries[name]), pd.DataFrame(expected[name]), check_dtype=False)
+
+
+@pytest.mark.parametrize('filters', FILTERS[:4])
+def test_breakdown_matches_a_groupby_of_the_selected_rows(enriched, filters):
+    index = build_drill_index(enriched)
+    breakdown = index.breakdown('Assignee', filters).set_index('Assignee')
+
+    rows = matching_rows(enriched, filters)
+    grouped = rows.groupby(rows['Assignee'].astype('string').fillna(MISSING_VALUE))
+    assert sorted(breakdown.index) == sorted(grouped.groups)
+    for assignee, group in grouped:
+        assert breakdown.loc[assignee, 'Bug count'] == len(group)
+        assert breakdown.loc[assignee, 'Day count'] == group['Day count'].sum()
+        assert breakdown.loc[assignee, 'Hours count'] == pytest.approx(group['Hours count'].sum())
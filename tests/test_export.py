@@ -0,0 +1,48 @@
+import io
+
+import pandas as pd
+import pytest
+
+from qc_metrics.dates import normalize_window
+from qc_metrics.export import export_csv_file, export_frame
+from qc_metrics.ingest import open_csv
+from qc_metrics.pipeline import process_upload
+from qc_metrics.streaming import discard_output, stream_to_tempfile
+
+
+def test_streamed_working_hours_to_parquet(make_export):
+    settings = {'working_hours': normalize_window({'start': '09:00', 'end': '17:00'})}
+    result = stream_to_tempfile(open_csv(make_export()), settings, chunksize=300)
+    try:
+        exported = pd.read_parquet(io.BytesIO(export_csv_file(result['output_path'], 'parquet', chunksize=300)))
+        written = pd.read_csv(result['output_path'])
+    finally:
+        discard_output(result)
+
+    assert exported['Day count'].dtype == 'int32'
+    assert exported['Hours count'].dtype == 'float64'
+    assert (exported['Hours count'] % 1 != 0).any()
+    pd.testing.assert_series_equal(exported['Hours count'], written['Hours count'])
+
+
+def test_xlsx_export_in_chunks_keeps_every_row(make_export):
+    df = process_upload(make_export(1_000))['df']
+    exported = pd.read_excel(io.BytesIO(export_frame(df, 'xlsx', chunksize=128)))
+
+    assert list(exported.columns) == list(df.columns)
+    assert len(exported) == len(df)
+    assert exported['Issue key'].tolist() == df['Issue key'].astype(str).tolist()
+    assert exported['Day count'].sum() == df['Day count'].sum()
+
+
+def test_hours_are_rounded_only_in_exported_files(make_export):
+    settings = {'working_hours': normalize_window({'start': '09:00', 'end': '17:00'})}
+    result = process_upload(make_export(), settings)
+    hours = result['df']['Hours count']
+    assert (hours != hours.round(2)).any()
+
+    for fmt in ('csv', 'xlsx', 'parquet'):
+        data = io.BytesIO(export_frame(result['df'], fmt))
+        exported = {'csv': pd.read_csv, 'xlsx': pd.read_excel, 'parquet': pd.read_parquet}[fmt](data)
+        assert exported['Hours count'].tolist() == hours.round(2).tolist()
+    assert result['variables']['total_hours'] == pytest.approx(hours.sum())
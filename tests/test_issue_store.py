@@ -0,0 +1,75 @@
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.generate import generate_frame
+from qc_metrics.issue_store import IssueStore, process_incremental
+from qc_metrics.pipeline import process_frame
+
+
+def next_export(df, seed):
+    """The next day's export: some issues gone, some new, some with new dates or Status."""
+    rng = np.random.default_rng(seed)
+    df = df.drop(index=rng.choice(df.index, 60, replace=False))
+    redated = rng.choice(df.index, 80, replace=False)
+    df.loc[redated, 'Updated'] = generate_frame(80, seed + 100)['Updated'].to_numpy()
+    restatused = rng.choice(df.index, 80, replace=False)
+    df.loc[restatused, 'Status'] = rng.choice(['Done', 'Open', 'Merge Request'], 80)
+    new = generate_frame(120, seed, start=10_000 + 1_000 * seed)
+    return pd.concat([df, new], ignore_index=True)
+
+
+def assert_same_result(incremental, full):
+    assert incremental['variables'] == full['variables']
+    pd.testing.assert_frame_equal(incremental['df'], full['df'], check_dtype=False, check_categorical=False)
+
+
+def test_incremental_matches_full_reprocess(tmp_path):
+    store = IssueStore(tmp_path / 'issues.sqlite')
+    export = generate_frame(1_500, 4)
+    for day in range(4):
+        incremental = process_incremental(export.copy(), store, 'team')
+        assert_same_result(incremental, process_frame(export.copy()))
+        export = next_export(export, day)
+
+
+def test_datasets_are_kept_apart(tmp_path):
+    store = IssueStore(tmp_path / 'issues.sqlite')
+    first, second = generate_frame(500, 1), generate_frame(700, 2)
+    process_incremental(first.copy(), store, 'a')
+    process_incremental(second.copy(), store, 'b')
+    assert store.datasets() == {'a': 500, 'b': 700}
+    assert_same_result(process_incremental(first.copy(), store, 'a'), process_frame(first.copy()))
+
+
+def test_upload_waits_for_another_uploads_transaction(tmp_path):
+    store = IssueStore(tmp_path / 'issues.sqlite')
+    export = generate_frame(300, 5)
+    results = []
+    with store.transaction():
+        worker = threading.Thread(target=lambda: results.append(process_incremental(export.copy(), store, 'team')))
+        worker.start()
+        time.sleep(0.5)
+        assert worker.is_alive() and not results
+    worker.join(timeout=60)
+    assert_same_result(results[0], process_frame(export.copy()))
+
+
+@pytest.mark.parametrize('uploads', [6])
+def test_concurrent_uploads_leave_a_consistent_store(tmp_path, uploads):
+    store = IssueStore(tmp_path / 'issues.sqlite')
+    exports = [generate_frame(800, 6)]
+    for day in range(uploads - 1):
+        exports.append(next_export(exports[-1], day))
+    threads = [threading.Thread(target=process_incremental, args=(export.copy(), store, 'team')) for export in exports]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=120)
+
+    # Whichever upload was saved last, the next one must correct its totals exactly
+    final = next_export(exports[-1], 99)
+    assert_same_result(process_incremental(final.copy(), store, 'team'), process_frame(final.copy()))
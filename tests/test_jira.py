@@ -0,0 +1,17 @@
+from qc_metrics.jira import issues_frame
+
+
+def issue(key, **fields):
+    return {'key': key, 'fields': {'created': '2025-08-01T09:40:00.000+0530',
+                                   'updated': '2025-08-04T17:05:00.000+0530', **fields}}
+
+
+def test_list_fields_skip_null_items():
+    df = issues_frame([
+        issue('QA-1', components=[{'name': 'UI'}, None, {'name': 'API'}]),
+        issue('QA-2', components=[None, {'id': '10001'}]),
+        issue('QA-3', components=[]),
+        issue('QA-4', components=['plain', None]),
+    ])
+
+    assert df['Component/s'].fillna('').tolist() == ['UI, API', '', '', 'plain']
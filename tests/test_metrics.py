@@ -0,0 +1,87 @@
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+from qc_metrics.metrics import QA_METRICS, calculate_qa_metrics, format_qa_metrics, qa_metrics_table
+
+
+def reference_metrics(calc_vars, page_story_count, dev_hrs, test_hrs):
+    """The calculator metric by metric, as the app's JavaScript-ported version wrote it: name -> number or "-"."""
+    get = defaultdict(int, calc_vars)
+    total_bugs = get['total_bugs']
+    critical = get['critical_blocker_bug_count']
+    return {
+        'Defect Density (Critical)': critical / page_story_count if page_story_count and critical else "-",
+        'Defect Density (Total)': total_bugs / page_story_count if page_story_count and total_bugs else "-",
+        'MTFB - High (hrs)': get['highest_high_hours_count'] / get['highest_high_bug_count']
+        if get['highest_high_hours_count'] and get['highest_high_bug_count'] else "-",
+        'MTFB - Medium (hrs)': get['medium_hours_count'] / get['medium_bug_count']
+        if get['medium_hours_count'] and get['medium_bug_count'] else "-",
+        'MTFB - Low (hrs)': get['low_lowest_hours_count'] / get['low_lowest_bug_count']
+        if get['low_lowest_hours_count'] and get['low_lowest_bug_count'] else "-",
+        'Severity Ratio (Critical) %': critical / total_bugs * 100 if total_bugs and critical else "-",
+        'Severity Ratio (Major) %': get['major_bug_count'] / total_bugs * 100
+        if total_bugs and get['major_bug_count'] else "-",
+        'Defect Rate': total_bugs / (dev_hrs + test_hrs) if total_bugs and dev_hrs and test_hrs else "-",
+        'Defect Detection Rate': total_bugs / test_hrs if total_bugs and test_hrs else "-",
+    }
+
+
+def random_inputs(rows=500, seed=0):
+    """Calculator inputs with plenty of zeros, so every metric is "-" for some rows."""
+    rng = np.random.default_rng(seed)
+
+    def counts():
+        return np.where(rng.random(rows) < 0.3, 0, rng.integers(1, 200, rows))
+
+    def hours():
+        return np.where(rng.random(rows) < 0.3, 0.0, rng.random(rows) * 500)
+
+    return pd.DataFrame({
+        'total_bugs': counts(),
+        'critical_blocker_bug_count': counts(),
+        'major_bug_count': counts(),
+        'highest_high_bug_count': counts(),
+        'highest_high_hours_count': hours(),
+        'medium_bug_count': counts(),
+        'medium_hours_count': hours(),
+        'low_lowest_bug_count': counts(),
+        'low_lowest_hours_count': hours(),
+        'page_story_count': counts(),
+        'dev_hrs': hours(),
+        'test_hrs': hours(),
+    })
+
+
+def test_table_is_nan_exactly_where_the_calculator_shows_a_dash():
+    inputs = random_inputs()
+    table = qa_metrics_table(inputs)
+    formatted = format_qa_metrics(table)
+
+    assert list(table.columns) == [name for name, _, _, _ in QA_METRICS]
+    for position, row in enumerate(inputs.to_dict('records')):
+        calc_vars = {name: value for name, value in row.items()
+                     if name not in ('page_story_count', 'dev_hrs', 'test_hrs')}
+        expected = reference_metrics(calc_vars, row['page_story_count'], row['dev_hrs'], row['test_hrs'])
+        shown = calculate_qa_metrics(calc_vars, row['page_story_count'], row['dev_hrs'], row['test_hrs'])
+        assert [metric['name'] for metric in shown] == list(expected)
+        for metric in shown:
+            value = table[metric['name']].iloc[position]
+            if expected[metric['name']] == "-":
+                assert np.isnan(value)
+                assert metric['value'] == formatted[metric['name']].iloc[position] == "-"
+            else:
+                assert value == expected[metric['name']]
+                assert metric['value'] == formatted[metric['name']].iloc[position] != "-"
+    # Every metric is defined for some rows and "-" for others
+    assert table.isna().any().all() and table.notna().any().all()
+
+
+def test_missing_inputs_count_as_zero():
+    table = qa_metrics_table([{'total_bugs': 10, 'major_bug_count': 4}, {}])
+
+    assert table.loc[0, 'Severity Ratio (Major) %'] == 40.0
+    assert table.drop(columns='Severity Ratio (Major) %').loc[0].isna().all()
+    assert table.loc[1].isna().all()
+    assert format_qa_metrics(table).loc[0, 'Severity Ratio (Major) %'] == "40.00%"
@@ -0,0 +1,63 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.generate import generate_frame
+from qc_metrics.dates import parse_date_dd_mm_yy, parse_dates, valid_dates
+
+EDGE_VALUES = [
+    None, np.nan, pd.NA, '', '   ', 'N/A', 'TBD', 'not set',
+    '11-12-25', ' 11-12-25 ', '11-12-25 09:40', '1-2-3', '1-2-03 7:05', '01-02-03 00:00',
+    '29-02-24', '29-02-23', '31-04-25', '31-02-25', '00-00-00', '13-13-13 25:61', '11-12-25 24:00',
+    '01-01-50', '01-01-51', '31-12-99 23:59',
+    '2025-06-15', '2025-06-15 10:20:30', '2025-06-15T10:20:30', '15/06/2025 10:20', '06/15/2025', '15.06.2025',
+    '1899-12-31', '2101-01-01', '15 Jun 2025', 'June 15, 2025 3:04 PM',
+    pd.Timestamp('2025-06-15 10:20'), pd.Timestamp('1850-01-01'),
+]
+
+
+def scalar_parse(values):
+    with warnings.catch_warnings():
+        # dateutil fallbacks warn about guessed layouts
+        warnings.simplefilter('ignore')
+        return values.apply(parse_date_dd_mm_yy)
+
+
+def assert_same_dates(actual, expected):
+    actual = pd.Series(pd.to_datetime(actual, errors='coerce'))
+    expected = pd.Series(pd.to_datetime(pd.Series(list(expected), dtype=object), errors='coerce'))
+    mismatch = ~((actual.isna() & expected.isna()) | (actual.to_numpy() == expected.to_numpy()))
+    assert not mismatch.any(), pd.DataFrame({'actual': actual, 'expected': expected})[mismatch]
+
+
+@pytest.mark.parametrize('seed', [0, 1])
+def test_matches_scalar_parser_on_mixed_corpus(seed):
+    frame = generate_frame(3_000, seed)
+    values = pd.concat([frame['Created'], frame['Updated'], pd.Series(EDGE_VALUES, dtype=object)],
+                       ignore_index=True)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        parsed = parse_dates(values)
+
+    assert_same_dates(parsed, scalar_parse(values))
+    assert (valid_dates(values) == parsed.notna().to_numpy()).all()
+
+
+def test_edge_values_one_by_one():
+    for value in EDGE_VALUES:
+        values = pd.Series([value], dtype=object)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            parsed = parse_dates(values)
+        assert_same_dates(parsed, scalar_parse(values))
+
+
+def test_string_dtype_column_matches():
+    values = generate_frame(500, 2)['Created'].astype('string')
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        parsed = parse_dates(values)
+    assert_same_dates(parsed, scalar_parse(values.astype(object)))
@@ -0,0 +1,58 @@
+import pandas as pd
+
+from benchmarks.generate import generate_frame
+from qc_metrics.pipeline import ISSUE_KEY, process_upload
+from qc_metrics.uploads import load_parsed, merge_uploads, process_uploads
+
+
+def overlapping_exports():
+    """Three exports sharing some Issue keys, each as CSV bytes."""
+    first = generate_frame(600, seed=1)
+    second = generate_frame(600, seed=2, start=400)
+    # Same issues and Updated as part of the first file, only the Status moved on
+    third = first.iloc[100:300].copy()
+    third['Status'] = 'Closed'
+    first.loc[::50, ISSUE_KEY] = None
+    return [frame.to_csv(index=False).encode('utf-8') for frame in (first, second, third)]
+
+
+def naive_merge(loaded):
+    """Row positions kept: per key the latest Updated, the later file on a tie."""
+    df = pd.concat([frame for frame, _ in loaded], ignore_index=True)
+    updated = pd.concat([dates[1] for _, dates in loaded], ignore_index=True)
+    ranked = pd.DataFrame({
+        'key': df[ISSUE_KEY],
+        'updated': updated.fillna(pd.Timestamp.min),
+        'position': range(len(df)),
+    })
+    keyed = ranked[ranked['key'].notna()].sort_values(['updated', 'position'])
+    kept = keyed.drop_duplicates('key', keep='last')['position']
+    return df, sorted([*kept, *ranked.loc[ranked['key'].isna(), 'position']])
+
+
+def test_merge_keeps_the_latest_updated_per_issue():
+    loaded = [load_parsed(data, f'export{i}.csv') for i, data in enumerate(overlapping_exports())]
+    df, (created, updated), duplicates = merge_uploads(loaded)
+
+    concatenated, kept = naive_merge(loaded)
+    pd.testing.assert_frame_equal(df, concatenated.iloc[kept].reset_index(drop=True))
+    assert duplicates == len(concatenated) - len(kept)
+    assert len(created) == len(updated) == len(df)
+    keyed = df[ISSUE_KEY].dropna()
+    assert keyed.is_unique
+    assert df[ISSUE_KEY].isna().sum() == 12
+    # The third file repeats issues with the same Updated, so it wins those ties
+    assert (df.set_index(ISSUE_KEY).loc[[f'QA-{i}' for i in range(102, 300, 7)], 'Status'] == 'Closed').all()
+
+
+def test_merged_upload_matches_the_deduplicated_export():
+    files = [(data, f'export{i}.csv') for i, data in enumerate(overlapping_exports())]
+    result = process_uploads(files, parallel='thread')
+
+    loaded = [load_parsed(data, name) for data, name in files]
+    concatenated, kept = naive_merge(loaded)
+    expected = process_upload(concatenated.iloc[kept].to_csv(index=False).encode('utf-8'))
+    assert result['variables'] == expected['variables']
+    assert result['df']['Day count'].tolist() == expected['df']['Day count'].tolist()
+    assert result['messages'][0][1].startswith(f"Merged 3 files into {len(kept)} row(s); "
+                                               f"{len(concatenated) - len(kept)} duplicate issue(s)")